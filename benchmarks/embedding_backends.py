@@ -0,0 +1,91 @@
+import argparse
+import multiprocessing as mp
+import resource
+import statistics
+import sys
+import time
+from typing import Any, Dict, List
+
+from openrouter_requests.EmbeddingModule.backend_factory import BACKEND_NAMES, create_embedding_backend
+
+
+SAMPLE_TEXTS = [
+    "Как оформить возврат товара, купленного в интернет-магазине?",
+    "What is the delivery time to Saint Petersburg?",
+    "Подскажите, пожалуйста, часы работы пункта выдачи заказов на выходных.",
+    "My payment was declined but the money has been withdrawn from the card.",
+    "Можно ли изменить адрес доставки после оформления заказа и как это сделать через личный кабинет?",
+]
+
+
+def _rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _run_backend(name: str, model_name: str, texts: List[str], latency_runs: int, queue: mp.Queue) -> None:
+    baseline_rss = _rss_mb()
+    started = time.perf_counter()
+    backend = create_embedding_backend(name, model_name=model_name)
+    backend.encode(["warmup"])
+    load_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    embeddings = backend.encode(texts)
+    batch_time = time.perf_counter() - started
+
+    latencies = []
+    for i in range(latency_runs):
+        started = time.perf_counter()
+        backend.encode([texts[i % len(texts)]])
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+
+    queue.put({
+        "backend": name,
+        "load_s": load_time,
+        "throughput": len(texts) / batch_time,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+        "rss_mb": _rss_mb() - baseline_rss,
+        "probe": embeddings[:len(SAMPLE_TEXTS)],
+    })
+
+
+def _cosine(a: List[float], b: List[float]) -> float:
+    return sum(x * y for x, y in zip(a, b))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Сравнение бэкендов эмбеддингов")
+    parser.add_argument("--model", default="sentence-transformers/all-MiniLM-L6-v2")
+    parser.add_argument("--backends", nargs="+", default=list(BACKEND_NAMES), choices=BACKEND_NAMES)
+    parser.add_argument("--texts", type=int, default=2000)
+    parser.add_argument("--latency-runs", type=int, default=200)
+    args = parser.parse_args()
+
+    texts = [SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)] + f" #{i}" for i in range(args.texts)]
+    ctx = mp.get_context("spawn")
+    results: List[Dict[str, Any]] = []
+
+    for name in args.backends:
+        queue = ctx.Queue()
+        process = ctx.Process(target=_run_backend, args=(name, args.model, texts, args.latency_runs, queue))
+        process.start()
+        results.append(queue.get())
+        process.join()
+
+    reference = next((r["probe"] for r in results if r["backend"] == "torch"), results[0]["probe"])
+
+    header = f"{'backend':<10} {'load, s':>8} {'texts/s':>9} {'p50, ms':>8} {'p95, ms':>8} {'RSS, MB':>8} {'min cos':>8}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        min_cos = min(_cosine(a, b) for a, b in zip(reference, r["probe"]))
+        print(
+            f"{r['backend']:<10} {r['load_s']:>8.2f} {r['throughput']:>9.1f} "
+            f"{r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['rss_mb']:>8.0f} {min_cos:>8.4f}"
+        )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from typing import Any, Dict, List
+
+
+SCENARIOS = {
+    "core": "import openrouter_requests",
+    "client": "from openrouter_requests import OpenRouter",
+    "rag": "from openrouter_requests import ChromaVectorStore",
+    "numpy_index": "from openrouter_requests import NumpyVectorStore",
+    "stt": "from openrouter_requests import VoskService",
+    "tts": "from openrouter_requests import create_tts",
+}
+
+HEAVY_MODULES = ("chromadb", "sentence_transformers", "torch", "vosk", "numpy", "onnxruntime")
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - started
+print(json.dumps({{
+    "elapsed": elapsed,
+    "heavy": [name for name in {heavy!r} if name in sys.modules],
+}}))
+"""
+
+
+def _measure(statement: str) -> Dict[str, Any]:
+    completed = subprocess.run(
+        [sys.executable, "-c", PROBE.format(statement=statement, heavy=HEAVY_MODULES)],
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        return {"error": completed.stderr.strip().splitlines()[-1]}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Время импорта подсистем openrouter_requests")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=list(SCENARIOS))
+    args = parser.parse_args()
+
+    print(f"{'scenario':<12} {'median, ms':>10} {'min, ms':>8}  heavy modules loaded")
+    for name in args.scenarios:
+        runs: List[Dict[str, Any]] = [_measure(SCENARIOS[name]) for _ in range(args.runs)]
+        errors = [run["error"] for run in runs if "error" in run]
+        if errors:
+            print(f"{name:<12} {'n/a':>10} {'n/a':>8}  {errors[0]}")
+            continue
+
+        timings = [run["elapsed"] * 1000 for run in runs]
+        heavy = ", ".join(runs[-1]["heavy"]) or "-"
+        print(f"{name:<12} {statistics.median(timings):>10.1f} {min(timings):>8.1f}  {heavy}")
+
+
+if __name__ == "__main__":
+    main()
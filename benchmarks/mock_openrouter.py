@@ -0,0 +1,122 @@
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Dict
+from aiohttp import web
+
+
+DEFAULT_REPLY = (
+    "Конечно, сейчас помогу. Ваш заказ уже собран и передан в доставку. "
+    "Курьер привезёт его завтра с десяти до двух часов дня. "
+    "Если время неудобно, его можно изменить в личном кабинете."
+)
+
+
+def _completion(model: str, stream: bool) -> Dict[str, Any]:
+    return {
+        "id": f"mock-{time.time_ns()}",
+        "object": "chat.completion.chunk" if stream else "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "provider": "Mock",
+    }
+
+
+def _usage(body: Dict[str, Any], reply: str) -> Dict[str, Any]:
+    if not (body.get("usage") or {}).get("include"):
+        return {}
+    prompt_tokens = sum(len(str(message.get("content") or "")) for message in body.get("messages", [])) // 4
+    completion_tokens = len(reply) // 4
+    return {"usage": {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }}
+
+
+def create_app(
+        reply: str = DEFAULT_REPLY,
+        first_token_delay: float = 0.3,
+        token_delay: float = 0.02,
+) -> web.Application:
+
+    async def completions(request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        model = body.get("model", "mock")
+        await asyncio.sleep(first_token_delay)
+
+        if not body.get("stream"):
+            return web.json_response({
+                **_completion(model, stream=False),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": reply},
+                    "finish_reason": "stop",
+                }],
+                **_usage(body, reply),
+            })
+
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        await response.write(b": OPENROUTER PROCESSING\n\n")
+
+        tokens = reply.split(" ")
+        for index, token in enumerate(tokens):
+            delta: Dict[str, Any] = {"content": token if index == 0 else f" {token}"}
+            if index == 0:
+                delta["role"] = "assistant"
+            chunk = {
+                **_completion(model, stream=True),
+                "choices": [{"index": 0, "delta": delta, "finish_reason": None}],
+            }
+            await response.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+            await asyncio.sleep(token_delay)
+
+        usage = _usage(body, reply)
+        if usage:
+            chunk = {**_completion(model, stream=True), "choices": [], **usage}
+            await response.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+    async def models(request: web.Request) -> web.Response:
+        return web.json_response({"data": [{"id": "mock/model"}]})
+
+    app = web.Application()
+    app.router.add_post("/api/v1/chat/completions", completions)
+    app.router.add_get("/api/v1/models", models)
+    return app
+
+
+async def start_mock_server(host: str = "127.0.0.1", port: int = 8765, **options: Any) -> web.AppRunner:
+    runner = web.AppRunner(create_app(**options))
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Локальный мок OpenRouter chat/completions с поддержкой SSE")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--reply", default=DEFAULT_REPLY)
+    parser.add_argument("--first-token-delay", type=float, default=0.3)
+    parser.add_argument("--token-delay", type=float, default=0.02)
+    args = parser.parse_args()
+
+    web.run_app(
+        create_app(
+            reply=args.reply,
+            first_token_delay=args.first_token_delay,
+            token_delay=args.token_delay,
+        ),
+        host=args.host,
+        port=args.port,
+    )
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,105 @@
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import wave
+from typing import AsyncIterator, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mock_openrouter import start_mock_server
+
+
+class SilentTTS:
+
+    def __init__(self, output_sr: int = 48000, chars_per_second: float = 15.0, render_factor: float = 0.1) -> None:
+        self.output_sr = output_sr
+        self.chars_per_second = chars_per_second
+        self.render_factor = render_factor
+
+    async def synthesize(self, text: str) -> bytes:
+        duration = len(text) / self.chars_per_second
+        await asyncio.sleep(duration * self.render_factor)
+        return b"\x00\x00" * int(duration * self.output_sr)
+
+
+async def _read_wav(path: str, chunk_ms: int, realtime: bool) -> AsyncIterator[bytes]:
+    with wave.open(path, "rb") as wav:
+        if wav.getsampwidth() != 2 or wav.getnchannels() != 1:
+            raise ValueError("Ожидается WAV 16 бит, моно")
+        frames_per_chunk = int(wav.getframerate() * chunk_ms / 1000)
+        while True:
+            chunk = wav.readframes(frames_per_chunk)
+            if not chunk:
+                break
+            yield chunk
+            await asyncio.sleep(chunk_ms / 1000 if realtime else 0)
+
+
+def _sample_rate(path: str) -> int:
+    with wave.open(path, "rb") as wav:
+        return wav.getframerate()
+
+
+async def _run(args: argparse.Namespace) -> None:
+    from openrouter_requests import OpenRouter, VoicePipeline, VoskService, create_tts
+
+    server = await start_mock_server(
+        port=args.port,
+        first_token_delay=args.first_token_delay,
+        token_delay=args.token_delay,
+    )
+    try:
+        client = OpenRouter(
+            base_url=f"http://127.0.0.1:{args.port}/api/v1/chat/completions",
+            model="mock/model",
+            api_key="mock",
+        )
+        VoskService(args.vosk_model)
+        tts = SilentTTS() if args.tts_model is None else create_tts(model_path=args.tts_model)
+        pipeline = VoicePipeline(client, stt=VoskService, tts=tts)
+        await client.warmup()
+
+        results: List[Dict[str, Optional[float]]] = []
+        for run in range(args.runs):
+            metrics: Dict[str, Optional[float]] = {}
+            async for event in pipeline.run(
+                _read_wav(args.wav, args.chunk_ms, args.realtime),
+                sample_rate=_sample_rate(args.wav),
+                dialog_id=f"bench-{run}-{time.time_ns()}",
+            ):
+                if event["type"] == "transcript" and event["final"]:
+                    print(f"  STT: {event['text']}")
+                elif event["type"] == "metrics":
+                    metrics = event["metrics"]
+            results.append(metrics)
+
+        print(f"{'stage':<22} {'median, ms':>10} {'max, ms':>8}")
+        for stage in results[0]:
+            values = [result[stage] * 1000 for result in results if result.get(stage) is not None]
+            if not values:
+                print(f"{stage:<22} {'n/a':>10} {'n/a':>8}")
+                continue
+            print(f"{stage:<22} {statistics.median(values):>10.1f} {max(values):>8.1f}")
+    finally:
+        await server.cleanup()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Задержки голосового хода STT → LLM → TTS на локальном моке")
+    parser.add_argument("--wav", required=True, help="Записанный WAV, 16 бит, моно")
+    parser.add_argument("--vosk-model", required=True)
+    parser.add_argument("--tts-model", default=None, help="Локальная модель Silero; без неё используется SilentTTS")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--chunk-ms", type=int, default=100)
+    parser.add_argument("--realtime", action="store_true")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--first-token-delay", type=float, default=0.3)
+    parser.add_argument("--token-delay", type=float, default=0.02)
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1 @@
+from openrouter_requests.CacheModule.semantic_cache import SemanticResponseCache, fingerprint
\ No newline at end of file
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+import numpy as np
+from loguru import logger
+
+
+def fingerprint(parts: Iterable[Any]) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(json.dumps(part, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class _Bucket:
+
+    def __init__(self, collection: Optional[str]) -> None:
+        self.collection = collection
+        self.embeddings: List[np.ndarray] = []
+        self.answers: List[str] = []
+        self.created: List[float] = []
+        self._matrix: Optional[np.ndarray] = None
+
+    def matrix(self) -> np.ndarray:
+        if self._matrix is None or self._matrix.shape[0] != len(self.embeddings):
+            self._matrix = np.vstack(self.embeddings)
+        return self._matrix
+
+    def drop(self, count: int) -> None:
+        del self.embeddings[:count]
+        del self.answers[:count]
+        del self.created[:count]
+        self._matrix = None
+
+
+class SemanticResponseCache:
+
+    def __init__(
+            self,
+            similarity_threshold: float = 0.92,
+            max_entries: int = 10000,
+            ttl: Optional[float] = 3600.0,
+    ) -> None:
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._buckets: "OrderedDict[str, _Bucket]" = OrderedDict()
+        self._entries = 0
+        self._kb_versions: Dict[Optional[str], Any] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.invalidations = 0
+        logger.success(
+            "Инициализирован класс {} с параметрками {}",
+            self.__class__.__name__,
+            {
+                "similarity_threshold": similarity_threshold,
+                "max_entries": max_entries,
+                "ttl": ttl,
+            }
+        )
+
+    def lookup(
+            self,
+            system_fingerprint: str,
+            rag_fingerprint: str,
+            embedding: Sequence[float],
+            kb_version: Any = None,
+            collection: Optional[str] = None,
+            history_fingerprint: str = "",
+    ) -> Optional[str]:
+        key = self._key(collection, system_fingerprint, rag_fingerprint, history_fingerprint)
+        query = self._normalize(embedding)
+
+        with self._lock:
+            self._check_kb_version(collection, kb_version)
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                self._expire(key, bucket)
+
+            bucket = self._buckets.get(key)
+            if bucket is None or not bucket.embeddings:
+                self.misses += 1
+                return None
+
+            similarities = bucket.matrix() @ query
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.similarity_threshold:
+                self.misses += 1
+                return None
+
+            self._buckets.move_to_end(key)
+            self.hits += 1
+            return bucket.answers[best]
+
+    def store(
+            self,
+            system_fingerprint: str,
+            rag_fingerprint: str,
+            embedding: Sequence[float],
+            answer: str,
+            kb_version: Any = None,
+            collection: Optional[str] = None,
+            history_fingerprint: str = "",
+    ) -> None:
+        if not answer:
+            return
+
+        key = self._key(collection, system_fingerprint, rag_fingerprint, history_fingerprint)
+        vector = self._normalize(embedding)
+
+        with self._lock:
+            self._check_kb_version(collection, kb_version)
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = _Bucket(collection)
+            self._buckets.move_to_end(key)
+            bucket.embeddings.append(vector)
+            bucket.answers.append(answer)
+            bucket.created.append(time.monotonic())
+            self._entries += 1
+            self.stores += 1
+            self._evict()
+
+    @staticmethod
+    def fingerprint(parts: Iterable[Any]) -> str:
+        return fingerprint(parts)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+            self._entries = 0
+            self.invalidations += 1
+        logger.info("Семантический кэш ответов очищен")
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "stores": self.stores,
+            "entries": self._entries,
+            "invalidations": self.invalidations,
+        }
+
+    def _check_kb_version(self, collection: Optional[str], kb_version: Any) -> None:
+        if kb_version is None:
+            return
+        previous = self._kb_versions.get(collection)
+        if kb_version == previous:
+            return
+        self._kb_versions[collection] = kb_version
+        if previous is None:
+            return
+
+        stale = [key for key, bucket in self._buckets.items() if bucket.collection == collection]
+        if not stale:
+            return
+        for key in stale:
+            self._entries -= len(self._buckets.pop(key).answers)
+        self.invalidations += 1
+        logger.info("Коллекция '{}' изменилась, её ответы удалены из семантического кэша", collection)
+
+    def _expire(self, key: str, bucket: _Bucket) -> None:
+        if self.ttl is None:
+            return
+        threshold = time.monotonic() - self.ttl
+        expired = 0
+        while expired < len(bucket.created) and bucket.created[expired] < threshold:
+            expired += 1
+        if expired:
+            bucket.drop(expired)
+            self._entries -= expired
+        if not bucket.embeddings:
+            del self._buckets[key]
+
+    def _evict(self) -> None:
+        while self._entries > self.max_entries and self._buckets:
+            key, bucket = next(iter(self._buckets.items()))
+            bucket.drop(1)
+            self._entries -= 1
+            if not bucket.embeddings:
+                del self._buckets[key]
+
+    @staticmethod
+    def _key(
+            collection: Optional[str],
+            system_fingerprint: str,
+            rag_fingerprint: str,
+            history_fingerprint: str,
+    ) -> str:
+        return fingerprint([collection, system_fingerprint, rag_fingerprint, history_fingerprint])
+
+    @staticmethod
+    def _normalize(embedding: Sequence[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm > 0 else vector
@@ -1 +1,12 @@
-from openrouter_requests.ChromaDB.vector_base import ChromaVectorStore
\ No newline at end of file
+from importlib import import_module
+from typing import Any
+from openrouter_requests.ChromaDB.ingestion import IngestionPipeline, chunk_text
+
+
+def __getattr__(name: str) -> Any:
+    if name != "ChromaVectorStore":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(import_module("openrouter_requests.ChromaDB.vector_base"), name)
+    globals()[name] = value
+    return value
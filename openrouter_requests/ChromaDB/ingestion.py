@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import inspect
+import time
+from typing import TYPE_CHECKING, Any, AsyncIterable, Callable, Dict, List, Optional, Tuple
+from loguru import logger
+
+if TYPE_CHECKING:
+    from openrouter_requests.ChromaDB.vector_base import ChromaVectorStore
+
+
+ProgressCallback = Callable[[Dict[str, Any]], Any]
+
+_SEPARATORS = ("\n\n", "\n", ". ", "! ", "? ", " ")
+
+
+def chunk_text(text: str, chunk_size: int = 1000, chunk_overlap: int = 200) -> List[str]:
+    if chunk_size <= 0:
+        raise ValueError("chunk_size должен быть положительным")
+    if not 0 <= chunk_overlap < chunk_size:
+        raise ValueError("chunk_overlap должен быть в диапазоне [0, chunk_size)")
+
+    text = text.strip()
+    if len(text) <= chunk_size:
+        return [text] if text else []
+
+    chunks: List[str] = []
+    start = 0
+    while start < len(text):
+        end = min(start + chunk_size, len(text))
+        if end < len(text):
+            window = text[start:end]
+            for separator in _SEPARATORS:
+                cut = window.rfind(separator)
+                if cut > chunk_overlap:
+                    end = start + cut + len(separator)
+                    break
+
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        if end >= len(text):
+            break
+        start = max(end - chunk_overlap, start + 1)
+
+    return chunks
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def chunk_id(doc_id: str, text: str) -> str:
+    return f"{doc_id}:{content_hash(text)}"
+
+
+class IngestionPipeline:
+
+    def __init__(
+            self,
+            store: ChromaVectorStore,
+            chunk_size: int = 1000,
+            chunk_overlap: int = 200,
+            batch_size: int = 64,
+            max_pending_batches: int = 2,
+            on_progress: Optional[ProgressCallback] = None,
+            collection: Optional[str] = None,
+    ) -> None:
+        self._store = store
+        self._collection = collection
+        self._chunk_size = chunk_size
+        self._chunk_overlap = chunk_overlap
+        self._batch_size = batch_size
+        self._max_pending_batches = max_pending_batches
+        self._on_progress = on_progress
+
+    async def run(self, documents: AsyncIterable[Dict[str, Any]]) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {
+            "documents": 0,
+            "chunks": 0,
+            "skipped": 0,
+            "written": 0,
+            "elapsed": 0.0,
+            "chunks_per_sec": 0.0,
+        }
+        started = time.perf_counter()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self._max_pending_batches)
+
+        writer = asyncio.create_task(self._write(queue, stats, started))
+        try:
+            await self._produce(documents, queue, stats, writer)
+            await self._put(queue, None, writer)
+            await writer
+        except BaseException:
+            writer.cancel()
+            raise
+
+        self._update_rate(stats, started)
+        logger.success(
+            "Загрузка завершена: документов {documents}, чанков {chunks}, "
+            "пропущено {skipped}, записано {written}, {chunks_per_sec:.1f} чанков/сек",
+            **stats,
+        )
+        return stats
+
+    async def _produce(
+            self,
+            documents: AsyncIterable[Dict[str, Any]],
+            queue: asyncio.Queue,
+            stats: Dict[str, Any],
+            writer: asyncio.Task,
+    ) -> None:
+        batch: List[Tuple[str, str, Dict[str, Any]]] = []
+
+        async for document in documents:
+            stats["documents"] += 1
+            doc_id = str(document.get("id") or stats["documents"])
+            metadata = document.get("metadata") or {}
+            seen: set[str] = set()
+
+            for index, chunk in enumerate(chunk_text(document.get("text") or "", self._chunk_size, self._chunk_overlap)):
+                stats["chunks"] += 1
+                digest = content_hash(chunk)
+                if digest in seen:
+                    stats["skipped"] += 1
+                    continue
+                seen.add(digest)
+
+                batch.append((
+                    chunk_id(doc_id, chunk),
+                    chunk,
+                    {**metadata, "source_id": doc_id, "chunk_index": index, "content_hash": digest},
+                ))
+                if len(batch) >= self._batch_size:
+                    await self._embed_and_enqueue(batch, queue, stats, writer)
+                    batch = []
+
+        if batch:
+            await self._embed_and_enqueue(batch, queue, stats, writer)
+
+    async def _embed_and_enqueue(
+            self,
+            batch: List[Tuple[str, str, Dict[str, Any]]],
+            queue: asyncio.Queue,
+            stats: Dict[str, Any],
+            writer: asyncio.Task,
+    ) -> None:
+        existing = await self._store.existing_ids(
+            [item_id for item_id, _, _ in batch],
+            collection=self._collection,
+        )
+        fresh = [item for item in batch if item[0] not in existing]
+        stats["skipped"] += len(batch) - len(fresh)
+        if not fresh:
+            return
+
+        ids = [item_id for item_id, _, _ in fresh]
+        texts = [text for _, text, _ in fresh]
+        metadatas = [metadata for _, _, metadata in fresh]
+        embeddings = await self._store.embed_documents(texts)
+        await self._put(queue, (ids, texts, embeddings, metadatas), writer)
+
+    @staticmethod
+    async def _put(queue: asyncio.Queue, item: Any, writer: asyncio.Task) -> None:
+        put = asyncio.ensure_future(queue.put(item))
+        done, _ = await asyncio.wait({put, writer}, return_when=asyncio.FIRST_COMPLETED)
+        if put not in done:
+            put.cancel()
+            writer.result()
+            raise RuntimeError("Запись в хранилище остановилась раньше времени")
+
+    async def _write(self, queue: asyncio.Queue, stats: Dict[str, Any], started: float) -> None:
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+
+            ids, texts, embeddings, metadatas = item
+            await self._store.upsert_embeddings(
+                ids=ids,
+                texts=texts,
+                embeddings=embeddings,
+                metadatas=metadatas,
+                collection=self._collection,
+            )
+            stats["written"] += len(ids)
+            self._update_rate(stats, started)
+            logger.info(
+                "Загрузка: документов {documents}, чанков {chunks}, пропущено {skipped}, "
+                "записано {written}, {chunks_per_sec:.1f} чанков/сек",
+                **stats,
+            )
+
+            if self._on_progress is not None:
+                result = self._on_progress(dict(stats))
+                if inspect.isawaitable(result):
+                    await result
+
+    @staticmethod
+    def _update_rate(stats: Dict[str, Any], started: float) -> None:
+        stats["elapsed"] = time.perf_counter() - started
+        if stats["elapsed"] > 0:
+            stats["chunks_per_sec"] = stats["chunks"] / stats["elapsed"]
@@ -2,14 +2,22 @@ from __future__ import annotations
 
 import asyncio
 import json
-from typing import Any, Dict, List, Optional, Sequence
+from typing import Any, Callable, Dict, List, Optional, Sequence, TypeVar, Union
 import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import chromadb
 from chromadb.api import ClientAPI
 from chromadb.api.models.Collection import Collection
 from chromadb.config import Settings
-from sentence_transformers import SentenceTransformer
 from loguru import logger
+from openrouter_requests.EmbeddingModule.BaseEmbeddingBackend import BaseEmbeddingBackend
+from openrouter_requests.EmbeddingModule.backend_factory import create_embedding_backend
+from openrouter_requests.EmbeddingModule.embedding_batcher import EmbeddingBatcher
+
+
+T = TypeVar("T")
 
 
 class ChromaVectorStore:
@@ -28,8 +36,22 @@ class ChromaVectorStore:
         collection_name: str = "default_docs",
         model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
         client: Optional["ClientAPI"] = None,
+        embed_batch_size: int = 64,
+        embed_max_delay: float = 0.005,
+        embedding_backend: Union[str, BaseEmbeddingBackend, None] = None,
+        io_workers: int = 4,
+        collection_idle_ttl: Optional[float] = 600.0,
+        max_open_collections: int = 64,
     ) -> None:
         if self._initialized:
+            if collection_name != self._default_collection:
+                logger.warning(
+                    "{} уже инициализирован с коллекцией '{}', коллекцию '{}' передавайте "
+                    "через параметр collection в методах",
+                    self.__class__.__name__,
+                    self._default_collection,
+                    collection_name,
+                )
             return
 
         if client is None:
@@ -39,10 +61,30 @@ class ChromaVectorStore:
             )
 
         self._client: "ClientAPI" = client
-        self._collection: "Collection" = self._client.get_or_create_collection(
-            name=collection_name,
+        self._default_collection = collection_name
+        self._collection_idle_ttl = collection_idle_ttl
+        self._max_open_collections = max_open_collections
+        self._collections_lock = threading.Lock()
+        self._collections: "OrderedDict[str, List[Any]]" = OrderedDict()
+        self._collections[collection_name] = [
+            self._client.get_or_create_collection(name=collection_name),
+            time.monotonic(),
+        ]
+        self._backend = create_embedding_backend(
+            embedding_backend,
+            model_name=model_name,
+            batch_size=embed_batch_size,
+        )
+        self._batcher = EmbeddingBatcher(
+            encode=self._backend.encode,
+            max_batch_size=embed_batch_size,
+            max_delay=embed_max_delay,
+        )
+        self._versions: Dict[str, int] = {}
+        self._io_executor = ThreadPoolExecutor(
+            max_workers=io_workers,
+            thread_name_prefix="chroma-io",
         )
-        self._model = SentenceTransformer(model_name, device="cpu")
         self._initialized = True
         logger.success(
             "Инициализирован синглтон класса {} с параметрками {}",
@@ -56,12 +98,14 @@ class ChromaVectorStore:
             doc_id: str,
             text: str,
             metadata: Optional[Dict[str, Any]] = None,
+            collection: Optional[str] = None,
     ) -> None:
 
         await self.add_documents(
             ids=[doc_id],
             texts=[text],
             metadatas=[metadata] if metadata is not None else None,
+            collection=collection,
         )
 
     async def add_documents(
@@ -69,6 +113,7 @@ class ChromaVectorStore:
             ids: Sequence[str],
             texts: Sequence[str],
             metadatas: Optional[Sequence[Optional[Dict[str, Any]]]] = None,
+            collection: Optional[str] = None,
     ) -> None:
 
         if len(ids) != len(texts):
@@ -86,73 +131,221 @@ class ChromaVectorStore:
 
         embeddings = await self._embed_batch(texts)
 
-        self._collection.add(
+        target = await self._get_collection(collection)
+        await self._run_io(
+            target.add,
             ids=list(ids),
             documents=list(texts),
             embeddings=embeddings,
             metadatas=metadatas_list,
         )
+        self._bump_version(collection)
+
+    async def existing_ids(
+            self,
+            ids: Sequence[str],
+            collection: Optional[str] = None,
+    ) -> set[str]:
+
+        if not ids:
+            return set()
+
+        target = await self._get_collection(collection)
+        result = await self._run_io(target.get, ids=list(ids), include=[])
+        return set(result.get("ids") or [])
+
+    async def upsert_embeddings(
+            self,
+            ids: Sequence[str],
+            texts: Sequence[str],
+            embeddings: Sequence[Sequence[float]],
+            metadatas: Optional[Sequence[Optional[Dict[str, Any]]]] = None,
+            collection: Optional[str] = None,
+    ) -> None:
+
+        if not (len(ids) == len(texts) == len(embeddings)):
+            raise ValueError("Длины ids, texts и embeddings должны совпадать")
+
+        metadatas_list = (
+            [self._normalize_metadata(m) for m in metadatas]
+            if metadatas is not None
+            else None
+        )
+
+        target = await self._get_collection(collection)
+        await self._run_io(
+            target.upsert,
+            ids=list(ids),
+            documents=list(texts),
+            embeddings=[list(e) for e in embeddings],
+            metadatas=metadatas_list,
+        )
+        self._bump_version(collection)
 
     async def search(
             self,
             query: str,
             k: int = 15,
+            include_embeddings: bool = False,
+            collection: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
 
         query_embedding = await self._embed(query)
+        return await self.search_by_embedding(
+            query_embedding,
+            k=k,
+            include_embeddings=include_embeddings,
+            collection=collection,
+        )
 
-        result = self._collection.query(
-            query_embeddings=[query_embedding],
+    async def search_by_embedding(
+            self,
+            query_embedding: Sequence[float],
+            k: int = 15,
+            include_embeddings: bool = False,
+            collection: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+
+        include = ["documents", "metadatas", "distances"]
+        if include_embeddings:
+            include.append("embeddings")
+
+        target = await self._get_collection(collection)
+        result = await self._run_io(
+            target.query,
+            query_embeddings=[list(query_embedding)],
             n_results=k,
+            include=include,
         )
+        return self._to_items(result, 0)
+
+    async def search_many(
+            self,
+            queries: Sequence[str],
+            k: int = 15,
+            collection: Optional[str] = None,
+    ) -> List[List[Dict[str, Any]]]:
 
-        ids = result.get("ids", [[]])[0]
-        docs = result.get("documents", [[]])[0]
-        metadatas = result.get("metadatas", [[]])[0]
-        distances = result.get("distances", [[]])[0]
+        if not queries:
+            return []
 
-        items: List[Dict[str, Any]] = []
-        for doc_id, text, metadata, distance in zip(
-                ids,
-                docs,
-                metadatas,
-                distances,
-        ):
-            items.append(
-                {
-                    "id": doc_id,
-                    "text": text,
-                    "metadata": metadata or {},
-                    "score": float(distance),
-                },
+        query_embeddings = await self._embed_batch(queries)
+
+        target = await self._get_collection(collection)
+        result = await self._run_io(
+            target.query,
+            query_embeddings=query_embeddings,
+            n_results=k,
+        )
+        return [self._to_items(result, index) for index in range(len(queries))]
+
+    async def _get_collection(self, name: Optional[str] = None) -> "Collection":
+
+        name = name or self._default_collection
+        with self._collections_lock:
+            entry = self._collections.get(name)
+            if entry is not None:
+                entry[1] = time.monotonic()
+                self._collections.move_to_end(name)
+                self._evict_collections()
+                return entry[0]
+
+        opened = await self._run_io(self._client.get_or_create_collection, name=name)
+
+        with self._collections_lock:
+            entry = self._collections.setdefault(name, [opened, time.monotonic()])
+            self._collections.move_to_end(name)
+            self._evict_collections()
+            return entry[0]
+
+    def close_idle_collections(self) -> None:
+
+        with self._collections_lock:
+            self._evict_collections()
+
+    def _evict_collections(self) -> None:
+
+        now = time.monotonic()
+        for name in list(self._collections):
+            if name == self._default_collection:
+                continue
+            idle_expired = (
+                self._collection_idle_ttl is not None
+                and now - self._collections[name][1] > self._collection_idle_ttl
             )
-        return items
+            if idle_expired or len(self._collections) > self._max_open_collections:
+                del self._collections[name]
+                logger.debug("Коллекция '{}' закрыта по простою", name)
 
-    async def _embed(self, text: str) -> List[float]:
+    async def _run_io(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
 
         loop = asyncio.get_running_loop()
-        embedding = await loop.run_in_executor(
-            None,
-            lambda: self._model.encode(
-                text,
-                show_progress_bar=False,
-                normalize_embeddings=True,
-            ).tolist(),
+        return await loop.run_in_executor(
+            self._io_executor,
+            lambda: func(*args, **kwargs),
         )
-        return embedding
+
+    @staticmethod
+    def _to_items(result: Dict[str, Any], index: int) -> List[Dict[str, Any]]:
+
+        def column(name: str) -> List[Any]:
+            values = result.get(name)
+            if values is None or index >= len(values) or values[index] is None:
+                return []
+            return values[index]
+
+        embeddings = column("embeddings")
+
+        items: List[Dict[str, Any]] = []
+        for position, (doc_id, text, metadata, distance) in enumerate(zip(
+                column("ids"),
+                column("documents"),
+                column("metadatas"),
+                column("distances"),
+        )):
+            item: Dict[str, Any] = {
+                "id": doc_id,
+                "text": text,
+                "metadata": metadata or {},
+                "score": float(distance),
+            }
+            if position < len(embeddings):
+                item["embedding"] = [float(x) for x in embeddings[position]]
+            items.append(item)
+        return items
+
+    async def warmup(self, collections: Optional[Sequence[Optional[str]]] = None) -> None:
+
+        embedding = await self._embed("warmup")
+        for name in collections or [None]:
+            target = await self._get_collection(name)
+            if await self._run_io(target.count):
+                await self.search_by_embedding(embedding, k=1, collection=name)
+
+    def collection_version(self, collection: Optional[str] = None) -> int:
+
+        return self._versions.get(collection or self._default_collection, 0)
+
+    def _bump_version(self, collection: Optional[str]) -> None:
+
+        name = collection or self._default_collection
+        self._versions[name] = self._versions.get(name, 0) + 1
+
+    async def embed_query(self, query: str) -> List[float]:
+
+        return await self._embed(query)
+
+    async def embed_documents(self, texts: Sequence[str]) -> List[List[float]]:
+
+        return await self._embed_batch(texts)
+
+    async def _embed(self, text: str) -> List[float]:
+
+        return await self._batcher.embed(text)
 
     async def _embed_batch(self, texts: Sequence[str]) -> List[List[float]]:
 
-        loop = asyncio.get_running_loop()
-        embeddings = await loop.run_in_executor(
-            None,
-            lambda: self._model.encode(
-                list(texts),
-                show_progress_bar=False,
-                normalize_embeddings=True,
-            ).tolist(),
-        )
-        return embeddings
+        return await self._batcher.embed_many(texts)
 
     @staticmethod
     def _normalize_metadata(meta: Optional[Dict[str, Any]]) -> Dict[str, Any]:
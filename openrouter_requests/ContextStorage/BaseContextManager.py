@@ -1,18 +1,47 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Union
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
 import base64
 
 
+class Segment(NamedTuple):
+    messages: Tuple[Dict[str, Any], ...]
+    parent: Optional["Segment"]
+    length: int
+    depth: int
+
+
+class ContextSnapshot(NamedTuple):
+    dialog_id: Optional[str]
+    segment: Optional[Segment]
+    start: int = 0
+    pinned: Tuple[Dict[str, Any], ...] = ()
+    overrides: Tuple[Tuple[str, Optional[Dict[str, Any]]], ...] = ()
+
+
 class BaseContextManager(ABC):
+    supports_dialogs: bool = False
 
     @abstractmethod
     async def add_message(self, message: Dict[str, Any]) -> None:
         pass
 
     @abstractmethod
-    async def get_context(self) -> List[Dict[str, Any]]:
+    async def get_context(self, dialog_id: Optional[str] = None) -> List[Dict[str, Any]]:
         pass
 
+    async def add_messages(self, messages: List[Dict[str, Any]]) -> None:
+        for message in messages:
+            await self.add_message(message)
+
+    async def fork(self, dialog_id: Optional[str] = None, new_dialog_id: Optional[str] = None) -> str:
+        raise NotImplementedError(f"{self.__class__.__name__} не поддерживает ветвление диалогов")
+
+    async def snapshot(self, dialog_id: Optional[str] = None) -> ContextSnapshot:
+        raise NotImplementedError(f"{self.__class__.__name__} не поддерживает снимки контекста")
+
+    async def restore(self, snapshot: ContextSnapshot, dialog_id: Optional[str] = None) -> None:
+        raise NotImplementedError(f"{self.__class__.__name__} не поддерживает восстановление контекста")
+
     async def add_to_context(
             self,
             data: Union[str, List[Dict[str, Any]]],
@@ -32,6 +61,16 @@ class BaseContextManager(ABC):
             image_format: str = "png",
             **extra
     ) -> None:
+        await self.add_message(self.image_message(text, role, image_bytes, image_format, **extra))
+
+    @staticmethod
+    def image_message(
+            text: str,
+            role: str,
+            image_bytes: bytes,
+            image_format: str = "png",
+            **extra
+    ) -> Dict[str, Any]:
         base64_str = base64.b64encode(image_bytes).decode('utf-8')
         mime_type = f"image/{image_format}"
         if image_format.lower() == "jpg":
@@ -46,4 +85,4 @@ class BaseContextManager(ABC):
                 }
             }
         ]
-        await self.add_to_context(content, role, **extra)
\ No newline at end of file
+        return {"role": role, "content": content, **extra}
\ No newline at end of file
@@ -1,10 +1,15 @@
-from typing import Any, Dict, List, Optional
-from openrouter_requests.ContextStorage.BaseContextManager import BaseContextManager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from openrouter_requests.ContextStorage.BaseContextManager import BaseContextManager, ContextSnapshot, Segment
 import threading
 import asyncio
+import uuid
+
+
+MAX_SEGMENT_DEPTH = 32
 
 
 class DictContextManager(BaseContextManager):
+    supports_dialogs = True
     _instance = None
     _instance_lock = threading.Lock()
 
@@ -20,6 +25,10 @@ class DictContextManager(BaseContextManager):
             return
 
         self._dialogs: Dict[str, List[Dict[str, Any]]] = {}
+        self._bases: Dict[str, Segment] = {}
+        self._starts: Dict[str, int] = {}
+        self._pinned: Dict[str, Tuple[Dict[str, Any], ...]] = {}
+        self._overrides: Dict[str, Dict[str, Optional[Dict[str, Any]]]] = {}
         self._max_messages = max_messages
         self._current_dialog_id = default_dialog_id
         self._dialogs.setdefault(default_dialog_id, [])
@@ -46,17 +55,28 @@ class DictContextManager(BaseContextManager):
 
         lock = await self._get_dialog_lock(dialog_id)
         async with lock:
-            self._current_dialog_id = dialog_id
             dialog_messages = self._dialogs.setdefault(dialog_id, [])
             dialog_messages.append(message)
             self._trim_context_sync(dialog_id)
 
+    async def add_messages(self, messages: List[Dict[str, Any]]) -> None:
+        by_dialog: Dict[str, List[Dict[str, Any]]] = {}
+        for message in messages:
+            dialog_id = str(message.get("dialog_id") or self._current_dialog_id)
+            by_dialog.setdefault(dialog_id, []).append(message)
+
+        for dialog_id, dialog_batch in by_dialog.items():
+            lock = await self._get_dialog_lock(dialog_id)
+            async with lock:
+                self._dialogs.setdefault(dialog_id, []).extend(dialog_batch)
+                self._trim_context_sync(dialog_id)
+
     async def get_context(self, dialog_id: Optional[str] = None) -> List[Dict[str, Any]]:
         did = dialog_id or self._current_dialog_id
 
         lock = await self._get_dialog_lock(did)
         async with lock:
-            return list(self._dialogs.get(did, []))
+            return self._messages(did)
 
     async def upsert_tagged_system(
         self,
@@ -68,11 +88,19 @@ class DictContextManager(BaseContextManager):
 
         lock = await self._get_dialog_lock(did)
         async with lock:
+            if self._pin_tagged(did, tag, content):
+                return
+            base_message = self._base_tagged(did, tag)
+            if base_message is not None:
+                current = self._overrides.setdefault(did, {}).get(tag) or base_message
+                self._overrides[did][tag] = {**current, "content": content}
+                self._trim_context_sync(did)
+                return
             messages = self._dialogs.setdefault(did, [])
 
-            for msg in messages:
+            for index, msg in enumerate(messages):
                 if msg.get("role") == "system" and msg.get("_tag") == tag:
-                    msg["content"] = content
+                    messages[index] = {**msg, "content": content}
                     break
             else:
                 messages.append({
@@ -84,28 +112,192 @@ class DictContextManager(BaseContextManager):
 
             self._trim_context_sync(did)
 
+    async def remove_tagged_system(
+        self,
+        tag: str,
+        dialog_id: Optional[str] = None,
+    ) -> None:
+        did = dialog_id or self._current_dialog_id
+
+        lock = await self._get_dialog_lock(did)
+        async with lock:
+            if self._pin_tagged(did, tag, None):
+                return
+            if self._base_tagged(did, tag) is not None:
+                self._overrides.setdefault(did, {})[tag] = None
+                return
+            messages = self._dialogs.get(did)
+            if messages:
+                self._dialogs[did] = [
+                    msg for msg in messages
+                    if not (msg.get("role") == "system" and msg.get("_tag") == tag)
+                ]
+
     async def reset_context(self, dialog_id: Optional[str] = None) -> None:
         did = dialog_id or self._current_dialog_id
         async with self._meta_lock:
             self._dialogs.pop(did, None)
+            self._bases.pop(did, None)
+            self._starts.pop(did, None)
+            self._pinned.pop(did, None)
+            self._overrides.pop(did, None)
             self._dialog_locks.pop(did, None)
 
+    async def fork(self, dialog_id: Optional[str] = None, new_dialog_id: Optional[str] = None) -> str:
+        did = dialog_id or self._current_dialog_id
+        new_id = str(new_dialog_id) if new_dialog_id is not None else uuid.uuid4().hex
+
+        lock = await self._get_dialog_lock(did)
+        async with lock:
+            frozen = self._freeze(did)
+
+        new_lock = await self._get_dialog_lock(new_id)
+        async with new_lock:
+            self._set_base(new_id, frozen)
+        return new_id
+
+    async def snapshot(self, dialog_id: Optional[str] = None) -> ContextSnapshot:
+        did = dialog_id or self._current_dialog_id
+
+        lock = await self._get_dialog_lock(did)
+        async with lock:
+            return self._freeze(did)
+
+    async def restore(self, snapshot: ContextSnapshot, dialog_id: Optional[str] = None) -> None:
+        did = str(dialog_id or snapshot.dialog_id)
+
+        lock = await self._get_dialog_lock(did)
+        async with lock:
+            self._set_base(did, snapshot)
+
+    def _set_base(self, dialog_id: str, snapshot: ContextSnapshot) -> None:
+        if snapshot.segment is None:
+            self._bases.pop(dialog_id, None)
+        else:
+            self._bases[dialog_id] = snapshot.segment
+        self._starts[dialog_id] = snapshot.start if snapshot.segment is not None else 0
+        self._pinned[dialog_id] = snapshot.pinned
+        self._overrides[dialog_id] = dict(snapshot.overrides)
+        self._dialogs[dialog_id] = []
+
+    def _freeze(self, dialog_id: str) -> ContextSnapshot:
+        base = self._bases.get(dialog_id)
+        tail = self._dialogs.get(dialog_id)
+        start = self._starts.get(dialog_id, 0)
+        pinned = self._pinned.get(dialog_id, ())
+        overrides = self._overrides.get(dialog_id, {})
+
+        if tail:
+            if base is not None and base.depth >= MAX_SEGMENT_DEPTH:
+                messages = (*self._overlaid(dialog_id), *tail)
+                base = Segment(messages, None, len(messages), 1)
+                start = 0
+                overrides = {}
+            else:
+                base = Segment(
+                    tuple(tail),
+                    base,
+                    (base.length if base is not None else 0) + len(tail),
+                    (base.depth if base is not None else 0) + 1,
+                )
+
+        snapshot = ContextSnapshot(
+            dialog_id=dialog_id,
+            segment=base,
+            start=start,
+            pinned=pinned,
+            overrides=tuple(overrides.items()),
+        )
+        self._set_base(dialog_id, snapshot)
+        return snapshot
+
+    @staticmethod
+    def _base_messages(base: Optional[Segment], start: int = 0) -> Iterator[Dict[str, Any]]:
+        segments: List[Segment] = []
+        while base is not None:
+            segments.append(base)
+            base = base.parent
+
+        for segment in reversed(segments):
+            if start >= len(segment.messages):
+                start -= len(segment.messages)
+                continue
+            for index in range(start, len(segment.messages)):
+                yield segment.messages[index]
+            start = 0
+
+    def _overlaid(self, dialog_id: str) -> Iterator[Dict[str, Any]]:
+        overrides = self._overrides.get(dialog_id) or {}
+        for msg in self._base_messages(self._bases.get(dialog_id), self._starts.get(dialog_id, 0)):
+            tag = msg.get("_tag") if msg.get("role") == "system" else None
+            if tag is not None and tag in overrides:
+                msg = overrides[tag]
+                if msg is None:
+                    continue
+            yield msg
+
+    def _messages(self, dialog_id: str) -> List[Dict[str, Any]]:
+        return [
+            *self._pinned.get(dialog_id, ()),
+            *self._overlaid(dialog_id),
+            *self._dialogs.get(dialog_id, []),
+        ]
+
+    def _pin_tagged(self, dialog_id: str, tag: str, content: Optional[str]) -> bool:
+        pinned = self._pinned.get(dialog_id, ())
+        for index, msg in enumerate(pinned):
+            if msg.get("role") == "system" and msg.get("_tag") == tag:
+                updated = () if content is None else ({**msg, "content": content},)
+                self._pinned[dialog_id] = (*pinned[:index], *updated, *pinned[index + 1:])
+                return True
+        return False
+
+    def _base_tagged(self, dialog_id: str, tag: str) -> Optional[Dict[str, Any]]:
+        for msg in self._base_messages(self._bases.get(dialog_id), self._starts.get(dialog_id, 0)):
+            if msg.get("role") == "system" and msg.get("_tag") == tag:
+                return msg
+        return None
 
     def _trim_context_sync(self, dialog_id: str) -> None:
-        messages = self._dialogs.get(dialog_id)
-        if not messages or len(messages) <= self._max_messages:
+        base = self._bases.get(dialog_id)
+        tail = self._dialogs.setdefault(dialog_id, [])
+        start = self._starts.get(dialog_id, 0)
+        pinned = self._pinned.get(dialog_id, ())
+        overrides = self._overrides.get(dialog_id, {})
+        base_length = base.length if base is not None else 0
+        hidden = sum(1 for msg in overrides.values() if msg is None)
+
+        overflow = len(pinned) + base_length - start - hidden + len(tail) - self._max_messages
+        if overflow <= 0:
             return
-        system_messages: List[Dict[str, Any]] = []
-        non_system_messages: List[Dict[str, Any]] = []
 
-        for msg in messages:
+        hoisted: List[Dict[str, Any]] = []
+        for msg in self._base_messages(base, start):
+            if overflow <= 0:
+                break
+            start += 1
             if msg.get("role") == "system":
-                system_messages.append(msg)
+                tag = msg.get("_tag")
+                if tag is not None and tag in overrides:
+                    msg = overrides.pop(tag)
+                    if msg is None:
+                        continue
+                hoisted.append(msg)
             else:
-                non_system_messages.append(msg)
+                overflow -= 1
+        if base is not None:
+            self._starts[dialog_id] = start
 
-        overflow = len(system_messages) + len(non_system_messages) - self._max_messages
-        if overflow > 0:
-            non_system_messages = non_system_messages[overflow:]
+        dropped = 0
+        for msg in tail:
+            if overflow <= 0:
+                break
+            dropped += 1
+            if msg.get("role") == "system":
+                hoisted.append(msg)
+            else:
+                overflow -= 1
+        del tail[:dropped]
 
-        self._dialogs[dialog_id] = system_messages + non_system_messages
\ No newline at end of file
+        if hoisted:
+            self._pinned[dialog_id] = (*pinned, *hoisted)
@@ -1,6 +1,6 @@
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
-from openrouter_requests.ContextStorage.BaseContextManager import BaseContextManager
+from openrouter_requests.ContextStorage.BaseContextManager import BaseContextManager, ContextSnapshot, Segment
 
 
 class LinearContextManager(BaseContextManager):
@@ -15,13 +15,23 @@ class LinearContextManager(BaseContextManager):
         self._context.append(message)
         await self._trim_context()
 
-    async def upsert_tagged_system(self, tag: str, content: str) -> None:
+    async def add_messages(self, messages: List[Dict[str, Any]]) -> None:
+
+        self._context.extend(messages)
+        await self._trim_context()
+
+    async def upsert_tagged_system(
+            self,
+            tag: str,
+            content: str,
+            dialog_id: Optional[str] = None,
+    ) -> None:
 
         updated = False
 
-        for msg in self._context:
+        for index, msg in enumerate(self._context):
             if msg.get("role") == "system" and msg.get("_tag") == tag:
-                msg["content"] = content
+                self._context[index] = {**msg, "content": content}
                 updated = True
                 break
 
@@ -36,10 +46,30 @@ class LinearContextManager(BaseContextManager):
 
         await self._trim_context()
 
-    async def get_context(self) -> List[Dict[str, Any]]:
+    async def remove_tagged_system(
+            self,
+            tag: str,
+            dialog_id: Optional[str] = None,
+    ) -> None:
+
+        self._context = [
+            msg for msg in self._context
+            if not (msg.get("role") == "system" and msg.get("_tag") == tag)
+        ]
+
+    async def get_context(self, dialog_id: Optional[str] = None) -> List[Dict[str, Any]]:
 
         return self._context
 
+    async def snapshot(self, dialog_id: Optional[str] = None) -> ContextSnapshot:
+
+        messages = tuple(self._context)
+        return ContextSnapshot(dialog_id=None, segment=Segment(messages, None, len(messages), 1))
+
+    async def restore(self, snapshot: ContextSnapshot, dialog_id: Optional[str] = None) -> None:
+
+        self._context = list(snapshot.segment.messages) if snapshot.segment is not None else []
+
     async def _trim_context(self) -> None:
 
         if len(self._context) <= self._max_messages:
@@ -1,3 +1,4 @@
-from openrouter_requests.ContextStorage.BaseContextManager import BaseContextManager
+from openrouter_requests.ContextStorage.BaseContextManager import BaseContextManager, ContextSnapshot
 from openrouter_requests.ContextStorage.ContextManagerDict import DictContextManager
-from openrouter_requests.ContextStorage.ContextManagerLinear import LinearContextManager
\ No newline at end of file
+from openrouter_requests.ContextStorage.ContextManagerLinear import LinearContextManager
+from openrouter_requests.ContextStorage.write_queue import DialogWriteQueue
\ No newline at end of file
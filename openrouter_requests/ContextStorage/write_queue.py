@@ -0,0 +1,129 @@
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+from loguru import logger
+from openrouter_requests.ContextStorage.BaseContextManager import BaseContextManager
+
+
+DEFAULT_DIALOG = "__default__"
+
+_Operation = Tuple[str, Any]
+
+
+class _DialogWriter:
+
+    def __init__(self) -> None:
+        self.operations: Deque[_Operation] = deque()
+        self.task: Optional[asyncio.Task] = None
+        self.idle = asyncio.Event()
+        self.idle.set()
+        self.error: Optional[BaseException] = None
+
+
+class DialogWriteQueue:
+
+    def __init__(self, context: BaseContextManager, max_batch: int = 64) -> None:
+        self.context = context
+        self.max_batch = max_batch
+        self._writers: Dict[str, _DialogWriter] = {}
+        self.batches = 0
+        self.writes = 0
+
+    def submit_message(self, message: Dict[str, Any], dialog_id: Optional[str] = None) -> None:
+        self._enqueue(dialog_id, ("message", message))
+
+    def submit(
+            self,
+            dialog_id: Optional[str],
+            operation: Callable[..., Awaitable[Any]],
+            /,
+            *args: Any,
+            **kwargs: Any,
+    ) -> None:
+        self._enqueue(dialog_id, ("call", (operation, args, kwargs)))
+
+    async def flush(self, dialog_id: Optional[str] = None) -> None:
+        key = self._key(dialog_id)
+        writer = self._writers.get(key)
+        if writer is None:
+            return
+
+        if writer.operations or writer.task is not None:
+            await writer.idle.wait()
+
+        error, writer.error = writer.error, None
+        if not writer.operations and writer.task is None and self._writers.get(key) is writer:
+            del self._writers[key]
+        if error is not None:
+            raise error
+
+    async def flush_all(self) -> None:
+        for dialog_id in list(self._writers):
+            await self.flush(dialog_id)
+
+    def pending(self, dialog_id: Optional[str] = None) -> int:
+        writer = self._writers.get(self._key(dialog_id))
+        return len(writer.operations) if writer is not None else 0
+
+    def _enqueue(self, dialog_id: Optional[str], operation: _Operation) -> None:
+        key = self._key(dialog_id)
+        writer = self._writers.get(key)
+        if writer is None:
+            writer = self._writers[key] = _DialogWriter()
+
+        writer.operations.append(operation)
+        writer.idle.clear()
+        if writer.task is None:
+            writer.task = asyncio.get_running_loop().create_task(self._drain(key, writer))
+
+    async def _drain(self, key: str, writer: _DialogWriter) -> None:
+        try:
+            while writer.operations:
+                batch: List[_Operation] = []
+                while writer.operations and len(batch) < self.max_batch:
+                    batch.append(writer.operations.popleft())
+                await self._apply(key, writer, batch)
+        finally:
+            writer.task = None
+            writer.idle.set()
+            if not writer.operations and writer.error is None and self._writers.get(key) is writer:
+                del self._writers[key]
+
+    async def _apply(self, key: str, writer: _DialogWriter, batch: List[_Operation]) -> None:
+        messages: List[Dict[str, Any]] = []
+        self.batches += 1
+
+        for kind, payload in batch:
+            if kind == "message":
+                messages.append(payload)
+                continue
+
+            if messages:
+                await self._run(key, writer, self.context.add_messages, messages)
+            messages = []
+            operation, args, kwargs = payload
+            await self._run(key, writer, operation, *args, **kwargs)
+
+        if messages:
+            await self._run(key, writer, self.context.add_messages, messages)
+
+    async def _run(
+            self,
+            key: str,
+            writer: _DialogWriter,
+            operation: Callable[..., Awaitable[Any]],
+            /,
+            *args: Any,
+            **kwargs: Any,
+    ) -> None:
+        try:
+            await operation(*args, **kwargs)
+            self.writes += 1
+        except Exception as exc:
+            logger.exception("Ошибка записи в контекст диалога '{}'", key)
+            if writer.error is None:
+                writer.error = exc
+
+    @staticmethod
+    def _key(dialog_id: Optional[str]) -> str:
+        return DEFAULT_DIALOG if dialog_id is None else str(dialog_id)
\ No newline at end of file
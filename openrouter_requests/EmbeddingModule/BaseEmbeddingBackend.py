@@ -0,0 +1,9 @@
+from abc import ABC, abstractmethod
+from typing import List
+
+
+class BaseEmbeddingBackend(ABC):
+
+    @abstractmethod
+    def encode(self, texts: List[str]) -> List[List[float]]:
+        pass
\ No newline at end of file
@@ -0,0 +1,3 @@
+from openrouter_requests.EmbeddingModule.BaseEmbeddingBackend import BaseEmbeddingBackend
+from openrouter_requests.EmbeddingModule.backend_factory import create_embedding_backend
+from openrouter_requests.EmbeddingModule.embedding_batcher import EmbeddingBatcher
\ No newline at end of file
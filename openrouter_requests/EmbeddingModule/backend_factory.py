@@ -0,0 +1,30 @@
+from typing import Any, Union
+from openrouter_requests.EmbeddingModule.BaseEmbeddingBackend import BaseEmbeddingBackend
+
+
+BACKEND_NAMES = ("torch", "onnx", "onnx-int8")
+
+
+def create_embedding_backend(
+        backend: Union[str, BaseEmbeddingBackend, None],
+        model_name: str,
+        **kwargs: Any,
+) -> BaseEmbeddingBackend:
+    if isinstance(backend, BaseEmbeddingBackend):
+        return backend
+
+    if backend is None or backend == "torch":
+        from openrouter_requests.EmbeddingModule.sentence_transformer_backend import SentenceTransformerBackend
+        return SentenceTransformerBackend(model_name=model_name, **kwargs)
+
+    if backend in ("onnx", "onnx-int8"):
+        from openrouter_requests.EmbeddingModule.onnx_backend import OnnxEmbeddingBackend
+        return OnnxEmbeddingBackend(
+            model_name=model_name,
+            quantize=backend == "onnx-int8",
+            **kwargs,
+        )
+
+    raise ValueError(
+        f"Неизвестный бэкенд эмбеддингов '{backend}', доступны: {', '.join(BACKEND_NAMES)}"
+    )
\ No newline at end of file
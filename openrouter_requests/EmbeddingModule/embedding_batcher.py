@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Sequence, Tuple
+from loguru import logger
+
+
+EncodeFn = Callable[[List[str]], List[List[float]]]
+
+
+class EmbeddingBatcher:
+
+    def __init__(
+            self,
+            encode: EncodeFn,
+            max_batch_size: int = 64,
+            max_delay: float = 0.005,
+    ) -> None:
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size должен быть >= 1")
+        if max_delay < 0:
+            raise ValueError("max_delay не может быть отрицательным")
+
+        self._encode = encode
+        self._max_batch_size = max_batch_size
+        self._max_delay = max_delay
+        self._executor = ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix="embedding-batcher",
+        )
+        self._queue: Optional[asyncio.Queue[Tuple[str, asyncio.Future]]] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def embed(self, text: str) -> List[float]:
+        queue = self._ensure_worker()
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        queue.put_nowait((text, future))
+        return await future
+
+    async def embed_many(self, texts: Sequence[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._encode, list(texts))
+
+    def close(self) -> None:
+        if self._worker is not None and not self._worker.done():
+            self._worker.cancel()
+        self._worker = None
+        self._queue = None
+        self._loop = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _ensure_worker(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run(self._queue))
+        return self._queue
+
+    async def _collect(
+            self,
+            queue: asyncio.Queue,
+            batch: List[Tuple[str, asyncio.Future]],
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        batch.append(await queue.get())
+        deadline = loop.time() + self._max_delay
+
+        while len(batch) < self._max_batch_size:
+            if not queue.empty():
+                batch.append(queue.get_nowait())
+                continue
+
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+
+    async def _run(self, queue: asyncio.Queue) -> None:
+        loop = asyncio.get_running_loop()
+        batch: List[Tuple[str, asyncio.Future]] = []
+        try:
+            while True:
+                batch = []
+                await self._collect(queue, batch)
+                pending = [(text, future) for text, future in batch if not future.done()]
+                if not pending:
+                    continue
+
+                try:
+                    embeddings = await loop.run_in_executor(
+                        self._executor,
+                        self._encode,
+                        [text for text, _ in pending],
+                    )
+                except Exception as exc:
+                    logger.error("Ошибка батчевого эмбеддинга ({} текстов): {}", len(pending), exc)
+                    self._fail(pending, exc)
+                    continue
+
+                for (_, future), embedding in zip(pending, embeddings):
+                    if not future.done():
+                        future.set_result(embedding)
+        finally:
+            while not queue.empty():
+                batch.append(queue.get_nowait())
+            self._fail(batch, RuntimeError("Батчер эмбеддингов остановлен"))
+
+    @staticmethod
+    def _fail(batch: List[Tuple[str, asyncio.Future]], exc: BaseException) -> None:
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(exc)
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import List, Optional
+import numpy as np
+from loguru import logger
+from openrouter_requests.EmbeddingModule.BaseEmbeddingBackend import BaseEmbeddingBackend
+
+
+DEFAULT_CACHE_DIR = Path(
+    os.environ.get(
+        "OPENROUTER_REQUESTS_CACHE",
+        Path.home() / ".cache" / "openrouter_requests",
+    )
+) / "onnx"
+
+
+class OnnxEmbeddingBackend(BaseEmbeddingBackend):
+
+    def __init__(
+            self,
+            model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+            quantize: bool = False,
+            model_dir: Optional[str] = None,
+            cache_dir: Optional[str] = None,
+            max_length: int = 256,
+            batch_size: int = 64,
+            intra_op_threads: Optional[int] = None,
+    ) -> None:
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        source_dir = Path(model_dir) if model_dir else self._download(model_name)
+        model_path = source_dir / "onnx" / "model.onnx"
+        if not model_path.exists():
+            model_path = source_dir / "model.onnx"
+        if not model_path.exists():
+            raise FileNotFoundError(f"Не найден ONNX-файл модели в {source_dir}")
+
+        if quantize:
+            target_dir = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR / model_name.replace("/", "__")
+            model_path = self._quantize(model_path, target_dir / "model_int8.onnx")
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads is not None:
+            options.intra_op_num_threads = intra_op_threads
+
+        self._session = ort.InferenceSession(
+            str(model_path),
+            sess_options=options,
+            providers=["CPUExecutionProvider"],
+        )
+        self._input_names = {item.name for item in self._session.get_inputs()}
+
+        self._tokenizer = Tokenizer.from_file(str(source_dir / "tokenizer.json"))
+        self._tokenizer.enable_truncation(max_length=max_length)
+        self._tokenizer.enable_padding(
+            pad_id=self._tokenizer.token_to_id("[PAD]") or 0,
+            pad_token="[PAD]",
+        )
+        self._batch_size = batch_size
+        self.model_path = str(model_path)
+        logger.success(
+            "Инициализирован класс {} с параметрками {}",
+            self.__class__.__name__,
+            self.__dict__
+        )
+
+    def encode(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        result: List[Optional[List[float]]] = [None] * len(texts)
+
+        for start in range(0, len(order), self._batch_size):
+            chunk = order[start:start + self._batch_size]
+            embeddings = self._encode_batch([texts[i] for i in chunk])
+            for index, embedding in zip(chunk, embeddings.tolist()):
+                result[index] = embedding
+
+        return result
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        encoded = self._tokenizer.encode_batch(texts)
+        input_ids = np.array([item.ids for item in encoded], dtype=np.int64)
+        attention_mask = np.array([item.attention_mask for item in encoded], dtype=np.int64)
+
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self._input_names:
+            feeds["token_type_ids"] = np.array([item.type_ids for item in encoded], dtype=np.int64)
+
+        token_embeddings = self._session.run(None, feeds)[0]
+
+        mask = attention_mask[..., None].astype(np.float32)
+        summed = (token_embeddings * mask).sum(axis=1)
+        counts = np.clip(mask.sum(axis=1), 1e-9, None)
+        pooled = summed / counts
+
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return pooled / np.clip(norms, 1e-12, None)
+
+    @staticmethod
+    def _download(model_name: str) -> Path:
+        from huggingface_hub import snapshot_download
+
+        return Path(
+            snapshot_download(
+                repo_id=model_name,
+                allow_patterns=["onnx/model.onnx", "tokenizer.json", "*.txt", "*config*.json"],
+            )
+        )
+
+    @staticmethod
+    def _quantize(source: Path, target: Path) -> Path:
+        if target.exists():
+            return target
+
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_target = target.with_suffix(".tmp.onnx")
+        quantize_dynamic(
+            model_input=str(source),
+            model_output=str(tmp_target),
+            weight_type=QuantType.QInt8,
+        )
+        tmp_target.replace(target)
+        logger.info("Квантизованная int8-модель сохранена в {}", target)
+        return target
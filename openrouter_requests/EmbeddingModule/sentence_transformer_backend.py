@@ -0,0 +1,30 @@
+from typing import List
+from loguru import logger
+from openrouter_requests.EmbeddingModule.BaseEmbeddingBackend import BaseEmbeddingBackend
+
+
+class SentenceTransformerBackend(BaseEmbeddingBackend):
+
+    def __init__(
+            self,
+            model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+            device: str = "cpu",
+            batch_size: int = 64,
+    ) -> None:
+        from sentence_transformers import SentenceTransformer
+
+        self._model = SentenceTransformer(model_name, device=device)
+        self._batch_size = batch_size
+        logger.success(
+            "Инициализирован класс {} с параметрками {}",
+            self.__class__.__name__,
+            self.__dict__
+        )
+
+    def encode(self, texts: List[str]) -> List[List[float]]:
+        return self._model.encode(
+            texts,
+            batch_size=self._batch_size,
+            show_progress_bar=False,
+            normalize_embeddings=True,
+        ).tolist()
@@ -0,0 +1 @@
+from openrouter_requests.NumpyIndex.numpy_vector_store import NumpyVectorStore
\ No newline at end of file
@@ -0,0 +1,366 @@
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+import numpy as np
+from loguru import logger
+
+
+EMBEDDINGS_FILE = "embeddings.bin"
+SPANS_FILE = "spans.bin"
+DOCUMENTS_FILE = "documents.jsonl"
+IDS_FILE = "ids.jsonl"
+CENTROIDS_FILE = "ivf_centroids.npy"
+IVF_OFFSETS_FILE = "ivf_offsets.npy"
+META_FILE = "meta.json"
+
+
+class _IndexState(NamedTuple):
+    embeddings: Optional[np.ndarray]
+    spans: Optional[np.ndarray]
+    documents: Optional[mmap.mmap]
+    centroids: Optional[np.ndarray]
+    ivf_offsets: Optional[np.ndarray]
+    indexed_rows: int
+
+    @property
+    def size(self) -> int:
+        return 0 if self.embeddings is None else int(self.embeddings.shape[0])
+
+
+class MmapIndex:
+
+    def __init__(
+            self,
+            path: Path,
+            dtype: str = "float16",
+            nprobe: int = 8,
+            block_rows: int = 65536,
+    ) -> None:
+        self._path = Path(path)
+        self._path.mkdir(parents=True, exist_ok=True)
+        self._dtype = np.dtype(dtype)
+        if self._dtype not in (np.float16, np.float32):
+            raise ValueError("dtype должен быть float16 или float32")
+
+        self._nprobe = nprobe
+        self._block_rows = block_rows
+        self._write_lock = threading.Lock()
+        self._ids: Optional[Set[str]] = None
+        self._state = self._load()
+
+    def __len__(self) -> int:
+        return self._state.size
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self._dtype
+
+    @property
+    def has_ivf(self) -> bool:
+        return self._state.centroids is not None
+
+    def _load(self) -> _IndexState:
+        meta = self._read_meta()
+        if "dtype" in meta and np.dtype(meta["dtype"]) != self._dtype:
+            raise ValueError(
+                f"Индекс '{self._path}' хранится в {meta['dtype']}, а запрошен dtype {self._dtype.name}"
+            )
+
+        rows = int(meta.get("count", 0))
+        if rows == 0:
+            return _IndexState(None, None, None, None, None, 0)
+
+        embeddings = np.memmap(
+            self._path / EMBEDDINGS_FILE, dtype=self._dtype, mode="r", shape=(rows, int(meta["dim"])),
+        )
+        spans = np.memmap(self._path / SPANS_FILE, dtype=np.int64, mode="r", shape=(rows, 2))
+
+        with open(self._path / DOCUMENTS_FILE, "rb") as fh:
+            documents = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+        centroids = None
+        ivf_offsets = None
+        if meta.get("ivf") and (self._path / CENTROIDS_FILE).exists():
+            centroids = np.load(self._path / CENTROIDS_FILE)
+            ivf_offsets = np.load(self._path / IVF_OFFSETS_FILE)
+
+        return _IndexState(
+            embeddings=embeddings,
+            spans=spans,
+            documents=documents,
+            centroids=centroids,
+            ivf_offsets=ivf_offsets,
+            indexed_rows=int(meta.get("indexed_rows", 0)) if centroids is not None else 0,
+        )
+
+    def _read_meta(self) -> Dict[str, Any]:
+        meta_path = self._path / META_FILE
+        return json.loads(meta_path.read_text(encoding="utf-8")) if meta_path.exists() else {}
+
+    def _write_meta(self, **values: Any) -> None:
+        meta_path = self._path / META_FILE
+        meta = self._read_meta()
+        meta.update(values)
+        tmp_path = meta_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, meta_path)
+
+    def _known_ids(self) -> Set[str]:
+        if self._ids is None:
+            committed = int(self._read_meta().get("ids_bytes", 0))
+            self._ids = set()
+            if committed:
+                with open(self._path / IDS_FILE, "rb") as fh:
+                    self._ids = {json.loads(line) for line in fh.read(committed).splitlines()}
+        return self._ids
+
+    def append(
+            self,
+            ids: List[str],
+            texts: List[str],
+            metadatas: List[Optional[Dict[str, Any]]],
+            embeddings: np.ndarray,
+    ) -> None:
+        with self._write_lock:
+            known = self._known_ids()
+            duplicates = [doc_id for doc_id in ids if doc_id in known]
+            if duplicates or len(set(ids)) != len(ids):
+                raise ValueError(f"Документы с такими id уже существуют: {duplicates[:5]}")
+
+            meta = self._read_meta()
+            start_row = int(meta.get("count", 0))
+            dim = embeddings.shape[1]
+            if start_row and int(meta["dim"]) != dim:
+                raise ValueError(f"Размерность эмбеддингов {dim} не совпадает с индексом ({meta['dim']})")
+
+            documents_bytes = int(meta.get("documents_bytes", 0))
+            spans: List[Tuple[int, int]] = []
+            lines: List[bytes] = []
+            offset = documents_bytes
+            for doc_id, text, metadata in zip(ids, texts, metadatas):
+                line = json.dumps(
+                    {"id": doc_id, "text": text, "metadata": metadata or {}},
+                    ensure_ascii=False,
+                ).encode("utf-8") + b"\n"
+                lines.append(line)
+                spans.append((offset, len(line)))
+                offset += len(line)
+
+            rows = start_row + len(ids)
+            documents_bytes = self._append_file(DOCUMENTS_FILE, documents_bytes, b"".join(lines))
+            ids_bytes = self._append_file(
+                IDS_FILE,
+                int(meta.get("ids_bytes", 0)),
+                b"".join(json.dumps(doc_id, ensure_ascii=False).encode("utf-8") + b"\n" for doc_id in ids),
+            )
+            self._append_file(SPANS_FILE, start_row * 16, np.asarray(spans, dtype=np.int64).tobytes())
+            self._append_file(
+                EMBEDDINGS_FILE,
+                start_row * dim * self._dtype.itemsize,
+                np.ascontiguousarray(self._normalize(embeddings).astype(self._dtype)).tobytes(),
+            )
+
+            self._write_meta(
+                dim=dim,
+                dtype=self._dtype.name,
+                count=rows,
+                documents_bytes=documents_bytes,
+                ids_bytes=ids_bytes,
+            )
+            known.update(ids)
+            self._state = self._load()
+
+            if self._state.centroids is not None:
+                logger.info(
+                    "В индекс добавлено {} строк вне IVF-кластеров, они ищутся полным перебором "
+                    "до следующего build_ivf",
+                    rows - self._state.indexed_rows,
+                )
+
+    def _append_file(self, name: str, committed: int, data: bytes) -> int:
+        with open(self._path / name, "ab") as fh:
+            fh.truncate(committed)
+            fh.write(data)
+        return committed + len(data)
+
+    def _save_array(self, name: str, array: np.ndarray) -> None:
+        tmp_path = self._path / (name + ".tmp")
+        with open(tmp_path, "wb") as fh:
+            np.save(fh, array)
+        os.replace(tmp_path, self._path / name)
+
+    def _save_raw(self, name: str, blocks: Any) -> None:
+        tmp_path = self._path / (name + ".tmp")
+        with open(tmp_path, "wb") as fh:
+            for block in blocks:
+                fh.write(np.ascontiguousarray(block).tobytes())
+        os.replace(tmp_path, self._path / name)
+
+    def build_ivf(
+            self,
+            n_clusters: Optional[int],
+            iterations: int,
+            sample_size: int,
+            seed: int,
+    ) -> None:
+        with self._write_lock:
+            state = self._state
+            rows = state.size
+            if rows == 0:
+                raise ValueError("Индекс пуст, строить IVF не из чего")
+
+            n_clusters = min(n_clusters or max(1, int(np.sqrt(rows))), rows)
+            rng = np.random.default_rng(seed)
+            sample_rows = np.sort(rng.choice(rows, size=min(sample_size, rows), replace=False))
+            sample = np.asarray(state.embeddings[sample_rows], dtype=np.float32)
+
+            centroids = sample[rng.choice(sample.shape[0], size=n_clusters, replace=False)].copy()
+            for _ in range(iterations):
+                assignment = self._assign(sample, centroids)
+                sums = np.zeros_like(centroids)
+                np.add.at(sums, assignment, sample)
+                counts = np.bincount(assignment, minlength=n_clusters)
+                empty = counts == 0
+                if empty.any():
+                    sums[empty] = sample[rng.choice(sample.shape[0], size=int(empty.sum()))]
+                centroids = self._normalize(sums)
+
+            assignment = np.concatenate([
+                self._assign(
+                    np.asarray(state.embeddings[start:start + self._block_rows], dtype=np.float32),
+                    centroids,
+                )
+                for start in range(0, rows, self._block_rows)
+            ])
+            order = np.argsort(assignment, kind="stable")
+            ivf_offsets = np.concatenate([
+                [0],
+                np.cumsum(np.bincount(assignment, minlength=n_clusters)),
+            ]).astype(np.int64)
+
+            self._save_raw(EMBEDDINGS_FILE, (
+                state.embeddings[order[start:start + self._block_rows]]
+                for start in range(0, rows, self._block_rows)
+            ))
+            self._save_raw(SPANS_FILE, [np.asarray(state.spans)[order]])
+            self._save_array(CENTROIDS_FILE, centroids.astype(np.float32))
+            self._save_array(IVF_OFFSETS_FILE, ivf_offsets)
+            self._write_meta(ivf=True, n_clusters=n_clusters, indexed_rows=rows)
+
+            self._state = self._load()
+            logger.success("IVF-индекс построен: {} строк, {} кластеров", rows, n_clusters)
+
+    def _assign(self, vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        return np.concatenate([
+            np.argmax(vectors[start:start + self._block_rows] @ centroids.T, axis=1)
+            for start in range(0, vectors.shape[0], self._block_rows)
+        ])
+
+    def search(
+            self,
+            queries: np.ndarray,
+            k: int,
+            include_embeddings: bool = False,
+    ) -> List[List[Dict[str, Any]]]:
+        state = self._state
+        if state.size == 0 or k <= 0:
+            return [[] for _ in range(queries.shape[0])]
+
+        queries = self._normalize(queries.astype(np.float32))
+
+        if state.centroids is None:
+            scores, rows = self._scan(state, queries, [(0, state.size)], k)
+        else:
+            per_query = [
+                self._scan(state, query[None, :], self._probe_ranges(state, query), k)
+                for query in queries
+            ]
+            scores = [item[0][0] for item in per_query]
+            rows = [item[1][0] for item in per_query]
+
+        return [
+            [
+                self._to_item(state, int(row), float(score), include_embeddings)
+                for score, row in zip(query_scores, query_rows)
+            ]
+            for query_scores, query_rows in zip(scores, rows)
+        ]
+
+    def _probe_ranges(self, state: _IndexState, query: np.ndarray) -> List[Tuple[int, int]]:
+        centroid_scores = state.centroids @ query
+        nprobe = min(self._nprobe, centroid_scores.shape[0])
+        clusters = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+
+        ranges = [
+            (int(state.ivf_offsets[c]), int(state.ivf_offsets[c + 1]))
+            for c in np.sort(clusters)
+        ]
+        if state.indexed_rows < state.size:
+            ranges.append((state.indexed_rows, state.size))
+        return ranges
+
+    def _scan(
+            self,
+            state: _IndexState,
+            queries: np.ndarray,
+            ranges: List[Tuple[int, int]],
+            k: int,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        best_scores = np.empty((queries.shape[0], 0), dtype=np.float32)
+        best_rows = np.empty((queries.shape[0], 0), dtype=np.int64)
+
+        for range_start, range_end in ranges:
+            for start in range(range_start, range_end, self._block_rows):
+                end = min(start + self._block_rows, range_end)
+                block = np.asarray(state.embeddings[start:end], dtype=np.float32)
+                scores = queries @ block.T
+
+                take = min(k, scores.shape[1])
+                top = np.argpartition(-scores, take - 1, axis=1)[:, :take]
+                best_scores = np.concatenate([best_scores, np.take_along_axis(scores, top, axis=1)], axis=1)
+                best_rows = np.concatenate([best_rows, top + start], axis=1)
+
+                if best_scores.shape[1] > k:
+                    keep = np.argpartition(-best_scores, k - 1, axis=1)[:, :k]
+                    best_scores = np.take_along_axis(best_scores, keep, axis=1)
+                    best_rows = np.take_along_axis(best_rows, keep, axis=1)
+
+        order = np.argsort(-best_scores, axis=1)
+        return np.take_along_axis(best_scores, order, axis=1), np.take_along_axis(best_rows, order, axis=1)
+
+    def _to_item(
+            self,
+            state: _IndexState,
+            row: int,
+            similarity: float,
+            include_embedding: bool = False,
+    ) -> Dict[str, Any]:
+        record = self._read_record(state, row)
+        item: Dict[str, Any] = {
+            "id": record["id"],
+            "text": record["text"],
+            "metadata": record.get("metadata") or {},
+            "score": max(0.0, 2.0 - 2.0 * similarity),
+        }
+        if include_embedding:
+            item["embedding"] = np.asarray(state.embeddings[row], dtype=np.float32).tolist()
+        return item
+
+    @staticmethod
+    def _read_record(state: _IndexState, row: int) -> Dict[str, Any]:
+        offset, length = state.spans[row]
+        return json.loads(state.documents[int(offset):int(offset) + int(length)])
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.clip(norms, 1e-12, None)
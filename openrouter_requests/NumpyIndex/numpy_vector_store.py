@@ -0,0 +1,274 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Union
+import numpy as np
+from loguru import logger
+from openrouter_requests.EmbeddingModule.BaseEmbeddingBackend import BaseEmbeddingBackend
+from openrouter_requests.EmbeddingModule.backend_factory import create_embedding_backend
+from openrouter_requests.EmbeddingModule.embedding_batcher import EmbeddingBatcher
+from openrouter_requests.NumpyIndex.mmap_index import MmapIndex
+
+
+COLLECTIONS_DIR = "collections"
+
+_COLLECTION_NAME = re.compile(r"^[\w.-]+$")
+
+
+class NumpyVectorStore:
+
+    def __init__(
+            self,
+            index_path: str = "./numpy_index",
+            model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+            dtype: str = "float16",
+            embedding_backend: Union[str, BaseEmbeddingBackend, None] = None,
+            embed_batch_size: int = 64,
+            embed_max_delay: float = 0.005,
+            nprobe: int = 8,
+            block_rows: int = 65536,
+            search_workers: int = 2,
+            collection_idle_ttl: Optional[float] = 600.0,
+            max_open_collections: int = 64,
+    ) -> None:
+        self._path = Path(index_path)
+        self._dtype = dtype
+        self._nprobe = nprobe
+        self._block_rows = block_rows
+        self._collection_idle_ttl = collection_idle_ttl
+        self._max_open_collections = max_open_collections
+        self._indexes_lock = threading.Lock()
+        self._indexes: "OrderedDict[str, List[Any]]" = OrderedDict()
+        self._default = MmapIndex(self._path, dtype=dtype, nprobe=nprobe, block_rows=block_rows)
+        self._executor = ThreadPoolExecutor(
+            max_workers=search_workers,
+            thread_name_prefix="numpy-index",
+        )
+        self._versions: Dict[str, int] = {}
+
+        self._backend = create_embedding_backend(
+            embedding_backend,
+            model_name=model_name,
+            batch_size=embed_batch_size,
+        )
+        self._batcher = EmbeddingBatcher(
+            encode=self._backend.encode,
+            max_batch_size=embed_batch_size,
+            max_delay=embed_max_delay,
+        )
+        logger.success(
+            "Инициализирован класс {} с параметрками {}",
+            self.__class__.__name__,
+            {
+                "index_path": str(self._path),
+                "rows": len(self._default),
+                "dtype": self._default.dtype.name,
+                "ivf": self._default.has_ivf,
+            }
+        )
+
+    def __len__(self) -> int:
+        return len(self._default)
+
+    async def add_document(
+            self,
+            doc_id: str,
+            text: str,
+            metadata: Optional[Dict[str, Any]] = None,
+            collection: Optional[str] = None,
+    ) -> None:
+
+        await self.add_documents(
+            ids=[doc_id],
+            texts=[text],
+            metadatas=[metadata] if metadata is not None else None,
+            collection=collection,
+        )
+
+    async def add_documents(
+            self,
+            ids: Sequence[str],
+            texts: Sequence[str],
+            metadatas: Optional[Sequence[Optional[Dict[str, Any]]]] = None,
+            collection: Optional[str] = None,
+    ) -> None:
+
+        if len(ids) != len(texts):
+            raise ValueError("Длины ids и texts должны совпадать")
+
+        if metadatas is not None and len(metadatas) != len(ids):
+            raise ValueError("Длина metadatas должна соответствовать длине ids")
+
+        if not ids:
+            return
+
+        embeddings = await self._batcher.embed_many(texts)
+        async with self._use_index(collection) as index:
+            await self._run(
+                index.append,
+                list(ids),
+                list(texts),
+                list(metadatas) if metadatas is not None else [None] * len(ids),
+                np.asarray(embeddings, dtype=np.float32),
+            )
+        name = collection or ""
+        self._versions[name] = self._versions.get(name, 0) + 1
+
+    async def search(
+            self,
+            query: str,
+            k: int = 15,
+            include_embeddings: bool = False,
+            collection: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+
+        query_embedding = await self._batcher.embed(query)
+        return await self.search_by_embedding(
+            query_embedding,
+            k=k,
+            include_embeddings=include_embeddings,
+            collection=collection,
+        )
+
+    async def search_by_embedding(
+            self,
+            query_embedding: Sequence[float],
+            k: int = 15,
+            include_embeddings: bool = False,
+            collection: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+
+        async with self._use_index(collection) as index:
+            result = await self._run(
+                index.search,
+                np.asarray(query_embedding, dtype=np.float32)[None, :],
+                k,
+                include_embeddings,
+            )
+        return result[0]
+
+    async def search_many(
+            self,
+            queries: Sequence[str],
+            k: int = 15,
+            collection: Optional[str] = None,
+    ) -> List[List[Dict[str, Any]]]:
+
+        if not queries:
+            return []
+
+        query_embeddings = await self._batcher.embed_many(queries)
+        async with self._use_index(collection) as index:
+            return await self._run(
+                index.search,
+                np.asarray(query_embeddings, dtype=np.float32),
+                k,
+            )
+
+    async def warmup(self, collections: Optional[Sequence[Optional[str]]] = None) -> None:
+
+        embedding = await self._batcher.embed("warmup")
+        for name in collections or [None]:
+            await self.search_by_embedding(embedding, k=1, collection=name)
+
+    def collection_version(self, collection: Optional[str] = None) -> int:
+
+        return self._versions.get(collection or "", 0)
+
+    async def embed_query(self, query: str) -> List[float]:
+
+        return await self._batcher.embed(query)
+
+    async def build_ivf(
+            self,
+            n_clusters: Optional[int] = None,
+            iterations: int = 10,
+            sample_size: int = 50000,
+            seed: int = 0,
+            collection: Optional[str] = None,
+    ) -> None:
+
+        async with self._use_index(collection) as index:
+            await self._run(
+                index.build_ivf,
+                n_clusters,
+                iterations,
+                sample_size,
+                seed,
+            )
+
+    async def _run(self, func: Any, *args: Any) -> Any:
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    def close_idle_collections(self) -> None:
+
+        with self._indexes_lock:
+            self._evict_indexes()
+
+    @contextlib.asynccontextmanager
+    async def _use_index(self, name: Optional[str] = None) -> AsyncIterator[MmapIndex]:
+
+        if name is None:
+            yield self._default
+            return
+
+        if not _COLLECTION_NAME.match(name):
+            raise ValueError(f"Недопустимое имя коллекции '{name}'")
+
+        entry = self._acquire(name)
+        if entry is None:
+            opened = await self._run(
+                lambda: MmapIndex(
+                    self._path / COLLECTIONS_DIR / name,
+                    dtype=self._dtype,
+                    nprobe=self._nprobe,
+                    block_rows=self._block_rows,
+                )
+            )
+            with self._indexes_lock:
+                entry = self._indexes.setdefault(name, [opened, time.monotonic(), 0])
+                entry[2] += 1
+                self._indexes.move_to_end(name)
+                self._evict_indexes()
+
+        try:
+            yield entry[0]
+        finally:
+            with self._indexes_lock:
+                entry[1] = time.monotonic()
+                entry[2] -= 1
+
+    def _acquire(self, name: str) -> Optional[List[Any]]:
+
+        with self._indexes_lock:
+            entry = self._indexes.get(name)
+            if entry is not None:
+                entry[1] = time.monotonic()
+                entry[2] += 1
+                self._indexes.move_to_end(name)
+            self._evict_indexes()
+            return entry
+
+    def _evict_indexes(self) -> None:
+
+        now = time.monotonic()
+        for name in list(self._indexes):
+            index, last_used, in_flight = self._indexes[name]
+            if in_flight:
+                continue
+            idle_expired = (
+                self._collection_idle_ttl is not None
+                and now - last_used > self._collection_idle_ttl
+            )
+            if idle_expired or len(self._indexes) > self._max_open_collections:
+                del self._indexes[name]
+                logger.debug("Коллекция '{}' закрыта по простою", name)
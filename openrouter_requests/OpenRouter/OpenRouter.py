@@ -1,22 +1,36 @@
 import inspect
 import json
-from typing import Any, Dict, List, Type, Optional
+from typing import TYPE_CHECKING, Any, AsyncIterator, Awaitable, Callable, Dict, List, Tuple, Type, Optional, Union
 from openrouter_requests.ContextStorage.ContextManagerLinear import LinearContextManager
-from openrouter_requests.ResponseParser.OpenRouterResponseParser import OpenrouterResponseParser
+from openrouter_requests.ResponseParser.OpenRouterResponseParser import OpenrouterResponseParser, RESPONSE_META_FIELDS
 from openrouter_requests.RequestBuilder.OpenrouterRequestBuilder import OpenrouterRequestBuilder
 from openrouter_requests.TransportModule.BaseTransport import Transport
 from openrouter_requests.TransportModule import HttpxProcessor
 from openrouter_requests.ToolsModule.create_tool import Tools
 from openrouter_requests.ToolsModule.tool_runner import ToolRunner
-from openrouter_requests.ChromaDB.vector_base import ChromaVectorStore
-from openrouter_requests.ContextStorage.BaseContextManager import BaseContextManager
+from openrouter_requests.ToolsModule.tool_context import bind_dialog, reset_dialog
+from openrouter_requests.ToolsModule.result_policy import READ_TOOL_RESULT, READ_TOOL_RESULT_SCHEMA, ToolResultPolicy
+from openrouter_requests.ToolsModule.result_store import ToolResultStore
+from openrouter_requests.ContextStorage.BaseContextManager import BaseContextManager, ContextSnapshot
+from openrouter_requests.ContextStorage.write_queue import DialogWriteQueue
 from openrouter_requests.ResponseParser.BaseResponseParser import BaseResponseParser
+from openrouter_requests.RAGModule.context_assembler import RagContextAssembler
+from openrouter_requests.OpenRouter.deadline import Deadline, DeadlineExceeded
+from openrouter_requests.OpenRouter.session import DialogSession
 import threading
 from openrouter_requests.schemas import OpenrouterRequest
 import asyncio
 from loguru import logger
 import time
 
+if TYPE_CHECKING:
+    from openrouter_requests.CacheModule.semantic_cache import SemanticResponseCache
+    from openrouter_requests.ChromaDB.vector_base import ChromaVectorStore
+    from openrouter_requests.NumpyIndex.numpy_vector_store import NumpyVectorStore
+
+    VectorStore = Union[ChromaVectorStore, NumpyVectorStore]
+
+
 class OpenRouter:
     _instance = None
     _lock = threading.Lock()
@@ -33,11 +47,20 @@ class OpenRouter:
             base_url: str = "https://openrouter.ai/api/v1/chat/completions",
             model: str = "deepseek/deepseek-chat-v3-0324",
             api_key: str = None,
-            transport: Type[Transport] = HttpxProcessor,
+            transport: Union[Type[Transport], Transport] = HttpxProcessor,
             context: Type[BaseContextManager] = LinearContextManager,
             parser: Type[BaseResponseParser] = OpenrouterResponseParser,
             tool_class: Type[Tools] = ToolRunner,
-            rag_store: Optional[ChromaVectorStore] = None) -> None:
+            rag_store: Union["VectorStore", bool, None] = None,
+            rag_assembler: Optional[RagContextAssembler] = None,
+            semantic_cache: Optional["SemanticResponseCache"] = None,
+            timeout: Optional[float] = None,
+            deadline_shares: Optional[Dict[str, float]] = None,
+            request_defaults: Optional[Dict[str, Any]] = None,
+            preset: Optional[str] = None,
+            tool_result_policy: Optional[ToolResultPolicy] = None,
+            tool_result_policies: Optional[Dict[str, ToolResultPolicy]] = None,
+            tool_result_store: Optional[ToolResultStore] = None) -> None:
 
         if not hasattr(self, "_initialized") or not self._initialized:
             self.model = model
@@ -45,14 +68,24 @@ class OpenRouter:
                 raise ValueError("Api key is None")
             self.api_key = api_key
             self.base_url = base_url
-            self.request_processor: Transport = transport()
+            self.request_processor: Transport = transport() if isinstance(transport, type) else transport
             self.context = context()
-            self.builder = OpenrouterRequestBuilder()
+            self.write_queue = DialogWriteQueue(self.context)
+            self.builder = OpenrouterRequestBuilder(defaults=request_defaults, preset=preset)
             self.parser = parser()
-            self.rag_module: Optional[ChromaVectorStore] = rag_store or ChromaVectorStore()
+            self.rag_module: Optional["VectorStore"] = self._resolve_rag_store(rag_store)
+            self.rag_assembler: RagContextAssembler = rag_assembler or RagContextAssembler()
+            self.semantic_cache: Optional["SemanticResponseCache"] = semantic_cache
+            self._dialog_collections: Dict[str, str] = {}
+            self.timeout = timeout
+            self.deadline_shares = deadline_shares
+            self.metrics: Dict[str, Any] = {"deadline_exceeded": {}, "cancelled": 0}
             self._tool_class: Type[Tools] = tool_class
             self._tool_instance: Tools = tool_class()
             self._tools_schema: List[Dict[str, Any]] | None = None
+            self.tool_result_policy: ToolResultPolicy = tool_result_policy or ToolResultPolicy()
+            self.tool_result_policies: Dict[str, ToolResultPolicy] = dict(tool_result_policies or {})
+            self._tool_result_store: Optional[ToolResultStore] = tool_result_store
             self.header = {
                 "Authorization": f"Bearer {self.api_key}",
                 "Content-Type": "application/json",
@@ -71,131 +104,112 @@ class OpenRouter:
             dialog_id: Optional[str] = None,
             image: Optional[bytes] = None,
             image_format: Optional[str] = None,
+            collection: Optional[str] = None,
+            rag_prefetch: Optional[Dict[str, Any]] = None,
+            timeout: Optional[float] = None,
+            request_options: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
-        start_time = time.time()
-        tasks: List[asyncio.Task] = []
-
-        if dialog_id is not None and hasattr(self.context, "set_dialog"):
-            tasks.append(asyncio.create_task(self.context.set_dialog(dialog_id)))
-
-        extra: Dict[str, Any] = {}
-        if dialog_id is not None:
-            extra["dialog_id"] = dialog_id
-
-        if image is not None and image_format is not None:
-            tasks.append(
-                asyncio.create_task(
-                    self.context.add_image_to_context(
-                        text=data,
-                        role=role,
-                        image_bytes=image,
-                        image_format=image_format,
-                        **extra
-                    )
-                )
-            )
-        else:
-            tasks.append(
-                asyncio.create_task(
-                    self.context.add_to_context(
-                        data=data,
-                        role=role,
-                        **extra
-                    )
-                )
-            )
-
-        if self.rag_module is not None:
-            rag_docs = await self._rag_search(query=data)
-            tasks.append(
-                asyncio.create_task(
-                    self._add_rag_context(rag_docs, dialog_id=dialog_id)
-                )
+        deadline = Deadline(
+            timeout if timeout is not None else self.timeout,
+            self.deadline_shares,
+        )
+        try:
+            return await self._send(
+                data=data,
+                role=role,
+                dialog_id=dialog_id,
+                image=image,
+                image_format=image_format,
+                collection=collection,
+                rag_prefetch=rag_prefetch,
+                deadline=deadline,
+                request_options=request_options,
             )
+        except asyncio.CancelledError:
+            self.metrics["cancelled"] += 1
+            logger.warning("Запрос отменён, незавершённый ход не записан в контекст")
+            raise
 
-        await asyncio.gather(*tasks, return_exceptions=True)
-
-        payload, tool = await asyncio.gather(
-            self.context.get_context(),
-            self._get_tools_schema()
+    async def _send(
+            self,
+            data: str,
+            role: str,
+            dialog_id: Optional[str],
+            image: Optional[bytes],
+            image_format: Optional[str],
+            collection: Optional[str],
+            rag_prefetch: Optional[Dict[str, Any]],
+            deadline: Deadline,
+            request_options: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        start_time = time.time()
+        turn = await self._prepare_turn(
+            data=data,
+            role=role,
+            dialog_id=dialog_id,
+            image=image,
+            image_format=image_format,
+            collection=collection,
+            rag_prefetch=rag_prefetch,
+            deadline=deadline,
         )
+        rag_tokens = turn["rag_tokens"]
+        cache_key = turn["cache_key"]
+
+        if turn["cached"] is not None:
+            elapsed = time.time() - start_time
+            logger.debug("Ответ из семантического кэша за {:.3f} сек, {}".format(
+                elapsed, self.semantic_cache.stats()))
+            return turn["cached"]
 
         payload = await self.builder.build_request(
             data=OpenrouterRequest(
                 model=self.model,
-                messages=payload,
-                tools=tool
-            )
+                messages=turn["messages"],
+                tools=turn["tools"]
+            ),
+            overrides=request_options,
         )
 
-        response = await self.request_processor.post(
-            url=self.base_url,
-            headers=self.header,
-            payload=payload
-        )
+        response = await self._post(payload, deadline)
 
         parsed = await self.parser.parse(response)
+        parsed["rag_tokens"] = rag_tokens
 
         if parsed["type"] == "message":
-            asyncio.create_task(self._add_assistant_message_to_context(parsed, dialog_id=dialog_id))
+            if cache_key is not None:
+                self.semantic_cache.store(answer=parsed["content"], **cache_key)
+            self._commit_turn(turn, dialog_id)
+            self._submit_assistant_message(parsed, dialog_id=dialog_id)
             elapsed = time.time() - start_time
             logger.debug("Время выполнения запроса: {:.3f} сек".format(elapsed))
             return parsed
 
         if parsed["type"] == "tool_calls":
-            await self.context.add_message({
-                "role": "assistant",
-                "content": None,
-                "tool_calls": [
-                    {
-                        "id": call["id"],
-                        "type": "function",
-                        "function": {
-                            "name": call["name"],
-                            "arguments": call["arguments"],
-                        }
-                    }
-                    for call in parsed["calls"]
-                ],
-                "dialog_id": dialog_id,
-            })
-            tool_results = await asyncio.gather(*[
-                self._run_tool(
-                    func_name=call["name"],
-                    call_id=call["id"],
-                    dialog_id=dialog_id,
-                    **call["arguments"]
-                )
-                for call in parsed["calls"]
-            ])
+            tool_results, pending = await self._run_tool_calls(parsed, dialog_id=dialog_id, deadline=deadline)
 
-            payload, tool = await asyncio.gather(
-                self.context.get_context(),
-                self._get_tools_schema()
-            )
+            payload = [*turn["messages"], *pending]
             logger.debug(payload)
-            logger.debug(tool)
 
             payload_followup = await self.builder.build_request(
                 OpenrouterRequest(
                     model=self.model,
                     messages=payload,
-                    tools=tool
-                )
+                    tools=turn["tools"]
+                ),
+                overrides=request_options,
             )
 
-            response_followup = await self.request_processor.post(
-                url=self.base_url,
-                headers=self.header,
-                payload=payload_followup
-            )
+            response_followup = await self._post(payload_followup, deadline)
 
             parsed_followup = await self.parser.parse(response_followup)
+            self._commit_turn(turn, dialog_id, pending)
 
             if parsed_followup["type"] == "message":
-                asyncio.create_task(self._add_assistant_message_to_context(parsed_followup, dialog_id=dialog_id))
+                self._submit_assistant_message(parsed_followup, dialog_id=dialog_id)
 
             parsed_followup["tool_results"] = tool_results
+            parsed_followup["rag_tokens"] = rag_tokens
             elapsed = time.time() - start_time
             logger.debug("Время выполнения запроса: {:.3f} сек".format(elapsed))
             return parsed_followup
@@ -204,6 +218,181 @@ class OpenRouter:
         logger.debug("Время выполнения запроса: {:.3f} сек".format(elapsed))
         return parsed
 
+    async def send_stream(
+            self,
+            data: str,
+            role: str,
+            dialog_id: Optional[str] = None,
+            collection: Optional[str] = None,
+            rag_prefetch: Optional[Dict[str, Any]] = None,
+            timeout: Optional[float] = None,
+            request_options: Optional[Dict[str, Any]] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        deadline = Deadline(
+            timeout if timeout is not None else self.timeout,
+            self.deadline_shares,
+        )
+        events = self._send_stream(
+            data=data,
+            role=role,
+            dialog_id=dialog_id,
+            collection=collection,
+            rag_prefetch=rag_prefetch,
+            deadline=deadline,
+            request_options=request_options,
+        )
+        completed = False
+        try:
+            async for event in events:
+                completed = event["type"] == "final"
+                yield event
+        except (asyncio.CancelledError, GeneratorExit):
+            if not completed:
+                self.metrics["cancelled"] += 1
+                logger.warning("Потоковый запрос отменён, незавершённый ход не записан в контекст")
+            raise
+        finally:
+            await events.aclose()
+
+    async def _send_stream(
+            self,
+            data: str,
+            role: str,
+            dialog_id: Optional[str],
+            collection: Optional[str],
+            rag_prefetch: Optional[Dict[str, Any]],
+            deadline: Deadline,
+            request_options: Optional[Dict[str, Any]] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        start_time = time.time()
+        turn = await self._prepare_turn(
+            data=data,
+            role=role,
+            dialog_id=dialog_id,
+            collection=collection,
+            rag_prefetch=rag_prefetch,
+            deadline=deadline,
+        )
+        rag_tokens = turn["rag_tokens"]
+        cache_key = turn["cache_key"]
+
+        if turn["cached"] is not None:
+            yield {"type": "delta", "content": turn["cached"]["content"]}
+            yield {"type": "final", "result": turn["cached"]}
+            return
+
+        messages, tool = turn["messages"], turn["tools"]
+        tool_results: List[Dict[str, Any]] = []
+        pending: List[Dict[str, Any]] = []
+
+        while True:
+            payload = await self.builder.build_request(
+                data=OpenrouterRequest(
+                    model=self.model,
+                    messages=messages,
+                    tools=tool,
+                    stream=True
+                ),
+                overrides=request_options,
+            )
+
+            collected: Dict[str, Any] = {}
+            async for chunk in self._stream_completion(payload, collected, deadline):
+                yield chunk
+
+            parsed = await self.parser.parse(collected)
+            if parsed["type"] != "tool_calls" or tool_results:
+                break
+
+            yield {"type": "tool_calls", "calls": parsed["calls"]}
+            tool_results, pending = await self._run_tool_calls(parsed, dialog_id=dialog_id, deadline=deadline)
+            messages = [*turn["messages"], *pending]
+
+        self._commit_turn(turn, dialog_id, pending)
+        parsed["rag_tokens"] = rag_tokens
+        if tool_results:
+            parsed["tool_results"] = tool_results
+
+        if parsed["type"] == "message":
+            if cache_key is not None and not tool_results:
+                self.semantic_cache.store(answer=parsed["content"], **cache_key)
+            self._submit_assistant_message(parsed, dialog_id=dialog_id)
+
+        elapsed = time.time() - start_time
+        logger.debug("Время выполнения потокового запроса: {:.3f} сек".format(elapsed))
+        yield {"type": "final", "result": parsed}
+
+    async def prefetch_rag(
+            self,
+            query: str,
+            collection: Optional[str] = None,
+            dialog_id: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+
+        if self.rag_module is None:
+            return None
+
+        if collection is None and dialog_id is not None:
+            collection = self._dialog_collections.get(str(dialog_id))
+
+        embedding = await self.rag_module.embed_query(query)
+        docs = await self._rag_search(
+            query=query,
+            query_embedding=embedding,
+            collection=collection,
+        )
+        return {
+            "query": query,
+            "collection": collection,
+            "embedding": embedding,
+            "docs": docs,
+        }
+
+    async def warmup(
+            self,
+            parallel: bool = True,
+            collections: Optional[List[Optional[str]]] = None,
+    ) -> Dict[str, float]:
+        start_time = time.perf_counter()
+        components: Dict[str, Callable[[], Awaitable[Any]]] = {
+            "transport": lambda: self.request_processor.warmup(url=self._models_url(), headers=self.header),
+            "tools": self._get_tools_schema,
+        }
+        if self.rag_module is not None and hasattr(self.rag_module, "warmup"):
+            components["rag"] = lambda: self.rag_module.warmup(collections=collections)
+
+        timings: Dict[str, float] = {}
+
+        async def timed(name: str, factory: Callable[[], Awaitable[Any]]) -> None:
+            started = time.perf_counter()
+            await factory()
+            timings[name] = time.perf_counter() - started
+
+        if parallel:
+            results = await asyncio.gather(
+                *(timed(name, factory) for name, factory in components.items()),
+                return_exceptions=True,
+            )
+            errors = [result for result in results if isinstance(result, BaseException)]
+            if errors:
+                raise errors[0]
+        else:
+            for name, factory in components.items():
+                await timed(name, factory)
+
+        timings["total"] = time.perf_counter() - start_time
+        logger.success(
+            "Прогрев {} завершён: {}",
+            self.__class__.__name__,
+            ", ".join(f"{name}={elapsed:.3f}с" for name, elapsed in timings.items()),
+        )
+        return timings
+
+    def _models_url(self) -> str:
+
+        root, separator, _ = self.base_url.rpartition("/chat/completions")
+        return f"{root}/models" if separator else self.base_url
+
     async def add_system_prompt(
             self,
             data: str,
@@ -213,19 +402,403 @@ class OpenRouter:
         extra: Dict[str, Any] = {}
         if dialog_id is not None:
             extra["dialog_id"] = dialog_id
-            if hasattr(self.context, "set_dialog"):
-                await self.context.set_dialog(dialog_id)
 
         if hasattr(self.context, "upsert_tagged_system"):
-            await self.context.upsert_tagged_system(
+            self.write_queue.submit(
+                dialog_id,
+                self.context.upsert_tagged_system,
                 tag="system_prompt",
                 content=data,
                 dialog_id=dialog_id,
             )
         else:
-            await self.context.add_to_context(data=data, role="system", **extra)
+            self.write_queue.submit_message({"role": "system", "content": data, **extra}, dialog_id=dialog_id)
+
+        await self.write_queue.flush(dialog_id)
+
+    async def flush(self, dialog_id: Optional[str] = None) -> None:
+
+        await self.write_queue.flush(dialog_id)
+
+    async def reset_dialog(self, dialog_id: Optional[str] = None) -> None:
 
-    async def _add_assistant_message_to_context(
+        await self.write_queue.flush(dialog_id)
+        if hasattr(self.context, "reset_context"):
+            await self.context.reset_context(dialog_id)
+        elif hasattr(self.context, "reset"):
+            await self.context.reset()
+        if self._tool_result_store is not None:
+            await asyncio.to_thread(self._tool_result_store.drop_dialog, dialog_id)
+
+    async def fork_dialog(self, dialog_id: str, new_dialog_id: Optional[str] = None) -> str:
+
+        self._require_dialogs("ветвления диалогов")
+        await self.write_queue.flush(dialog_id)
+        new_id = await self.context.fork(dialog_id, new_dialog_id)
+
+        collection = self._dialog_collections.get(str(dialog_id))
+        if collection is not None:
+            self.set_dialog_collection(new_id, collection)
+        return new_id
+
+    async def snapshot_dialog(self, dialog_id: Optional[str] = None) -> ContextSnapshot:
+
+        await self.write_queue.flush(dialog_id)
+        return await self.context.snapshot(dialog_id)
+
+    async def restore_dialog(self, snapshot: ContextSnapshot, dialog_id: Optional[str] = None) -> None:
+
+        await self.write_queue.flush(dialog_id if dialog_id is not None else snapshot.dialog_id)
+        await self.context.restore(snapshot, dialog_id)
+
+    def session(self, dialog_id: str, collection: Optional[str] = None) -> DialogSession:
+
+        self._require_dialogs("сессий")
+        if collection is not None:
+            self.set_dialog_collection(dialog_id, collection)
+        return DialogSession(self, dialog_id)
+
+    def _require_dialogs(self, purpose: str) -> None:
+
+        if not self.context.supports_dialogs:
+            raise TypeError(
+                f"{self.context.__class__.__name__} хранит один общий контекст для всех диалогов, "
+                f"для {purpose} передайте context=DictContextManager"
+            )
+
+    def set_dialog_collection(
+            self,
+            dialog_id: str,
+            collection: Optional[str],
+    ) -> None:
+
+        if collection is None:
+            self._dialog_collections.pop(str(dialog_id), None)
+        else:
+            self._dialog_collections[str(dialog_id)] = collection
+
+    @staticmethod
+    def _resolve_rag_store(rag_store: Union["VectorStore", bool, None]) -> Optional["VectorStore"]:
+
+        if rag_store is None or rag_store is False:
+            return None
+        if rag_store is True:
+            from openrouter_requests.ChromaDB.vector_base import ChromaVectorStore
+            return ChromaVectorStore()
+        return rag_store
+
+    async def _prepare_turn(
+            self,
+            data: str,
+            role: str,
+            dialog_id: Optional[str] = None,
+            image: Optional[bytes] = None,
+            image_format: Optional[str] = None,
+            collection: Optional[str] = None,
+            rag_prefetch: Optional[Dict[str, Any]] = None,
+            deadline: Optional[Deadline] = None,
+    ) -> Dict[str, Any]:
+        deadline = deadline or Deadline(None)
+        if collection is None and dialog_id is not None:
+            collection = self._dialog_collections.get(str(dialog_id))
+
+        extra: Dict[str, Any] = {}
+        if dialog_id is not None:
+            extra["dialog_id"] = dialog_id
+
+        if image is not None and image_format is not None:
+            message = self.context.image_message(
+                text=data,
+                role=role,
+                image_bytes=image,
+                image_format=image_format,
+                **extra
+            )
+        else:
+            message = {"role": role, "content": data, **extra}
+
+        rag_tokens = 0
+        rag_block: Dict[str, Any] = {"docs": [], "content": None, "tokens": 0}
+        rag_update: Optional[Dict[str, Any]] = None
+        query_embedding: Optional[List[float]] = None
+        if self.rag_module is not None:
+            if (
+                    rag_prefetch is not None
+                    and rag_prefetch.get("query") == data
+                    and rag_prefetch.get("collection") == collection
+            ):
+                query_embedding = rag_prefetch["embedding"]
+                rag_docs = rag_prefetch["docs"]
+            else:
+                rag_deadline = Deadline(deadline.budget("rag"))
+                try:
+                    query_embedding = await self._within(
+                        "rag",
+                        self.rag_module.embed_query(data),
+                        rag_deadline.remaining(),
+                    )
+                    rag_docs = await self._rag_search(
+                        query=data,
+                        query_embedding=query_embedding,
+                        collection=collection,
+                        timeout=rag_deadline.remaining(),
+                    )
+                except DeadlineExceeded:
+                    logger.warning("RAG-поиск не уложился в бюджет дедлайна, запрос продолжается без контекста")
+                    query_embedding, rag_docs = None, []
+            rag_block = self.rag_assembler.assemble(rag_docs)
+            rag_tokens = rag_block["tokens"]
+            logger.debug(
+                "RAG: найдено {}, в контекст добавлено {} фрагментов, {} токенов",
+                len(rag_docs),
+                len(rag_block["docs"]),
+                rag_tokens,
+            )
+            rag_update = rag_block
+
+        await self.write_queue.flush(dialog_id)
+
+        context, tool = await asyncio.gather(
+            self._get_context(dialog_id),
+            self._get_tools_schema()
+        )
+        payload = self._apply_rag_context([*context, message], rag_update, extra)
+
+        turn: Dict[str, Any] = {
+            "messages": payload,
+            "tools": tool,
+            "rag_tokens": rag_tokens,
+            "cache_key": None,
+            "cached": None,
+            "pending": [message],
+            "rag_update": rag_update,
+        }
+
+        if self.semantic_cache is not None and query_embedding is not None and image is None:
+            history = [msg for msg in context if msg.get("role") != "system"]
+            cache_key = {
+                "system_fingerprint": self.semantic_cache.fingerprint(
+                    msg.get("content")
+                    for msg in payload
+                    if msg.get("role") == "system" and msg.get("_tag") != "rag_context"
+                ),
+                "rag_fingerprint": self.semantic_cache.fingerprint(
+                    [collection, *(doc.get("ID") for doc in rag_block["docs"])]
+                ),
+                "history_fingerprint": self.semantic_cache.fingerprint(
+                    [msg.get("role"), msg.get("content")]
+                    for msg in history
+                ),
+                "embedding": query_embedding,
+                "collection": collection,
+                "kb_version": self.rag_module.collection_version(collection),
+            }
+            turn["cache_key"] = cache_key
+            cached = self.semantic_cache.lookup(**cache_key)
+            if cached is not None:
+                parsed = {
+                    "type": "message",
+                    "role": "assistant",
+                    "content": cached,
+                    "calls": [],
+                    "cached": True,
+                    "rag_tokens": rag_tokens,
+                }
+                self._commit_turn(turn, dialog_id)
+                self._submit_assistant_message(parsed, dialog_id=dialog_id)
+                turn["cached"] = parsed
+
+        return turn
+
+    @staticmethod
+    def _apply_rag_context(
+            messages: List[Dict[str, Any]],
+            rag_block: Optional[Dict[str, Any]],
+            extra: Dict[str, Any],
+    ) -> List[Dict[str, Any]]:
+
+        if rag_block is None:
+            return messages
+
+        content = rag_block.get("content")
+        for index, msg in enumerate(messages):
+            if msg.get("role") == "system" and msg.get("_tag") == "rag_context":
+                if content:
+                    messages[index] = {**msg, "content": content}
+                else:
+                    del messages[index]
+                return messages
+
+        if content:
+            messages.append({"role": "system", "content": content, "_tag": "rag_context", **extra})
+        return messages
+
+    def _commit_turn(
+            self,
+            turn: Dict[str, Any],
+            dialog_id: Optional[str] = None,
+            messages: Optional[List[Dict[str, Any]]] = None,
+    ) -> None:
+
+        for message in turn["pending"]:
+            self.write_queue.submit_message(message, dialog_id=dialog_id)
+        if turn["rag_update"] is not None:
+            self.write_queue.submit(dialog_id, self._add_rag_context, turn["rag_update"], dialog_id=dialog_id)
+        self._commit_messages(messages or [])
+
+    async def _stream_completion(
+            self,
+            payload: Dict[str, Any],
+            collected: Dict[str, Any],
+            deadline: Deadline,
+    ) -> AsyncIterator[Dict[str, Any]]:
+
+        role = "assistant"
+        content: List[str] = []
+        tool_calls: Dict[int, Dict[str, Any]] = {}
+
+        chunks = self.request_processor.stream(
+            url=self.base_url,
+            headers=self.header,
+            payload=payload,
+            timeout=deadline.remaining(),
+        )
+        try:
+            async for chunk in self._iterate_within("transport", chunks, deadline):
+                for key in RESPONSE_META_FIELDS:
+                    if chunk.get(key) is not None:
+                        collected[key] = chunk[key]
+
+                choices = chunk.get("choices") or []
+                if not choices:
+                    continue
+
+                delta = choices[0].get("delta") or {}
+                role = delta.get("role") or role
+
+                text = delta.get("content")
+                if text:
+                    content.append(text)
+                    yield {"type": "delta", "content": text}
+
+                for call_delta in delta.get("tool_calls") or []:
+                    call = tool_calls.setdefault(
+                        call_delta.get("index", len(tool_calls)),
+                        {"id": None, "type": "function", "function": {"name": "", "arguments": ""}},
+                    )
+                    call["id"] = call_delta.get("id") or call["id"]
+                    function_delta = call_delta.get("function") or {}
+                    call["function"]["name"] += function_delta.get("name") or ""
+                    call["function"]["arguments"] += function_delta.get("arguments") or ""
+        finally:
+            await chunks.aclose()
+
+        message: Dict[str, Any] = {"role": role, "content": "".join(content)}
+        if tool_calls:
+            message["tool_calls"] = [tool_calls[index] for index in sorted(tool_calls)]
+        collected["choices"] = [{"message": message}]
+
+    async def _run_tool_calls(
+            self,
+            parsed: Dict[str, Any],
+            dialog_id: Optional[str] = None,
+            deadline: Optional[Deadline] = None,
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+
+        deadline = deadline or Deadline(None)
+        tools_deadline = Deadline(deadline.budget("tools"))
+        pending: List[Dict[str, Any]] = [{
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [
+                {
+                    "id": call["id"],
+                    "type": "function",
+                    "function": {
+                        "name": call["name"],
+                        "arguments": call["arguments"],
+                    }
+                }
+                for call in parsed["calls"]
+            ],
+            "dialog_id": dialog_id,
+        }]
+        tool_results = await asyncio.gather(*[
+            self._run_tool(
+                func_name=call["name"],
+                call_id=call["id"],
+                dialog_id=dialog_id,
+                timeout=tools_deadline.remaining(),
+                **call["arguments"]
+            )
+            for call in parsed["calls"]
+        ])
+        pending.extend(
+            {
+                "role": "tool",
+                "tool_call_id": result["tool_call_id"],
+                "content": result["content"],
+                "dialog_id": dialog_id,
+            }
+            for result in tool_results
+        )
+        return list(tool_results), pending
+
+    def _commit_messages(self, messages: List[Dict[str, Any]]) -> None:
+
+        for message in messages:
+            self.write_queue.submit_message(message, dialog_id=message.get("dialog_id"))
+
+    async def _post(self, payload: Dict[str, Any], deadline: Deadline) -> Any:
+
+        return await self._within(
+            "transport",
+            self.request_processor.post(
+                url=self.base_url,
+                headers=self.header,
+                payload=payload,
+                timeout=deadline.remaining(),
+            ),
+            deadline.remaining(),
+        )
+
+    async def _within(self, stage: str, awaitable: Any, timeout: Optional[float]) -> Any:
+
+        if timeout is None:
+            return await awaitable
+
+        started = time.monotonic()
+        try:
+            if timeout <= 0:
+                raise asyncio.TimeoutError
+            return await asyncio.wait_for(awaitable, timeout)
+        except DeadlineExceeded:
+            raise
+        except asyncio.TimeoutError:
+            if time.monotonic() - started + 1e-3 < timeout:
+                raise
+            if inspect.iscoroutine(awaitable):
+                awaitable.close()
+            exceeded = self.metrics["deadline_exceeded"]
+            exceeded[stage] = exceeded.get(stage, 0) + 1
+            logger.warning("Превышен дедлайн на этапе '{}' ({:.3f} сек)", stage, timeout)
+            raise DeadlineExceeded(stage) from None
+
+    async def _iterate_within(
+            self,
+            stage: str,
+            iterator: AsyncIterator[Any],
+            deadline: Deadline,
+    ) -> AsyncIterator[Any]:
+
+        while True:
+            try:
+                item = await self._within(stage, anext(iterator), deadline.remaining())
+            except StopAsyncIteration:
+                return
+            yield item
+
+    def _submit_assistant_message(
             self,
             parsed: Dict[str, Any],
             dialog_id: Optional[str] = None,
@@ -235,26 +808,103 @@ class OpenRouter:
         if dialog_id is not None:
             extra["dialog_id"] = dialog_id
 
-        asyncio.create_task(self.context.add_to_context(
-            data=parsed["content"],
-            role=parsed.get("role") or "assistant",
-            **extra,
-        ))
+        self.write_queue.submit_message(
+            {
+                "role": parsed.get("role") or "assistant",
+                "content": parsed["content"],
+                **extra,
+            },
+            dialog_id=dialog_id,
+        )
+
+    async def _get_context(self, dialog_id: Optional[str] = None) -> List[Dict[str, Any]]:
+
+        if dialog_id is None:
+            return await self.context.get_context()
+        return await self.context.get_context(dialog_id=str(dialog_id))
 
     async def _get_tools_schema(self) -> List[Dict[str, Any]]:
 
         if self._tools_schema is None:
-            self._tools_schema = await Tools.generate_tools_from_class(
+            schema = await Tools.generate_tools_from_class(
                 self._tool_class,
             )
+            names = {tool["function"]["name"] for tool in schema}
+            if self._stores_tool_results() and READ_TOOL_RESULT not in names:
+                schema.append(READ_TOOL_RESULT_SCHEMA)
+            self._tools_schema = schema
         return self._tools_schema
 
-    async def _rag_search(self, query: str) -> List[Dict[str, Any]]:
+    def _stores_tool_results(self) -> bool:
+
+        policies = [self.tool_result_policy, *self.tool_result_policies.values()]
+        return any(policy.mode in ("store", "summarize") for policy in policies)
+
+    def _get_tool_result_store(self) -> ToolResultStore:
+
+        if self._tool_result_store is None:
+            self._tool_result_store = ToolResultStore()
+        return self._tool_result_store
+
+    def _read_tool_result(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+
+        unknown = sorted(set(arguments) - {"handle", "offset", "limit"})
+        if unknown:
+            return {"error": f"Неизвестные аргументы {READ_TOOL_RESULT}: {', '.join(unknown)}"}
+
+        handle = arguments.get("handle")
+        if not isinstance(handle, str):
+            return {"error": "Аргумент handle обязателен и должен быть строкой"}
+
+        bounds: Dict[str, Optional[int]] = {}
+        for name in ("offset", "limit"):
+            value = arguments.get(name)
+            if isinstance(value, str) and value.strip().isdigit():
+                value = int(value)
+            if value is not None and (isinstance(value, bool) or not isinstance(value, int) or value < 0):
+                return {"error": f"Аргумент {name} должен быть неотрицательным целым числом"}
+            bounds[name] = value
+
+        max_chars = self.tool_result_policy.max_chars
+        limit = max_chars if bounds["limit"] is None else min(bounds["limit"], max_chars)
+        try:
+            page = self._get_tool_result_store().read(handle, offset=bounds["offset"] or 0, limit=limit)
+        except ValueError as exc:
+            return {"error": str(exc)}
+
+        if page is None:
+            return {"error": f"Результат '{handle}' не найден или удалён из хранилища"}
+        return page
+
+    async def _rag_search(
+            self,
+            query: str,
+            query_embedding: Optional[List[float]] = None,
+            collection: Optional[str] = None,
+            timeout: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
 
         if self.rag_module is None:
             return []
 
-        result = await self.rag_module.search(query=query)
+        deadline = Deadline(timeout)
+        if query_embedding is None:
+            query_embedding = await self._within(
+                "rag",
+                self.rag_module.embed_query(query),
+                deadline.remaining(),
+            )
+
+        result = await self._within(
+            "rag",
+            self.rag_module.search_by_embedding(
+                query_embedding,
+                k=self.rag_assembler.fetch_k,
+                include_embeddings=self.rag_assembler.needs_embeddings,
+                collection=collection,
+            ),
+            deadline.remaining(),
+        )
         docs: List[Dict[str, Any]] = []
 
         if not result:
@@ -267,38 +917,28 @@ class OpenRouter:
                 "Category": item.get("metadata", {}).get("category"),
                 "Text": item.get("text"),
             }
+            if item.get("embedding") is not None:
+                normalized["embedding"] = item["embedding"]
             docs.append(normalized)
 
         return docs
 
     async def _add_rag_context(
             self,
-            docs: List[Dict[str, Any]],
+            rag_block: Dict[str, Any],
             dialog_id: Optional[str] = None,
     ) -> None:
 
-        if not docs:
-            return
-
-        top_k = 5
-        docs = docs[:top_k]
-
-        lines: List[str] = []
-        for idx, doc in enumerate(docs, start=1):
-            category = doc.get("Category") or "unknown"
-            text = doc.get("Text") or ""
-            score = doc.get("score")
-            lines.append(
-                f"[{idx}] (category={category}, score={score})\n{text}",
-            )
-
-        rag_text = "\n\n".join(lines)
-        content = f"Контекст из базы знаний (RAG-поиск):\n{rag_text}"
-
         extra: Dict[str, Any] = {}
         if dialog_id is not None:
             extra["dialog_id"] = dialog_id
 
+        content = rag_block.get("content")
+        if not content:
+            if hasattr(self.context, "remove_tagged_system"):
+                await self.context.remove_tagged_system(tag="rag_context", **extra)
+            return
+
         if hasattr(self.context, "upsert_tagged_system"):
             await self.context.upsert_tagged_system(
                 tag="rag_context",
@@ -317,22 +957,39 @@ class OpenRouter:
             func_name: str,
             call_id: str,
             dialog_id: Optional[str] = None,
+            timeout: Optional[float] = None,
             **kwargs: Any,
     ) -> Dict[str, Any]:
 
         method = getattr(self._tool_instance, func_name, None)
+        if method is None and func_name == READ_TOOL_RESULT:
+            return {
+                "tool_call_id": call_id,
+                "role": "tool",
+                "name": func_name,
+                "content": json.dumps(await asyncio.to_thread(self._read_tool_result, kwargs), ensure_ascii=False),
+            }
         if method is None or not callable(method):
             raise ValueError(f"Метод инструмента '{func_name}' не реализован")
 
-        result = method(**kwargs)
-        if inspect.iscoroutine(result):
-            result = await result
+        token = bind_dialog(dialog_id)
+        try:
+            result = method(**kwargs)
+            if inspect.iscoroutine(result):
+                result = await self._within("tools", result, timeout)
+        finally:
+            reset_dialog(token)
 
         content_str = (
             result
             if isinstance(result, str)
             else json.dumps(result, ensure_ascii=False)
         )
+        policy = self.tool_result_policies.get(func_name, self.tool_result_policy)
+        store: Optional[ToolResultStore] = None
+        if policy.mode in ("store", "summarize") and len(content_str) > policy.max_chars:
+            store = self._get_tool_result_store()
+        content_str = await policy.apply(func_name, content_str, store, dialog_id=dialog_id)
 
         tool_message: Dict[str, Any] = {
             "tool_call_id": call_id,
@@ -341,16 +998,4 @@ class OpenRouter:
             "content": content_str,
         }
 
-        extra: Dict[str, Any] = {"tool_call_id" : tool_message["tool_call_id"],
-                                 "name" : tool_message["name"]}
-        if dialog_id is not None:
-            extra["dialog_id"] = dialog_id
-
-        await self.context.add_message({
-            "role": "tool",
-            "tool_call_id": call_id,
-            "content": content_str,
-            "dialog_id": dialog_id,
-        })
-
         return tool_message
\ No newline at end of file
@@ -1 +1,2 @@
-from openrouter_requests.OpenRouter.OpenRouter import OpenRouter
\ No newline at end of file
+from openrouter_requests.OpenRouter.OpenRouter import OpenRouter
+from openrouter_requests.OpenRouter.session import DialogSession
\ No newline at end of file
@@ -0,0 +1,36 @@
+import asyncio
+import time
+from typing import Dict, Optional
+
+
+DEFAULT_STAGE_SHARES: Dict[str, float] = {
+    "rag": 0.2,
+    "tools": 0.4,
+}
+
+
+class DeadlineExceeded(asyncio.TimeoutError):
+
+    def __init__(self, stage: str) -> None:
+        super().__init__(f"Превышен дедлайн запроса на этапе '{stage}'")
+        self.stage = stage
+
+
+class Deadline:
+
+    def __init__(self, timeout: Optional[float], shares: Optional[Dict[str, float]] = None) -> None:
+        self.timeout = timeout
+        self.shares = DEFAULT_STAGE_SHARES if shares is None else shares
+        self._expires_at = time.monotonic() + timeout if timeout is not None else None
+
+    def remaining(self) -> Optional[float]:
+        if self._expires_at is None:
+            return None
+        return max(0.0, self._expires_at - time.monotonic())
+
+    def budget(self, stage: str) -> Optional[float]:
+        remaining = self.remaining()
+        share = self.shares.get(stage)
+        if remaining is None or share is None:
+            return remaining
+        return min(remaining, self.timeout * share)
\ No newline at end of file
@@ -0,0 +1,58 @@
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, Optional
+from openrouter_requests.ContextStorage.BaseContextManager import ContextSnapshot
+
+if TYPE_CHECKING:
+    from openrouter_requests.OpenRouter.OpenRouter import OpenRouter
+
+
+class DialogSession:
+
+    def __init__(self, client: "OpenRouter", dialog_id: str) -> None:
+        self.client = client
+        self.dialog_id = str(dialog_id)
+
+    async def send(
+            self,
+            data: str,
+            role: str = "user",
+            **kwargs: Any,
+    ) -> Dict[str, Any]:
+        return await self.client.send(data, role, dialog_id=self.dialog_id, **kwargs)
+
+    async def send_stream(
+            self,
+            data: str,
+            role: str = "user",
+            **kwargs: Any,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        async for event in self.client.send_stream(data, role, dialog_id=self.dialog_id, **kwargs):
+            yield event
+
+    async def add_system_prompt(self, data: str) -> None:
+        await self.client.add_system_prompt(data, dialog_id=self.dialog_id)
+
+    async def prefetch_rag(self, query: str) -> Optional[Dict[str, Any]]:
+        return await self.client.prefetch_rag(query, dialog_id=self.dialog_id)
+
+    async def get_context(self) -> List[Dict[str, Any]]:
+        await self.client.flush(self.dialog_id)
+        return await self.client.context.get_context(dialog_id=self.dialog_id)
+
+    async def flush(self) -> None:
+        await self.client.flush(self.dialog_id)
+
+    async def reset(self) -> None:
+        await self.client.reset_dialog(self.dialog_id)
+
+    async def fork(self, new_dialog_id: Optional[str] = None) -> "DialogSession":
+        new_id = await self.client.fork_dialog(self.dialog_id, new_dialog_id)
+        return DialogSession(self.client, new_id)
+
+    async def snapshot(self) -> ContextSnapshot:
+        return await self.client.snapshot_dialog(self.dialog_id)
+
+    async def restore(self, snapshot: ContextSnapshot) -> None:
+        await self.client.restore_dialog(snapshot, self.dialog_id)
+
+    def set_collection(self, collection: Optional[str]) -> None:
+        self.client.set_dialog_collection(self.dialog_id, collection)
\ No newline at end of file
@@ -0,0 +1 @@
+from openrouter_requests.RAGModule.context_assembler import RagContextAssembler, approximate_tokens
\ No newline at end of file
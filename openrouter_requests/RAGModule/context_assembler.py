@@ -0,0 +1,152 @@
+import math
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+
+TokenCounter = Callable[[str], int]
+
+RAG_HEADER = "Контекст из базы знаний (RAG-поиск):"
+
+
+def approximate_tokens(text: str) -> int:
+    return math.ceil(len(text) / 3) if text else 0
+
+
+class RagContextAssembler:
+
+    def __init__(
+            self,
+            fetch_k: int = 15,
+            max_chunks: int = 5,
+            max_distance: Optional[float] = 1.0,
+            mmr_lambda: float = 0.7,
+            duplicate_similarity: float = 0.95,
+            token_budget: Optional[int] = 1500,
+            min_chunk_tokens: int = 50,
+            token_counter: TokenCounter = approximate_tokens,
+    ) -> None:
+        if not 0.0 <= mmr_lambda <= 1.0:
+            raise ValueError("mmr_lambda должен быть в диапазоне [0, 1]")
+
+        self.fetch_k = fetch_k
+        self.max_chunks = max_chunks
+        self.max_distance = max_distance
+        self.mmr_lambda = mmr_lambda
+        self.duplicate_similarity = duplicate_similarity
+        self.token_budget = token_budget
+        self.min_chunk_tokens = min_chunk_tokens
+        self._count_tokens = token_counter
+
+    @property
+    def needs_embeddings(self) -> bool:
+        return self.mmr_lambda < 1.0 or self.duplicate_similarity < 1.0
+
+    def assemble(self, docs: List[Dict[str, Any]]) -> Dict[str, Any]:
+        relevant = [
+            doc for doc in docs
+            if self.max_distance is None
+            or (doc.get("score") is not None and doc["score"] <= self.max_distance)
+        ]
+        selected = self._select_mmr(relevant)
+        packed = self._pack(selected)
+
+        if not packed:
+            return {"docs": [], "content": None, "tokens": 0}
+
+        lines: List[str] = []
+        for idx, doc in enumerate(packed, start=1):
+            lines.append(self._format_doc(idx, doc, doc.get("Text") or ""))
+
+        content = f"{RAG_HEADER}\n" + "\n\n".join(lines)
+        return {
+            "docs": packed,
+            "content": content,
+            "tokens": self._count_tokens(content),
+        }
+
+    def _select_mmr(self, docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        candidates = list(docs)
+        selected: List[Dict[str, Any]] = []
+
+        while candidates and len(selected) < self.max_chunks:
+            best_index = 0
+            best_score = -math.inf
+
+            for index, doc in enumerate(candidates):
+                relevance = self._relevance(doc)
+                redundancy = max(
+                    (self._similarity(doc, chosen) for chosen in selected),
+                    default=0.0,
+                )
+                if redundancy >= self.duplicate_similarity:
+                    continue
+
+                score = self.mmr_lambda * relevance - (1.0 - self.mmr_lambda) * redundancy
+                if score > best_score:
+                    best_score = score
+                    best_index = index
+
+            if best_score == -math.inf:
+                break
+            selected.append(candidates.pop(best_index))
+
+        return selected
+
+    def _pack(self, docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if self.token_budget is None:
+            return docs
+
+        remaining = self.token_budget - self._count_tokens(RAG_HEADER)
+        packed: List[Dict[str, Any]] = []
+
+        for doc in docs:
+            text = doc.get("Text") or ""
+            cost = self._count_tokens(self._format_doc(len(packed) + 1, doc, text)) + 1
+            if cost <= remaining:
+                packed.append(doc)
+                remaining -= cost
+                continue
+
+            overhead = self._count_tokens(self._format_doc(len(packed) + 1, doc, "")) + 1
+            available = remaining - overhead
+            if available >= self.min_chunk_tokens:
+                truncated = self._truncate(text, available)
+                packed.append({**doc, "Text": truncated, "truncated": True})
+            break
+
+        return packed
+
+    def _truncate(self, text: str, max_tokens: int) -> str:
+        low, high = 0, len(text)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self._count_tokens(text[:middle] + "…") <= max_tokens:
+                low = middle
+            else:
+                high = middle - 1
+
+        cut = text[:low]
+        space = cut.rfind(" ")
+        if space > len(cut) // 2:
+            cut = cut[:space]
+        return cut.rstrip() + "…"
+
+    @staticmethod
+    def _format_doc(idx: int, doc: Dict[str, Any], text: str) -> str:
+        category = doc.get("Category") or "unknown"
+        score = doc.get("score")
+        return f"[{idx}] (category={category}, score={score})\n{text}"
+
+    @staticmethod
+    def _relevance(doc: Dict[str, Any]) -> float:
+        score = doc.get("score")
+        if score is None:
+            return 0.0
+        return 1.0 - float(score) / 2.0
+
+    @staticmethod
+    def _similarity(left: Dict[str, Any], right: Dict[str, Any]) -> float:
+        a: Optional[Sequence[float]] = left.get("embedding")
+        b: Optional[Sequence[float]] = right.get("embedding")
+        if a is None or b is None:
+            return 1.0 if left.get("Text") == right.get("Text") else 0.0
+        return float(sum(x * y for x, y in zip(a, b)))
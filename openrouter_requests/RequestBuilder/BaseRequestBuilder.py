@@ -7,5 +7,6 @@ class BaseRequestBuilder(ABC):
     @abstractmethod
     async def build_request(
             self,
-            data: OpenrouterRequest) -> Dict[str, Any]:
+            data: OpenrouterRequest,
+            overrides: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         pass
\ No newline at end of file
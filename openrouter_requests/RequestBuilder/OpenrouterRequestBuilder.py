@@ -1,11 +1,21 @@
 from typing import Any, Dict, List, Optional
 from openrouter_requests.RequestBuilder.BaseRequestBuilder import BaseRequestBuilder
+from openrouter_requests.RequestBuilder.presets import get_preset, merge_options
 from openrouter_requests.schemas import OpenrouterRequest
 from loguru import logger
 
 class OpenrouterRequestBuilder(BaseRequestBuilder):
 
-    def __init__(self) -> None:
+    def __init__(
+            self,
+            defaults: Optional[Dict[str, Any]] = None,
+            preset: Optional[str] = None) -> None:
+        self._reject_stream(defaults, "request_defaults")
+        self.preset = preset
+        self.defaults: Dict[str, Any] = merge_options(
+            get_preset(preset) if preset is not None else {},
+            defaults or {},
+        )
         logger.success(
             "Инициализирован класс {} с параметрками {}",
             self.__class__.__name__,
@@ -14,5 +24,21 @@ class OpenrouterRequestBuilder(BaseRequestBuilder):
 
     async def build_request(
             self,
-            data: OpenrouterRequest) -> Dict[str, Any]:
-        return data.model_dump()
\ No newline at end of file
+            data: OpenrouterRequest,
+            overrides: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        self._reject_stream(overrides, "request_options")
+        options = dict(overrides or {})
+        preset = options.pop("preset", None)
+
+        merged = self.defaults
+        if preset is not None:
+            merged = merge_options(merged, get_preset(preset))
+        merged = merge_options(merged, data.model_dump(exclude_none=True))
+        merged = merge_options(merged, options)
+
+        return OpenrouterRequest.model_validate(merged).model_dump(exclude_none=True)
+
+    @staticmethod
+    def _reject_stream(options: Optional[Dict[str, Any]], name: str) -> None:
+        if options and "stream" in options:
+            raise ValueError(f"Ключ 'stream' в {name} не поддерживается, используйте send или send_stream")
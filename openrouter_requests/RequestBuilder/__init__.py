@@ -1,2 +1,3 @@
 from openrouter_requests.RequestBuilder.BaseRequestBuilder import BaseRequestBuilder
-from openrouter_requests.RequestBuilder.OpenrouterRequestBuilder import OpenrouterRequestBuilder
\ No newline at end of file
+from openrouter_requests.RequestBuilder.OpenrouterRequestBuilder import OpenrouterRequestBuilder
+from openrouter_requests.RequestBuilder.presets import REQUEST_PRESETS
\ No newline at end of file
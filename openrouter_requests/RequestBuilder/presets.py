@@ -0,0 +1,33 @@
+from typing import Any, Dict
+
+
+REQUEST_PRESETS: Dict[str, Dict[str, Any]] = {
+    "low-latency": {
+        "provider": {"sort": "latency", "allow_fallbacks": True},
+        "usage": {"include": True},
+    },
+    "high-throughput": {
+        "provider": {"sort": "throughput", "allow_fallbacks": True},
+        "usage": {"include": True},
+    },
+    "low-cost": {
+        "provider": {"sort": "price", "allow_fallbacks": True},
+        "usage": {"include": True},
+    },
+}
+
+
+def get_preset(name: str) -> Dict[str, Any]:
+    if name not in REQUEST_PRESETS:
+        raise ValueError(f"Неизвестный пресет запроса '{name}', доступны: {', '.join(REQUEST_PRESETS)}")
+    return REQUEST_PRESETS[name]
+
+
+def merge_options(base: Dict[str, Any], override: Dict[str, Any]) -> Dict[str, Any]:
+    merged = dict(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge_options(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
\ No newline at end of file
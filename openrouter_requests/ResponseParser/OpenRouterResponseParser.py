@@ -3,6 +3,9 @@ from typing import Any, Dict, List
 from openrouter_requests.ResponseParser.BaseResponseParser import BaseResponseParser
 from loguru import logger
 
+RESPONSE_META_FIELDS = ("id", "model", "provider", "usage")
+
+
 class OpenrouterResponseParser(BaseResponseParser):
 
     def __init__(self) -> None:
@@ -14,6 +17,8 @@ class OpenrouterResponseParser(BaseResponseParser):
 
     async def parse(self, response: Dict[str, Any]) -> Dict[str, Any]:
 
+        meta = {field: response.get(field) for field in RESPONSE_META_FIELDS}
+
         choices = response.get("choices", [])
         if not choices:
             return {
@@ -21,6 +26,7 @@ class OpenrouterResponseParser(BaseResponseParser):
                 "role": None,
                 "content": "",
                 "calls": [],
+                **meta,
             }
 
         message = choices[0].get("message", {}) or {}
@@ -54,6 +60,7 @@ class OpenrouterResponseParser(BaseResponseParser):
                 "role": role,
                 "content": content,
                 "calls": parsed_calls,
+                **meta,
             }
 
         return {
@@ -61,4 +68,5 @@ class OpenrouterResponseParser(BaseResponseParser):
             "role": role,
             "content": content,
             "calls": [],
+            **meta,
         }
\ No newline at end of file
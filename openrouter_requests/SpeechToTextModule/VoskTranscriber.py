@@ -1,6 +1,116 @@
 from vosk import Model, KaldiRecognizer
+import asyncio
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 from loguru import logger
+from openrouter_requests.SpeechToTextModule.audio import EnergyVad, LinearResampler
+
+
+class VoskSession:
+
+    def __init__(self, service: "VoskService", recognizer: KaldiRecognizer) -> None:
+        self._service = service
+        self._recognizer: Optional[KaldiRecognizer] = recognizer
+        self._lock = asyncio.Lock()
+
+    async def __aenter__(self) -> "VoskSession":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def recognize(self, chunk: bytes) -> Optional[str]:
+        if len(chunk) == 0:
+            return None
+
+        async with self._lock:
+            recognizer = self._require_recognizer()
+            return await self._service._run(self._accept, recognizer, chunk)
+
+    async def partial(self) -> str:
+        async with self._lock:
+            recognizer = self._require_recognizer()
+            result = await self._service._run(recognizer.PartialResult)
+        return json.loads(result).get("partial", "").strip()
+
+    async def final(self) -> str:
+        async with self._lock:
+            recognizer = self._require_recognizer()
+            result = await self._service._run(recognizer.FinalResult)
+        return json.loads(result).get("text", "").strip()
+
+    async def stream(
+            self,
+            chunks: AsyncIterator[bytes],
+            sample_rate: int = 16000,
+            vad: Optional[EnergyVad] = None,
+            use_vad: bool = True,
+    ) -> AsyncIterator[Dict[str, str]]:
+
+        resampler = LinearResampler(sample_rate, self._service._sample_rate)
+        if vad is None and use_vad:
+            vad = EnergyVad(sample_rate=self._service._sample_rate)
+        last_partial = ""
+
+        async for chunk in chunks:
+            audio = resampler.process(chunk)
+            segments = vad.process(audio) if vad is not None else [(audio, False)]
+
+            for segment, utterance_ended in segments:
+                async with self._lock:
+                    recognizer = self._require_recognizer()
+                    final, partial = await self._service._run(
+                        self._feed, recognizer, segment, utterance_ended
+                    )
+
+                if final:
+                    last_partial = ""
+                    yield {"type": "final", "text": final}
+                elif utterance_ended:
+                    last_partial = ""
+                elif partial and partial != last_partial:
+                    last_partial = partial
+                    yield {"type": "partial", "text": partial}
+
+        text = await self.final()
+        if text:
+            yield {"type": "final", "text": text}
+
+        if vad is not None:
+            logger.debug(
+                "VAD отбросил {} из {} кадров",
+                vad.frames_dropped,
+                vad.frames_total
+            )
+
+    async def close(self) -> None:
+        async with self._lock:
+            if self._recognizer is None:
+                return
+            recognizer, self._recognizer = self._recognizer, None
+        await self._service._release(recognizer)
+
+    def _require_recognizer(self) -> KaldiRecognizer:
+        if self._recognizer is None:
+            raise RuntimeError("Сессия распознавания уже закрыта")
+        return self._recognizer
+
+    @staticmethod
+    def _accept(recognizer: KaldiRecognizer, chunk: bytes) -> Optional[str]:
+        if recognizer.AcceptWaveform(chunk):
+            result = json.loads(recognizer.FinalResult())
+            return result.get("text", "").strip()
+        return None
+
+    @staticmethod
+    def _feed(recognizer: KaldiRecognizer, chunk: bytes, flush: bool) -> Tuple[Optional[str], str]:
+        if chunk and recognizer.AcceptWaveform(chunk):
+            return json.loads(recognizer.FinalResult()).get("text", "").strip(), ""
+        if flush:
+            return json.loads(recognizer.FinalResult()).get("text", "").strip(), ""
+        return None, json.loads(recognizer.PartialResult()).get("partial", "").strip()
 
 
 class VoskService:
@@ -8,8 +118,15 @@ class VoskService:
     _model = None
     _recognizer = None
     _initialized = False
+    _sample_rate = 16000
+    _max_sessions = 32
+    _executor: Optional[ThreadPoolExecutor] = None
+    _free_recognizers: List[KaldiRecognizer] = []
+    _sessions: Optional[asyncio.Semaphore] = None
+    _pool_lock = threading.Lock()
+    _legacy_lock: Optional[asyncio.Lock] = None
 
-    def __new__(cls, model_path=None):
+    def __new__(cls, model_path=None, *args, **kwargs):
         if cls._instance is not None:
             return cls._instance
 
@@ -19,10 +136,17 @@ class VoskService:
         cls._instance = super().__new__(cls)
         return cls._instance
 
-    def __init__(self, model_path=None):
+    def __init__(self, model_path=None, sample_rate: int = 16000, max_sessions: int = 32, workers: int = 4):
         if not self.__class__._initialized and model_path:
             self.__class__._model = Model(model_path)
-            self.__class__._recognizer = KaldiRecognizer(self.__class__._model, 16000)
+            self.__class__._sample_rate = sample_rate
+            self.__class__._recognizer = KaldiRecognizer(self.__class__._model, sample_rate)
+            self.__class__._max_sessions = max_sessions
+            self.__class__._sessions = asyncio.Semaphore(max_sessions)
+            self.__class__._executor = ThreadPoolExecutor(
+                max_workers=workers,
+                thread_name_prefix="vosk",
+            )
             self.__class__._initialized = True
             logger.success(
                 "Инициализирован синглтон класса {} с параметрками {}",
@@ -30,6 +154,35 @@ class VoskService:
                 self.__dict__
             )
 
+    @classmethod
+    async def session(cls) -> VoskSession:
+        if not cls._initialized:
+            cls()
+
+        await cls._sessions.acquire()
+        try:
+            with cls._pool_lock:
+                recognizer = cls._free_recognizers.pop() if cls._free_recognizers else None
+            if recognizer is None:
+                recognizer = await cls._run(KaldiRecognizer, cls._model, cls._sample_rate)
+        except BaseException:
+            cls._sessions.release()
+            raise
+
+        return VoskSession(cls._instance, recognizer)
+
+    @classmethod
+    async def stream(
+            cls,
+            chunks: AsyncIterator[bytes],
+            sample_rate: int = 16000,
+            use_vad: bool = True,
+    ) -> AsyncIterator[Dict[str, str]]:
+
+        async with await cls.session() as session:
+            async for event in session.stream(chunks, sample_rate=sample_rate, use_vad=use_vad):
+                yield event
+
     @classmethod
     async def recognize(cls, chunk):
         if cls._recognizer is None:
@@ -37,10 +190,23 @@ class VoskService:
 
         if len(chunk) == 0:
             return None
-        if cls._recognizer.AcceptWaveform(chunk):
-            result_json = cls._recognizer.FinalResult()
-            result = json.loads(result_json)
-            text = result.get("text", "").strip()
-            return text
 
-        return None
\ No newline at end of file
+        if cls._legacy_lock is None:
+            cls._legacy_lock = asyncio.Lock()
+
+        async with cls._legacy_lock:
+            return await cls._run(VoskSession._accept, cls._recognizer, chunk)
+
+    @classmethod
+    async def _release(cls, recognizer: KaldiRecognizer) -> None:
+        try:
+            await cls._run(recognizer.Reset)
+            with cls._pool_lock:
+                cls._free_recognizers.append(recognizer)
+        finally:
+            cls._sessions.release()
+
+    @classmethod
+    async def _run(cls, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(cls._executor, func, *args)
\ No newline at end of file
@@ -1 +1 @@
-from openrouter_requests.SpeechToTextModule.VoskTranscriber import VoskService
\ No newline at end of file
+from openrouter_requests.SpeechToTextModule.VoskTranscriber import VoskService, VoskSession
\ No newline at end of file
@@ -0,0 +1,168 @@
+from collections import deque
+from typing import Deque, List, Optional, Tuple
+import numpy as np
+
+
+SAMPLE_WIDTH = 2
+
+
+def lowpass_taps(cutoff: float, taps_per_side: int) -> np.ndarray:
+    positions = np.arange(-taps_per_side, taps_per_side + 1, dtype=np.float64)
+    taps = 2.0 * cutoff * np.sinc(2.0 * cutoff * positions) * np.blackman(len(positions))
+    return (taps / taps.sum()).astype(np.float32)
+
+
+class LinearResampler:
+
+    def __init__(
+            self,
+            source_rate: int,
+            target_rate: int = 16000,
+            cutoff_ratio: float = 0.9,
+            zero_crossings: int = 16,
+    ) -> None:
+        if source_rate <= 0 or target_rate <= 0:
+            raise ValueError("Частота дискретизации должна быть положительной")
+
+        self.source_rate = source_rate
+        self.target_rate = target_rate
+        self._step = source_rate / target_rate
+        self._position = 0.0
+        self._tail: Optional[np.ndarray] = None
+        self._remainder = b""
+        self._taps: Optional[np.ndarray] = None
+        self._history: Optional[np.ndarray] = None
+        if source_rate > target_rate:
+            cutoff = 0.5 * cutoff_ratio * target_rate / source_rate
+            self._taps = lowpass_taps(cutoff, int(np.ceil(zero_crossings * self._step)))
+            self._history = np.zeros(len(self._taps) - 1, dtype=np.float32)
+
+    def process(self, pcm: bytes) -> bytes:
+        pcm = self._remainder + pcm
+        usable = len(pcm) - len(pcm) % SAMPLE_WIDTH
+        pcm, self._remainder = pcm[:usable], pcm[usable:]
+
+        if self.source_rate == self.target_rate:
+            return pcm
+
+        samples = np.frombuffer(pcm, dtype=np.int16).astype(np.float32)
+        if self._taps is not None and len(samples):
+            padded = np.concatenate([self._history, samples])
+            self._history = padded[len(padded) - len(self._history):]
+            samples = np.convolve(padded, self._taps, mode="valid").astype(np.float32)
+
+        if self._tail is not None:
+            samples = np.concatenate([self._tail, samples])
+
+        if len(samples) < 2:
+            self._tail = samples if len(samples) else self._tail
+            return b""
+
+        last = len(samples) - 1
+        positions = np.arange(self._position, last, self._step)
+        output = np.interp(positions, np.arange(len(samples)), samples)
+
+        next_position = positions[-1] + self._step if len(positions) else self._position
+        self._position = next_position - last
+        self._tail = samples[-1:]
+
+        return np.clip(np.rint(output), -32768, 32767).astype(np.int16).tobytes()
+
+
+class EnergyVad:
+
+    def __init__(
+            self,
+            sample_rate: int = 16000,
+            frame_ms: int = 30,
+            energy_threshold: float = 300.0,
+            hangover_ms: int = 300,
+            preroll_ms: int = 150,
+            adaptive: bool = True,
+            noise_ratio: float = 3.0,
+            min_threshold: float = 60.0,
+            noise_rise: float = 0.01,
+            calibration_ms: int = 300,
+    ) -> None:
+        self.sample_rate = sample_rate
+        self.energy_threshold = energy_threshold
+        self.adaptive = adaptive
+        self.noise_ratio = noise_ratio
+        self.min_threshold = min_threshold
+        self.noise_rise = noise_rise
+        self.noise_floor = energy_threshold / noise_ratio
+        self._calibration_frames = max(0, calibration_ms // frame_ms) if adaptive else 0
+        self._calibrated = self._calibration_frames == 0
+        self._frame_bytes = int(sample_rate * frame_ms / 1000) * SAMPLE_WIDTH
+        self._hangover_frames = max(1, hangover_ms // frame_ms)
+        self._preroll: Deque[bytes] = deque(maxlen=max(0, preroll_ms // frame_ms))
+        self._buffer = b""
+        self._in_speech = False
+        self._silent_frames = 0
+        self.frames_total = 0
+        self.frames_dropped = 0
+
+    @property
+    def in_speech(self) -> bool:
+        return self._in_speech
+
+    def process(self, pcm: bytes) -> List[Tuple[bytes, bool]]:
+        self._buffer += pcm
+        segments: List[Tuple[bytes, bool]] = []
+        voiced: List[bytes] = []
+
+        while len(self._buffer) >= self._frame_bytes:
+            frame = self._buffer[:self._frame_bytes]
+            self._buffer = self._buffer[self._frame_bytes:]
+            self.frames_total += 1
+
+            if self._is_speech(frame):
+                if not self._in_speech:
+                    voiced.extend(self._preroll)
+                    self._preroll.clear()
+                    self._in_speech = True
+                self._silent_frames = 0
+                voiced.append(frame)
+                continue
+
+            if not self._in_speech:
+                if len(self._preroll) == self._preroll.maxlen:
+                    self.frames_dropped += 1
+                self._preroll.append(frame)
+                continue
+
+            self._silent_frames += 1
+            voiced.append(frame)
+            if self._silent_frames >= self._hangover_frames:
+                segments.append((b"".join(voiced), True))
+                voiced = []
+                self._in_speech = False
+                self._silent_frames = 0
+
+        if voiced:
+            segments.append((b"".join(voiced), False))
+        return segments
+
+    @property
+    def threshold(self) -> float:
+        if not self.adaptive:
+            return self.energy_threshold
+        return max(self.min_threshold, self.noise_floor * self.noise_ratio)
+
+    def _is_speech(self, frame: bytes) -> bool:
+        samples = np.frombuffer(frame, dtype=np.int16).astype(np.float32)
+        energy = float(np.sqrt(np.mean(samples * samples)))
+
+        if self._calibration_frames > 0:
+            self.noise_floor = energy if not self._calibrated else min(self.noise_floor, energy)
+            self._calibrated = True
+            self._calibration_frames -= 1
+            return False
+
+        is_speech = energy >= self.threshold
+        if self.adaptive:
+            if energy < self.noise_floor:
+                self.noise_floor = 0.5 * (self.noise_floor + energy)
+            elif not is_speech and not self._in_speech:
+                self.noise_floor += self.noise_rise * (energy - self.noise_floor)
+        return is_speech
\ No newline at end of file
@@ -1,28 +1,178 @@
-import torch
+import asyncio
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Tuple
 import numpy as np
+from loguru import logger
+from openrouter_requests.TextToSpeechModule.sentence_splitter import split_sentences
+from openrouter_requests.TextToSpeechModule.tts_cache import TtsAudioCache, audio_cache_key
 
 
-def create_tts(language='ru', model_id='v5_ru', speaker='xenia', output_sr: int = 48000):
-    device = torch.device('cpu')
-    model, _ = torch.hub.load(
-        repo_or_dir='snakers4/silero-models',
-        model='silero_tts',
-        language=language,
-        speaker=model_id
-    )
-    model.to(device)
-
-    def tts(text):
-        audio_tensor = model.apply_tts(
-            text=text,
-            speaker=speaker,
-            sample_rate=output_sr
+_MODELS: Dict[Tuple[str, ...], Any] = {}
+_MODELS_LOCK = threading.Lock()
+
+
+class SileroTTS:
+
+    def __init__(
+            self,
+            model,
+            speaker: str = 'xenia',
+            output_sr: int = 48000,
+            workers: int = 1,
+            prefetch: int = 2,
+            min_sentence_chars: int = 20,
+            max_sentence_chars: int = 300,
+            cache: Optional[TtsAudioCache] = None,
+            model_id: str = 'v5_ru',
+    ) -> None:
+        self.model = model
+        self.model_id = model_id
+        self.cache = cache
+        self.speaker = speaker
+        self.output_sr = output_sr
+        self.prefetch = max(1, prefetch)
+        self.min_sentence_chars = min_sentence_chars
+        self.max_sentence_chars = max_sentence_chars
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix="silero-tts",
+        )
+        logger.success(
+            "Инициализирован класс {} с параметрками {}",
+            self.__class__.__name__,
+            {
+                "speaker": speaker,
+                "output_sr": output_sr,
+                "workers": workers,
+                "prefetch": self.prefetch,
+                "model_id": model_id,
+                "cache": cache is not None,
+            }
         )
+
+    def __call__(self, text: str) -> bytes:
+        return self._render(text)
+
+    async def synthesize(self, text: str) -> bytes:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._render, text)
+
+    async def stream(self, text: str) -> AsyncIterator[bytes]:
+        loop = asyncio.get_running_loop()
+        sentences = iter(split_sentences(
+            text,
+            min_chars=self.min_sentence_chars,
+            max_chars=self.max_sentence_chars,
+        ))
+        pending: Deque[asyncio.Future] = deque()
+
+        def schedule() -> None:
+            sentence = next(sentences, None)
+            if sentence is not None:
+                pending.append(loop.run_in_executor(self._executor, self._render, sentence))
+
+        try:
+            for _ in range(self.prefetch):
+                schedule()
+
+            while pending:
+                audio = await pending.popleft()
+                schedule()
+                yield audio
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _render(self, text: str) -> bytes:
+        if self.cache is None:
+            return self._synthesize(text)
+
+        key = audio_cache_key(text, self.speaker, self.output_sr, self.model_id)
+        audio_bytes = self.cache.get(key)
+        if audio_bytes is None:
+            audio_bytes = self._synthesize(text)
+            self.cache.put(key, audio_bytes)
+        return audio_bytes
+
+    def _synthesize(self, text: str) -> bytes:
+        import torch
+
+        with torch.inference_mode():
+            audio_tensor = self.model.apply_tts(
+                text=text,
+                speaker=self.speaker,
+                sample_rate=self.output_sr
+            )
         audio_numpy = audio_tensor.cpu().numpy()
         audio_int16 = (audio_numpy * 32767).astype(np.int16)
         audio_bytes = audio_int16.tobytes()
 
         return audio_bytes
 
-    return tts
 
+def load_silero_model(language='ru', model_id='v5_ru', model_path: Optional[str] = None):
+    package: Optional[Path] = None
+    if model_path is not None:
+        package = Path(model_path)
+        if package.is_dir():
+            package = package / f"{model_id}.pt"
+    key = ('path', str(package.resolve())) if package is not None else ('hub', language, model_id)
+
+    with _MODELS_LOCK:
+        model = _MODELS.get(key)
+        if model is not None:
+            return model
+
+        import torch
+
+        if package is None:
+            model, _ = torch.hub.load(
+                repo_or_dir='snakers4/silero-models',
+                model='silero_tts',
+                language=language,
+                speaker=model_id
+            )
+        else:
+            if not package.is_file():
+                raise FileNotFoundError(f"Модель TTS не найдена по пути '{package}'")
+
+            from torch.package import PackageImporter
+
+            importer = PackageImporter(str(package))
+            model = importer.load_pickle("tts_models", "model")
+
+        model.to(torch.device('cpu'))
+        _MODELS[key] = model
+        logger.info("Модель TTS {} загружена", key)
+        return model
+
+
+def create_tts(
+        language='ru',
+        model_id='v5_ru',
+        speaker='xenia',
+        output_sr: int = 48000,
+        workers: int = 1,
+        prefetch: int = 2,
+        model_path: Optional[str] = None,
+        cache_dir: Optional[str] = None,
+        cache_max_bytes: int = 256 * 1024 * 1024,
+):
+    model = load_silero_model(language=language, model_id=model_id, model_path=model_path)
+    cache = TtsAudioCache(cache_dir, max_bytes=cache_max_bytes) if cache_dir else None
+
+    return SileroTTS(
+        model,
+        speaker=speaker,
+        output_sr=output_sr,
+        workers=workers,
+        prefetch=prefetch,
+        cache=cache,
+        model_id=model_id if model_path is None else f"{model_id}:{Path(model_path).name}",
+    )
\ No newline at end of file
@@ -1 +1,3 @@
-from openrouter_requests.TextToSpeechModule.SnakersModule import create_tts
\ No newline at end of file
+from openrouter_requests.TextToSpeechModule.SnakersModule import SileroTTS, create_tts, load_silero_model
+from openrouter_requests.TextToSpeechModule.sentence_splitter import SentenceSplitter, split_sentences
+from openrouter_requests.TextToSpeechModule.tts_cache import TtsAudioCache
\ No newline at end of file
@@ -0,0 +1,72 @@
+import re
+from typing import List
+
+
+_SENTENCE_END = re.compile(r"([.!?…;][\"'»”’)\]]*)\s+")
+_SOFT_BREAK = re.compile(r"(?<=[,:—–-])\s+")
+
+
+class SentenceSplitter:
+
+    def __init__(self, min_chars: int = 20, max_chars: int = 300) -> None:
+        if min_chars > max_chars:
+            raise ValueError("min_chars не может превышать max_chars")
+
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self._buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        self._buffer += text
+        parts = _split_sentences(self._buffer)
+        self._buffer = parts.pop()
+
+        sentences: List[str] = []
+        pending = ""
+        for part in parts:
+            pending = f"{pending} {part}".strip() if pending else part.strip()
+            if len(pending) >= self.min_chars:
+                sentences.extend(self._limit(pending))
+                pending = ""
+
+        if pending:
+            self._buffer = f"{pending} {self._buffer}" if self._buffer else pending
+
+        if len(self._buffer) > self.max_chars:
+            *ready, self._buffer = self._limit(self._buffer)
+            sentences.extend(ready)
+
+        return sentences
+
+    def flush(self) -> List[str]:
+        tail, self._buffer = self._buffer.strip(), ""
+        return self._limit(tail) if tail else []
+
+    def _limit(self, sentence: str) -> List[str]:
+        chunks: List[str] = []
+        while len(sentence) > self.max_chars:
+            window = sentence[:self.max_chars]
+            breaks = [match.end() for match in _SOFT_BREAK.finditer(window)]
+            cut = breaks[-1] if breaks else window.rfind(" ") + 1
+            if cut <= 0:
+                cut = self.max_chars
+            chunks.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        if sentence:
+            chunks.append(sentence)
+        return chunks
+
+
+def _split_sentences(text: str) -> List[str]:
+    parts: List[str] = []
+    start = 0
+    for match in _SENTENCE_END.finditer(text):
+        parts.append(text[start:match.end(1)])
+        start = match.end()
+    parts.append(text[start:])
+    return parts
+
+
+def split_sentences(text: str, min_chars: int = 20, max_chars: int = 300) -> List[str]:
+    splitter = SentenceSplitter(min_chars=min_chars, max_chars=max_chars)
+    return splitter.feed(text) + splitter.flush()
\ No newline at end of file
@@ -0,0 +1,117 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from loguru import logger
+
+
+def audio_cache_key(text: str, speaker: str, sample_rate: int, model_id: str) -> str:
+    payload = json.dumps([text, speaker, sample_rate, model_id], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TtsAudioCache:
+
+    def __init__(
+            self,
+            cache_dir: str = "~/.cache/openrouter_requests/tts",
+            max_bytes: int = 256 * 1024 * 1024,
+    ) -> None:
+        self._root = Path(cache_dir).expanduser()
+        self._root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[float, int]] = {}
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+
+        for path in self._root.glob("*/*.pcm"):
+            stat = path.stat()
+            self._entries[path.stem] = (stat.st_mtime, stat.st_size)
+            self._size += stat.st_size
+
+        logger.success(
+            "Инициализирован класс {} с параметрками {}",
+            self.__class__.__name__,
+            {
+                "cache_dir": str(self._root),
+                "max_bytes": max_bytes,
+                "entries": len(self._entries),
+                "size": self._size,
+            }
+        )
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+                entry = self._entries.pop(key, None)
+                if entry is not None:
+                    self._size -= entry[1]
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        with self._lock:
+            self.hits += 1
+            previous = self._entries.get(key)
+            self._size += len(data) - (previous[1] if previous is not None else 0)
+            self._entries[key] = (time.time(), len(data))
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        descriptor, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                file.write(data)
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+        with self._lock:
+            previous = self._entries.get(key)
+            if previous is not None:
+                self._size -= previous[1]
+            self._entries[key] = (time.time(), len(data))
+            self._size += len(data)
+            self._evict()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._entries),
+            "size": self._size,
+        }
+
+    def _evict(self) -> None:
+        if self._size <= self.max_bytes:
+            return
+
+        for key, (_, size) in sorted(self._entries.items(), key=lambda item: item[1][0]):
+            if self._size <= self.max_bytes:
+                break
+            self._path(key).unlink(missing_ok=True)
+            del self._entries[key]
+            self._size -= size
+            logger.debug("Аудио '{}' удалено из кэша синтеза", key)
+
+    def _path(self, key: str) -> Path:
+        return self._root / key[:2] / f"{key}.pcm"
\ No newline at end of file
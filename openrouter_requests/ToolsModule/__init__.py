@@ -1,2 +1,5 @@
 from openrouter_requests.ToolsModule.tool_runner import ToolRunner
-from openrouter_requests.ToolsModule.create_tool import Tools
\ No newline at end of file
+from openrouter_requests.ToolsModule.create_tool import Tools
+from openrouter_requests.ToolsModule.tool_context import current_dialog_id
+from openrouter_requests.ToolsModule.result_store import ToolResultStore
+from openrouter_requests.ToolsModule.result_policy import ToolResultPolicy
\ No newline at end of file
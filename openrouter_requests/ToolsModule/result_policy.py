@@ -0,0 +1,82 @@
+import asyncio
+import inspect
+import json
+from typing import Any, Awaitable, Callable, Dict, Optional, Union
+from openrouter_requests.ToolsModule.result_store import ToolResultStore
+
+
+READ_TOOL_RESULT = "read_tool_result"
+
+READ_TOOL_RESULT_SCHEMA: Dict[str, Any] = {
+    "type": "function",
+    "function": {
+        "name": READ_TOOL_RESULT,
+        "description": (
+            "Читает часть полного результата инструмента, сохранённого вне контекста. "
+            "Используйте, когда в ответе инструмента есть result_handle, а превью недостаточно."
+        ),
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "handle": {"type": "string", "description": "Значение result_handle из ответа инструмента"},
+                "offset": {"type": "integer", "description": "Смещение в символах, с которого читать"},
+                "limit": {"type": "integer", "description": "Сколько символов прочитать"},
+            },
+            "required": ["handle"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+TOOL_RESULT_MODES = ("inline", "truncate", "summarize", "store")
+
+Summarizer = Callable[[str, str], Union[str, Awaitable[str]]]
+
+
+class ToolResultPolicy:
+
+    def __init__(
+            self,
+            mode: str = "truncate",
+            max_chars: int = 8000,
+            preview_chars: int = 1000,
+            summarizer: Optional[Summarizer] = None,
+    ) -> None:
+        if mode not in TOOL_RESULT_MODES:
+            raise ValueError(f"Неизвестный режим '{mode}', допустимые: {', '.join(TOOL_RESULT_MODES)}")
+        if mode == "summarize" and summarizer is None:
+            raise ValueError("Для режима 'summarize' нужен summarizer")
+
+        self.mode = mode
+        self.max_chars = max_chars
+        self.preview_chars = min(preview_chars, max_chars)
+        self.summarizer = summarizer
+
+    async def apply(
+            self,
+            func_name: str,
+            content: str,
+            store: Optional[ToolResultStore],
+            dialog_id: Optional[str] = None,
+    ) -> str:
+        if self.mode == "inline" or len(content) <= self.max_chars:
+            return content
+
+        if self.mode == "truncate" or (self.mode == "store" and store is None):
+            omitted = len(content) - self.max_chars
+            return f"{content[:self.max_chars]}\n...[обрезано {omitted} символов]"
+
+        handle = await asyncio.to_thread(store.put, content, dialog_id) if store is not None else None
+        if self.mode == "summarize":
+            summary = self.summarizer(func_name, content)
+            if inspect.isawaitable(summary):
+                summary = await summary
+            body: Dict[str, Any] = {"summary": str(summary)[:self.max_chars]}
+        else:
+            body = {"preview": content[:self.preview_chars]}
+
+        body["total_chars"] = len(content)
+        if handle is not None:
+            body["result_handle"] = handle
+            body["hint"] = f"Полный результат доступен через {READ_TOOL_RESULT}(handle, offset, limit)"
+        return json.dumps(body, ensure_ascii=False)
\ No newline at end of file
@@ -0,0 +1,160 @@
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+from loguru import logger
+
+
+_HANDLE_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+
+class ToolResultStore:
+
+    def __init__(
+            self,
+            store_dir: str = "~/.cache/openrouter_requests/tool_results",
+            max_bytes: int = 128 * 1024 * 1024,
+    ) -> None:
+        self._root = Path(store_dir).expanduser()
+        self._root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[float, int]] = {}
+        self._owners: Dict[str, Optional[str]] = {}
+        self._dialog_handles: Dict[Optional[str], Set[str]] = {}
+        self._size = 0
+        self.stored = 0
+        self.reads = 0
+        self.misses = 0
+
+        for path in self._root.glob("*/*.txt"):
+            stat = path.stat()
+            self._entries[path.stem] = (stat.st_mtime, stat.st_size)
+            self._size += stat.st_size
+
+        logger.success(
+            "Инициализирован класс {} с параметрками {}",
+            self.__class__.__name__,
+            {
+                "store_dir": str(self._root),
+                "max_bytes": max_bytes,
+                "entries": len(self._entries),
+                "size": self._size,
+            }
+        )
+
+    def put(self, content: str, dialog_id: Optional[str] = None) -> str:
+        handle = uuid.uuid4().hex
+        data = content.encode("utf-8")
+        path = self._path(handle)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        descriptor, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                file.write(data)
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+        with self._lock:
+            self.stored += 1
+            self._entries[handle] = (time.time(), len(data))
+            self._size += len(data)
+            self._owners[handle] = dialog_id
+            self._dialog_handles.setdefault(dialog_id, set()).add(handle)
+            self._evict(keep=handle)
+        return handle
+
+    def read(self, handle: str, offset: int = 0, limit: int = 4000) -> Optional[Dict[str, Any]]:
+        if not _HANDLE_PATTERN.match(str(handle)):
+            raise ValueError(f"Некорректный идентификатор результата '{handle}'")
+
+        path = self._path(handle)
+        try:
+            content = path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+                self._forget(handle)
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        with self._lock:
+            self.reads += 1
+            if handle in self._entries:
+                self._entries[handle] = (time.time(), self._entries[handle][1])
+
+        offset = max(0, int(offset))
+        end = min(len(content), offset + max(0, int(limit)))
+        return {
+            "handle": handle,
+            "offset": offset,
+            "next_offset": end if end < len(content) else None,
+            "total_chars": len(content),
+            "content": content[offset:end],
+        }
+
+    def delete(self, handles: Iterable[str]) -> int:
+        removed = 0
+        with self._lock:
+            for handle in handles:
+                if not _HANDLE_PATTERN.match(str(handle)):
+                    continue
+                self._path(handle).unlink(missing_ok=True)
+                removed += self._forget(handle)
+        return removed
+
+    def drop_dialog(self, dialog_id: Optional[str]) -> int:
+        with self._lock:
+            handles = list(self._dialog_handles.get(dialog_id, ()))
+        removed = self.delete(handles)
+        if removed:
+            logger.debug("Удалено {} результатов инструментов диалога '{}'", removed, dialog_id)
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "stored": self.stored,
+            "reads": self.reads,
+            "misses": self.misses,
+            "entries": len(self._entries),
+            "size": self._size,
+        }
+
+    def _evict(self, keep: str) -> None:
+        if self._size <= self.max_bytes:
+            return
+
+        for handle, _ in sorted(self._entries.items(), key=lambda item: item[1][0]):
+            if self._size <= self.max_bytes:
+                break
+            if handle == keep:
+                continue
+            self._path(handle).unlink(missing_ok=True)
+            self._forget(handle)
+            logger.debug("Результат инструмента '{}' удалён из хранилища", handle)
+
+    def _forget(self, handle: str) -> int:
+        entry = self._entries.pop(handle, None)
+        if entry is not None:
+            self._size -= entry[1]
+
+        dialog_id = self._owners.pop(handle, None)
+        handles = self._dialog_handles.get(dialog_id)
+        if handles is not None:
+            handles.discard(handle)
+            if not handles:
+                del self._dialog_handles[dialog_id]
+        return 1 if entry is not None else 0
+
+    def _path(self, handle: str) -> Path:
+        return self._root / handle[:2] / f"{handle}.txt"
\ No newline at end of file
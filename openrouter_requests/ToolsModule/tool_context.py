@@ -0,0 +1,17 @@
+from contextvars import ContextVar, Token
+from typing import Optional
+
+
+_current_dialog: ContextVar[Optional[str]] = ContextVar("openrouter_current_dialog", default=None)
+
+
+def current_dialog_id() -> Optional[str]:
+    return _current_dialog.get()
+
+
+def bind_dialog(dialog_id: Optional[str]) -> Token:
+    return _current_dialog.set(str(dialog_id) if dialog_id is not None else None)
+
+
+def reset_dialog(token: Token) -> None:
+    _current_dialog.reset(token)
\ No newline at end of file
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from typing import Any, AsyncIterator, Dict, Optional
 
 
 class Transport(ABC):
@@ -10,6 +10,7 @@ class Transport(ABC):
             url: str,
             headers: Dict[str, str],
             payload: Optional[Any],
+            timeout: Optional[float] = None,
     ) -> Any:
         pass
 
@@ -19,5 +20,30 @@ class Transport(ABC):
             url: str,
             headers: Dict[str, str],
             payload: Optional[Any],
+            timeout: Optional[float] = None,
     ) -> Any:
-        pass
\ No newline at end of file
+        pass
+
+    async def warmup(
+            self,
+            url: str,
+            headers: Dict[str, str],
+    ) -> None:
+        pass
+
+    async def stream(
+            self,
+            url: str,
+            headers: Dict[str, str],
+            payload: Optional[Any],
+            timeout: Optional[float] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        if isinstance(payload, dict):
+            payload = {**payload, "stream": False}
+        response = await self.post(url=url, headers=headers, payload=payload, timeout=timeout)
+
+        choices = response.get("choices") or []
+        message = choices[0].get("message") or {} if choices else {}
+        chunk = {key: value for key, value in response.items() if key != "choices"}
+        chunk["choices"] = [{"index": 0, "delta": message}]
+        yield chunk
\ No newline at end of file
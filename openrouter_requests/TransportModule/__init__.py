@@ -1,2 +1,3 @@
 from openrouter_requests.TransportModule.BaseTransport import Transport
-from openrouter_requests.TransportModule.httpx_processor import HttpxProcessor
\ No newline at end of file
+from openrouter_requests.TransportModule.httpx_processor import HttpxProcessor
+from openrouter_requests.TransportModule.hedged_transport import HedgedTransport
\ No newline at end of file
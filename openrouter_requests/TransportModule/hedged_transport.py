@@ -0,0 +1,282 @@
+import asyncio
+import contextlib
+import json
+import math
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Set, Tuple
+from loguru import logger
+from openrouter_requests.RequestBuilder.presets import merge_options
+from openrouter_requests.TransportModule.BaseTransport import Transport
+
+
+class HedgedTransport(Transport):
+
+    def __init__(
+            self,
+            inner: Transport,
+            percentile: float = 0.95,
+            initial_delay: float = 1.0,
+            min_delay: float = 0.2,
+            max_delay: float = 5.0,
+            window: int = 200,
+            min_samples: int = 20,
+            max_hedge_ratio: float = 0.1,
+            max_burst: float = 2.0,
+            max_extra_cost_ratio: Optional[float] = 0.1,
+            alternate: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        if not 0.0 < percentile < 1.0:
+            raise ValueError("percentile должен быть в диапазоне (0, 1)")
+
+        self.inner = inner
+        self.percentile = percentile
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.min_samples = min_samples
+        self.max_hedge_ratio = max_hedge_ratio
+        self.max_burst = max_burst
+        self.max_extra_cost_ratio = max_extra_cost_ratio
+        self.alternate = alternate or {}
+        self._latencies: Dict[str, Deque[float]] = {
+            "post": deque(maxlen=window),
+            "stream": deque(maxlen=window),
+        }
+        self._tokens = max_burst
+        self._counters: Dict[str, int] = {
+            "requests": 0,
+            "hedges": 0,
+            "hedge_wins": 0,
+            "rate_limited": 0,
+            "cost_limited": 0,
+            "losers_cancelled": 0,
+            "tokens_total": 0,
+            "hedge_tokens_estimate": 0,
+        }
+        logger.success(
+            "Инициализирован класс {} с параметрками {}",
+            self.__class__.__name__,
+            {
+                "inner": inner.__class__.__name__,
+                "percentile": percentile,
+                "max_hedge_ratio": max_hedge_ratio,
+                "max_extra_cost_ratio": max_extra_cost_ratio,
+                "alternate": self.alternate,
+            }
+        )
+
+    async def get(
+            self,
+            url: str,
+            headers: Dict[str, str],
+            payload: Optional[Any],
+            timeout: Optional[float] = None,
+    ) -> Any:
+        return await self.inner.get(url=url, headers=headers, payload=payload, timeout=timeout)
+
+    async def warmup(
+            self,
+            url: str,
+            headers: Dict[str, str],
+    ) -> None:
+        await self.inner.warmup(url=url, headers=headers)
+
+    async def post(
+            self,
+            url: str,
+            headers: Dict[str, str],
+            payload: Optional[Any],
+            timeout: Optional[float] = None,
+    ) -> Any:
+        started = time.monotonic()
+        self._on_request()
+        estimate = self._estimate_tokens(payload)
+        primary = asyncio.ensure_future(
+            self.inner.post(url=url, headers=headers, payload=payload, timeout=timeout)
+        )
+        tasks: Set[asyncio.Future] = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_delay("post"))
+            if done or not self._acquire_hedge(estimate):
+                response = await primary
+                self._record(started, response, estimate)
+                return response
+
+            hedge = asyncio.ensure_future(
+                self.inner.post(
+                    url=url,
+                    headers=headers,
+                    payload=self._hedge_payload(payload),
+                    timeout=self._remaining(timeout, started),
+                )
+            )
+            tasks.add(hedge)
+            winner, response = await self._first_success(tasks)
+            if winner is hedge:
+                self._counters["hedge_wins"] += 1
+            self._record(started, response, estimate)
+            return response
+        finally:
+            await self._cancel(tasks)
+
+    async def stream(
+            self,
+            url: str,
+            headers: Dict[str, str],
+            payload: Optional[Any],
+            timeout: Optional[float] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        started = time.monotonic()
+        self._on_request()
+        estimate = self._estimate_tokens(payload)
+        streams: Dict[asyncio.Future, AsyncIterator[Dict[str, Any]]] = {}
+
+        primary_stream = self.inner.stream(url=url, headers=headers, payload=payload, timeout=timeout)
+        primary = asyncio.ensure_future(anext(primary_stream))
+        streams[primary] = primary_stream
+        winner_stream = primary_stream
+        usage: Optional[Dict[str, Any]] = None
+
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=self.hedge_delay("stream"))
+            if done or not self._acquire_hedge(estimate):
+                first = await primary
+            else:
+                hedge_stream = self.inner.stream(
+                    url=url,
+                    headers=headers,
+                    payload=self._hedge_payload(payload),
+                    timeout=self._remaining(timeout, started),
+                )
+                hedge = asyncio.ensure_future(anext(hedge_stream))
+                streams[hedge] = hedge_stream
+                winner, first = await self._first_success(set(streams))
+                winner_stream = streams[winner]
+                if winner is hedge:
+                    self._counters["hedge_wins"] += 1
+
+            await self._cancel(set(streams), keep=winner_stream, streams=streams)
+            self._latencies["stream"].append(time.monotonic() - started)
+
+            usage = first.get("usage") or usage
+            yield first
+            async for chunk in winner_stream:
+                usage = chunk.get("usage") or usage
+                yield chunk
+        except StopAsyncIteration:
+            return
+        finally:
+            await self._cancel(set(streams), streams=streams)
+            self._account(usage, estimate)
+
+    def hedge_delay(self, kind: str = "post") -> float:
+        latencies = self._latencies[kind]
+        if len(latencies) < self.min_samples:
+            return self.initial_delay
+
+        ordered = sorted(latencies)
+        index = min(len(ordered) - 1, math.ceil(self.percentile * len(ordered)) - 1)
+        return min(self.max_delay, max(self.min_delay, ordered[index]))
+
+    def stats(self) -> Dict[str, Any]:
+        counters = dict(self._counters)
+        requests = counters["requests"]
+        counters["hedge_rate"] = counters["hedges"] / requests if requests else 0.0
+        counters["extra_cost_ratio"] = self._extra_cost_ratio()
+        counters["hedge_delay"] = self.hedge_delay("post")
+        counters["stream_hedge_delay"] = self.hedge_delay("stream")
+        return counters
+
+    def _on_request(self) -> None:
+        self._counters["requests"] += 1
+        self._tokens = min(self.max_burst, self._tokens + self.max_hedge_ratio)
+
+    def _acquire_hedge(self, estimate: int) -> bool:
+        if (
+                self.max_extra_cost_ratio is not None
+                and self._extra_cost_ratio() >= self.max_extra_cost_ratio
+        ):
+            self._counters["cost_limited"] += 1
+            return False
+
+        if self._tokens < 1.0:
+            self._counters["rate_limited"] += 1
+            return False
+
+        self._tokens -= 1.0
+        self._counters["hedges"] += 1
+        self._counters["hedge_tokens_estimate"] += estimate
+        logger.debug("Запущен хедж-запрос")
+        return True
+
+    def _extra_cost_ratio(self) -> float:
+        total = self._counters["tokens_total"]
+        return self._counters["hedge_tokens_estimate"] / total if total else 0.0
+
+    def _hedge_payload(self, payload: Optional[Any]) -> Optional[Any]:
+        if not self.alternate or not isinstance(payload, dict):
+            return payload
+        return merge_options(payload, self.alternate)
+
+    def _record(self, started: float, response: Any, estimate: int) -> None:
+        self._latencies["post"].append(time.monotonic() - started)
+        usage = response.get("usage") if isinstance(response, dict) else None
+        self._account(usage, estimate)
+
+    def _account(self, usage: Optional[Dict[str, Any]], estimate: int) -> None:
+        total = int(usage.get("total_tokens") or 0) if usage else 0
+        self._counters["tokens_total"] += total or estimate
+
+    @staticmethod
+    def _estimate_tokens(payload: Optional[Any]) -> int:
+        try:
+            size = len(json.dumps(payload, ensure_ascii=False, default=str))
+        except (TypeError, ValueError):
+            size = len(str(payload))
+        return max(1, size // 4)
+
+    @staticmethod
+    def _remaining(timeout: Optional[float], started: float) -> Optional[float]:
+        if timeout is None:
+            return None
+        return max(0.0, timeout - (time.monotonic() - started))
+
+    @staticmethod
+    async def _first_success(tasks: Set[asyncio.Future]) -> Tuple[asyncio.Future, Any]:
+        pending = set(tasks)
+        error: Optional[BaseException] = None
+
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task, task.result()
+                if error is None or isinstance(error, StopAsyncIteration):
+                    error = task.exception()
+
+        if error is None or isinstance(error, StopAsyncIteration):
+            raise ConnectionError("Ни один из хедж-запросов не вернул ответ")
+        raise error
+
+    async def _cancel(
+            self,
+            tasks: Set[asyncio.Future],
+            keep: Optional[AsyncIterator[Dict[str, Any]]] = None,
+            streams: Optional[Dict[asyncio.Future, AsyncIterator[Dict[str, Any]]]] = None,
+    ) -> None:
+        for task in tasks:
+            stream = streams.get(task) if streams is not None else None
+            if stream is not None and stream is keep:
+                continue
+
+            if not task.done():
+                task.cancel()
+                self._counters["losers_cancelled"] += 1
+            with contextlib.suppress(BaseException):
+                await task
+
+            if stream is not None:
+                with contextlib.suppress(BaseException):
+                    await stream.aclose()
+                del streams[task]
\ No newline at end of file
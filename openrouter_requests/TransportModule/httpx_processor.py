@@ -1,6 +1,10 @@
-from typing import Any, Dict, Optional
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
+import asyncio
+import json
 import httpx
 import threading
+import time
 from loguru import logger
 from openrouter_requests.TransportModule.BaseTransport import Transport
 
@@ -22,6 +26,28 @@ timeout = httpx.Timeout(
 )
 
 
+def _request_timeout(budget: Optional[float]) -> Any:
+    if budget is None:
+        return httpx.USE_CLIENT_DEFAULT
+    return httpx.Timeout(
+        connect=min(timeout.connect, budget),
+        read=budget,
+        write=budget,
+        pool=min(timeout.pool, budget),
+    )
+
+
+@contextmanager
+def _deadline_errors(budget: Optional[float]) -> Iterator[None]:
+    started = time.monotonic()
+    try:
+        yield
+    except httpx.TimeoutException as exc:
+        if budget is None or time.monotonic() - started < budget:
+            raise
+        raise asyncio.TimeoutError(f"Запрос не уложился в {budget:.3f} сек") from exc
+
+
 class HttpxProcessor(Transport):
     _instance = None
     _lock = threading.Lock()
@@ -51,12 +77,15 @@ class HttpxProcessor(Transport):
             url: str,
             headers: Dict[str, str],
             payload: Optional[Any],
+            timeout: Optional[float] = None,
     ) -> Any:
-        response = await self._client.get(
-            url=url,
-            headers=headers,
-            params=payload,
-        )
+        with _deadline_errors(timeout):
+            response = await self._client.get(
+                url=url,
+                headers=headers,
+                params=payload,
+                timeout=_request_timeout(timeout),
+            )
         response.raise_for_status()
         return response.text
 
@@ -65,11 +94,46 @@ class HttpxProcessor(Transport):
             url: str,
             headers: Dict[str, str],
             payload: Optional[Any],
+            timeout: Optional[float] = None,
     ) -> Any:
-        response = await self._client.post(
-            url=url,
-            headers=headers,
-            json=payload,
-        )
+        with _deadline_errors(timeout):
+            response = await self._client.post(
+                url=url,
+                headers=headers,
+                json=payload,
+                timeout=_request_timeout(timeout),
+            )
         response.raise_for_status()
-        return response.json()
\ No newline at end of file
+        return response.json()
+
+    async def warmup(
+            self,
+            url: str,
+            headers: Dict[str, str],
+    ) -> None:
+        await self._client.get(url=url, headers=headers)
+
+    async def stream(
+            self,
+            url: str,
+            headers: Dict[str, str],
+            payload: Optional[Any],
+            timeout: Optional[float] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        with _deadline_errors(timeout):
+            async with self._client.stream(
+                "POST",
+                url=url,
+                headers=headers,
+                json=payload,
+                timeout=_request_timeout(timeout),
+            ) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+                    if data:
+                        yield json.loads(data)
\ No newline at end of file
@@ -0,0 +1 @@
+from openrouter_requests.VoicePipeline.voice_pipeline import VoicePipeline
\ No newline at end of file
@@ -0,0 +1,207 @@
+import asyncio
+import contextlib
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+from loguru import logger
+from openrouter_requests.TextToSpeechModule.sentence_splitter import SentenceSplitter
+
+
+def _normalize_transcript(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+class VoicePipeline:
+
+    def __init__(
+            self,
+            client: Any,
+            stt: Any,
+            tts: Any,
+            min_prefetch_words: int = 3,
+            tts_prefetch: int = 2,
+            min_sentence_chars: int = 20,
+            max_sentence_chars: int = 300,
+    ) -> None:
+        self.client = client
+        self.stt = stt
+        self.tts = tts
+        self.min_prefetch_words = min_prefetch_words
+        self.tts_prefetch = max(1, tts_prefetch)
+        self.min_sentence_chars = min_sentence_chars
+        self.max_sentence_chars = max_sentence_chars
+        logger.success(
+            "Инициализирован класс {} с параметрками {}",
+            self.__class__.__name__,
+            {
+                "min_prefetch_words": min_prefetch_words,
+                "tts_prefetch": self.tts_prefetch,
+            }
+        )
+
+    async def run(
+            self,
+            audio: AsyncIterator[bytes],
+            sample_rate: int = 16000,
+            dialog_id: Optional[str] = None,
+            collection: Optional[str] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        marks: Dict[str, float] = {"start": time.perf_counter()}
+        finals: List[str] = []
+        prefetch: Optional[asyncio.Task] = None
+        prefetch_query = ""
+
+        async def audio_with_marks() -> AsyncIterator[bytes]:
+            async for chunk in audio:
+                yield chunk
+            marks["audio_end"] = time.perf_counter()
+
+        try:
+            async for event in self.stt.stream(audio_with_marks(), sample_rate=sample_rate):
+                if event["type"] == "final":
+                    finals.append(event["text"])
+                    marks.setdefault("first_final", time.perf_counter())
+                    query = " ".join(finals)
+                else:
+                    query = " ".join([*finals, event["text"]])
+                yield {"type": "transcript", "final": event["type"] == "final", "text": event["text"]}
+
+                if (
+                        len(query.split()) >= self.min_prefetch_words
+                        and _normalize_transcript(query) != _normalize_transcript(prefetch_query)
+                ):
+                    if prefetch is not None:
+                        prefetch.cancel()
+                    prefetch_query = query
+                    prefetch = asyncio.create_task(
+                        self.client.prefetch_rag(query, collection=collection, dialog_id=dialog_id)
+                    )
+                    marks.setdefault("rag_prefetch_start", time.perf_counter())
+
+            marks["transcript"] = time.perf_counter()
+            marks.setdefault("audio_end", marks["transcript"])
+            transcript = " ".join(finals).strip()
+            if not transcript:
+                yield {"type": "metrics", "metrics": self._metrics(marks)}
+                return
+
+            rag_prefetch: Optional[Dict[str, Any]] = None
+            if prefetch is not None and _normalize_transcript(prefetch_query) == _normalize_transcript(transcript):
+                rag_prefetch = await self._prefetch_result(prefetch)
+                if rag_prefetch is not None:
+                    rag_prefetch = {**rag_prefetch, "query": transcript}
+            marks["rag_ready"] = time.perf_counter()
+
+            async for event in self._speak(transcript, dialog_id, collection, rag_prefetch, marks):
+                yield event
+        finally:
+            if prefetch is not None and not prefetch.done():
+                prefetch.cancel()
+
+        marks["done"] = time.perf_counter()
+        metrics = self._metrics(marks)
+        logger.debug("Голосовой ход завершён: {}", metrics)
+        yield {"type": "metrics", "metrics": metrics}
+
+    async def _speak(
+            self,
+            transcript: str,
+            dialog_id: Optional[str],
+            collection: Optional[str],
+            rag_prefetch: Optional[Dict[str, Any]],
+            marks: Dict[str, float],
+    ) -> AsyncIterator[Dict[str, Any]]:
+        splitter = SentenceSplitter(
+            min_chars=self.min_sentence_chars,
+            max_chars=self.max_sentence_chars,
+        )
+        rendered: asyncio.Queue = asyncio.Queue(maxsize=self.tts_prefetch)
+        result: Dict[str, Any] = {}
+
+        async def schedule(sentence: str) -> None:
+            marks.setdefault("first_sentence", time.perf_counter())
+            await rendered.put((sentence, asyncio.ensure_future(self.tts.synthesize(sentence))))
+
+        async def produce() -> None:
+            try:
+                async for event in self.client.send_stream(
+                    transcript,
+                    role="user",
+                    dialog_id=dialog_id,
+                    collection=collection,
+                    rag_prefetch=rag_prefetch,
+                ):
+                    if event["type"] == "delta":
+                        marks.setdefault("first_token", time.perf_counter())
+                        for sentence in splitter.feed(event["content"]):
+                            await schedule(sentence)
+                    elif event["type"] == "final":
+                        result.update(event["result"])
+                for sentence in splitter.flush():
+                    await schedule(sentence)
+            finally:
+                marks["llm_done"] = time.perf_counter()
+            await rendered.put(None)
+
+        async def next_item() -> Any:
+            getter = asyncio.ensure_future(rendered.get())
+            try:
+                await asyncio.wait({getter, producer}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                if not getter.done():
+                    getter.cancel()
+            if getter.done() and not getter.cancelled():
+                return getter.result()
+            producer.result()
+            return await rendered.get()
+
+        producer = asyncio.create_task(produce())
+        try:
+            while True:
+                item = await next_item()
+                if item is None:
+                    break
+                sentence, future = item
+                pcm = await future
+                marks.setdefault("first_audio", time.perf_counter())
+                yield {"type": "audio", "text": sentence, "pcm": pcm}
+            await producer
+        finally:
+            if not producer.done():
+                producer.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await producer
+            while not rendered.empty():
+                item = rendered.get_nowait()
+                if item is not None:
+                    item[1].cancel()
+
+        yield {"type": "response", "result": result}
+
+    @staticmethod
+    async def _prefetch_result(prefetch: asyncio.Task) -> Optional[Dict[str, Any]]:
+        try:
+            return await prefetch
+        except asyncio.CancelledError:
+            return None
+        except Exception as exc:
+            logger.warning("Предварительный RAG-поиск завершился ошибкой: {}", exc)
+            return None
+
+    @staticmethod
+    def _metrics(marks: Dict[str, float]) -> Dict[str, Optional[float]]:
+
+        def span(begin: str, end: str) -> Optional[float]:
+            if begin not in marks or end not in marks:
+                return None
+            return marks[end] - marks[begin]
+
+        return {
+            "stt_finalize": span("audio_end", "transcript"),
+            "rag_wait": span("transcript", "rag_ready"),
+            "llm_first_token": span("rag_ready", "first_token"),
+            "llm_total": span("rag_ready", "llm_done"),
+            "first_sentence": span("rag_ready", "first_sentence"),
+            "tts_first_audio": span("first_sentence", "first_audio"),
+            "time_to_first_audio": span("audio_end", "first_audio"),
+            "total": span("start", "done"),
+        }
\ No newline at end of file
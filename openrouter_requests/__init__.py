@@ -1,9 +1,34 @@
-from openrouter_requests.ContextStorage import BaseContextManager,DictContextManager,LinearContextManager
+from importlib import import_module
+from typing import Any, List
+from openrouter_requests.ContextStorage import BaseContextManager,DictContextManager,LinearContextManager,ContextSnapshot
 from openrouter_requests.OpenRouter.OpenRouter import OpenRouter
+from openrouter_requests.OpenRouter.session import DialogSession
 from openrouter_requests.RequestBuilder import BaseRequestBuilder,OpenrouterRequestBuilder
 from openrouter_requests.ResponseParser import BaseResponseParser, OpenrouterResponseParser
-from openrouter_requests.SpeechToTextModule import VoskService
-from openrouter_requests.TextToSpeechModule import create_tts
-from openrouter_requests.ToolsModule import Tools,ToolRunner
-from openrouter_requests.TransportModule import BaseTransport, HttpxProcessor
-from openrouter_requests.ChromaDB import ChromaVectorStore
\ No newline at end of file
+from openrouter_requests.ToolsModule import Tools,ToolRunner,current_dialog_id,ToolResultPolicy,ToolResultStore
+from openrouter_requests.TransportModule import BaseTransport, HttpxProcessor, HedgedTransport
+from openrouter_requests.RAGModule import RagContextAssembler
+
+_LAZY_EXPORTS = {
+    "VoskService": "openrouter_requests.SpeechToTextModule",
+    "create_tts": "openrouter_requests.TextToSpeechModule",
+    "VoicePipeline": "openrouter_requests.VoicePipeline",
+    "ChromaVectorStore": "openrouter_requests.ChromaDB",
+    "IngestionPipeline": "openrouter_requests.ChromaDB",
+    "NumpyVectorStore": "openrouter_requests.NumpyIndex",
+    "SemanticResponseCache": "openrouter_requests.CacheModule",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY_EXPORTS))
\ No newline at end of file
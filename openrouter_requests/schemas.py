@@ -1,7 +1,41 @@
-from pydantic import BaseModel, Field
-from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Any, Dict, List, Literal, Optional, Union
+
+
+class ProviderPreferences(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    order: Optional[List[str]] = None
+    allow_fallbacks: Optional[bool] = None
+    require_parameters: Optional[bool] = None
+    data_collection: Optional[Literal["allow", "deny"]] = None
+    only: Optional[List[str]] = None
+    ignore: Optional[List[str]] = None
+    quantizations: Optional[List[str]] = None
+    sort: Optional[Literal["price", "throughput", "latency"]] = None
+    max_price: Optional[Dict[str, float]] = None
+
+
+class UsageOptions(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    include: bool = True
+
 
 class OpenrouterRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
     model: str = Field(...)
     messages: List[Dict[str, Any]]
-    tools: Optional[List[Dict[str, Any]]] = None
\ No newline at end of file
+    tools: Optional[List[Dict[str, Any]]] = None
+    tool_choice: Optional[Union[str, Dict[str, Any]]] = None
+    models: Optional[List[str]] = None
+    stream: Optional[bool] = None
+    max_tokens: Optional[int] = Field(default=None, gt=0)
+    temperature: Optional[float] = Field(default=None, ge=0.0, le=2.0)
+    top_p: Optional[float] = Field(default=None, gt=0.0, le=1.0)
+    stop: Optional[Union[str, List[str]]] = None
+    seed: Optional[int] = None
+    provider: Optional[ProviderPreferences] = None
+    transforms: Optional[List[str]] = None
+    usage: Optional[UsageOptions] = None
\ No newline at end of file
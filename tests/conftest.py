@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+from openrouter_requests.ContextStorage.ContextManagerDict import DictContextManager
+from openrouter_requests.OpenRouter.OpenRouter import OpenRouter
+from openrouter_requests.ToolsModule.create_tool import Tools
+from openrouter_requests.ToolsModule.tool_runner import ToolRunner
+from openrouter_requests.TransportModule.BaseTransport import Transport
+
+
+def completion(content="ответ", tool_calls=None):
+    message = {"role": "assistant", "content": content}
+    if tool_calls:
+        message["tool_calls"] = tool_calls
+    return {"id": "gen", "model": "mock", "choices": [{"message": message}]}
+
+
+class ScriptedTransport(Transport):
+
+    def __init__(self, responses=None, delay=0.0):
+        self.responses = list(responses or [])
+        self.delay = delay
+        self.payloads = []
+
+    async def get(self, url, headers, payload, timeout=None):
+        return {}
+
+    async def post(self, url, headers, payload, timeout=None):
+        self.payloads.append(payload)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        response = self.responses.pop(0) if self.responses else completion()
+        if isinstance(response, BaseException):
+            raise response
+        return response
+
+    async def stream(self, url, headers, payload, timeout=None):
+        self.payloads.append(payload)
+        response = self.responses.pop(0) if self.responses else completion()
+        if isinstance(response, BaseException):
+            raise response
+        message = response["choices"][0]["message"]
+        for word in (message.get("content") or "").split(" "):
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            yield {"choices": [{"delta": {"content": word + " "}}]}
+        if message.get("tool_calls"):
+            yield {"choices": [{"delta": {"tool_calls": [
+                {"index": index, **call} for index, call in enumerate(message["tool_calls"])
+            ]}}]}
+
+
+class FakeRagStore:
+
+    def __init__(self):
+        self.versions = {}
+        self.queries = {}
+
+    async def embed_query(self, query):
+        index = self.queries.setdefault(query, len(self.queries))
+        return [1.0 if position == index else 0.0 for position in range(32)]
+
+    async def search_by_embedding(self, embedding, k=15, include_embeddings=False, collection=None):
+        return []
+
+    def collection_version(self, collection=None):
+        return self.versions.get(collection, 0)
+
+
+@pytest.fixture(autouse=True)
+def fresh_singletons():
+    singletons = (OpenRouter, DictContextManager, Tools, ToolRunner)
+    for cls in singletons:
+        cls._instance = None
+    yield
+    for cls in singletons:
+        cls._instance = None
+
+
+@pytest.fixture
+def make_client():
+    def factory(**kwargs):
+        kwargs.setdefault("api_key", "test")
+        kwargs.setdefault("context", DictContextManager)
+        kwargs.setdefault("transport", ScriptedTransport())
+        return OpenRouter(**kwargs)
+
+    return factory
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("vosk")
+
+from openrouter_requests.SpeechToTextModule.audio import EnergyVad, LinearResampler
+
+
+def tone(frequency, rate, seconds=0.5, amplitude=8000.0):
+    t = np.arange(int(rate * seconds)) / rate
+    return (amplitude * np.sin(2 * np.pi * frequency * t)).astype(np.int16)
+
+
+def rms(pcm):
+    samples = np.frombuffer(pcm, dtype=np.int16).astype(np.float32)[400:]
+    return float(np.sqrt(np.mean(samples * samples)))
+
+
+def test_downsampling_rejects_tones_above_target_nyquist():
+    resampler = LinearResampler(48000, 16000)
+    output = resampler.process(tone(12000, 48000).tobytes())
+
+    assert rms(output) < 0.02 * 8000 / np.sqrt(2)
+
+
+def test_downsampling_keeps_speech_band():
+    resampler = LinearResampler(48000, 16000)
+    output = resampler.process(tone(1000, 48000).tobytes())
+
+    assert abs(rms(output) / (8000 / np.sqrt(2)) - 1.0) < 0.05
+    assert abs(len(output) // 2 - 8000) <= 2
+
+
+def test_chunked_stream_matches_single_pass():
+    pcm = tone(440, 44100).tobytes()
+    whole = LinearResampler(44100, 16000).process(pcm)
+
+    chunked = LinearResampler(44100, 16000)
+    parts = b"".join(chunked.process(pcm[start:start + 1001]) for start in range(0, len(pcm), 1001))
+
+    assert parts == whole
+
+
+def frames(level, count, rate=16000, frame_ms=30, seed=0):
+    rng = np.random.default_rng(seed)
+    samples = rng.normal(scale=level, size=count * rate * frame_ms // 1000)
+    return np.clip(samples, -32768, 32767).astype(np.int16).tobytes()
+
+
+def test_adaptive_vad_learns_loud_background_noise():
+    vad = EnergyVad()
+    vad.process(frames(600, 200))
+    assert not vad.in_speech
+
+    segments = vad.process(frames(6000, 10, seed=1))
+    assert vad.in_speech
+    assert segments
+
+
+def test_fixed_threshold_is_still_available():
+    vad = EnergyVad(energy_threshold=1000, adaptive=False)
+    vad.process(frames(600, 200))
+
+    assert not vad.in_speech
+    assert vad.threshold == 1000
+
+
+def test_sustained_speech_stays_one_segment():
+    vad = EnergyVad()
+    pcm = frames(100, 30) + frames(5000, 133, seed=1) + frames(100, 20, seed=2)
+
+    segments = vad.process(pcm)
+
+    finals = [segment for segment, final in segments if final]
+    assert len(finals) == 1
+    assert len(finals[0]) >= 133 * 480 * 2
+    assert not vad.in_speech
@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+chromadb = pytest.importorskip("chromadb")
+
+from chromadb.config import Settings
+
+from openrouter_requests.ChromaDB.vector_base import ChromaVectorStore
+from openrouter_requests.EmbeddingModule.BaseEmbeddingBackend import BaseEmbeddingBackend
+
+WORDS = ["кот", "пёс", "рыба", "птица"]
+
+
+class KeywordBackend(BaseEmbeddingBackend):
+
+    def encode(self, texts):
+        return [[1.0 if word in text else 0.0 for word in WORDS] for text in texts]
+
+
+@pytest.fixture
+def make_store():
+    client = chromadb.EphemeralClient(settings=Settings(allow_reset=True))
+    client.reset()
+    ChromaVectorStore._instance = None
+
+    def factory(**kwargs):
+        return ChromaVectorStore(client=client, embedding_backend=KeywordBackend(), **kwargs)
+
+    yield factory
+    ChromaVectorStore._instance = None
+    client.reset()
+
+
+def test_search_many_keeps_query_order(make_store):
+    store = make_store()
+
+    async def scenario():
+        await store.add_documents(ids=WORDS, texts=[f"про {word}" for word in WORDS])
+        return await store.search_many(["птица", "кот", "рыба"], k=1)
+
+    results = asyncio.run(scenario())
+
+    assert [items[0]["id"] for items in results] == ["птица", "кот", "рыба"]
+
+
+def test_collections_are_searched_separately(make_store):
+    store = make_store()
+
+    async def scenario():
+        await store.add_document("кот", "про кот")
+        await store.add_document("пёс", "про пёс", collection="other")
+        return (
+            await store.search("кот", k=5),
+            await store.search("кот", k=5, collection="other"),
+        )
+
+    default, other = asyncio.run(scenario())
+
+    assert [item["id"] for item in default] == ["кот"]
+    assert [item["id"] for item in other] == ["пёс"]
+    assert store.collection_version() == 1
+    assert store.collection_version("other") == 1
+
+
+def test_lru_eviction_never_closes_the_default_collection(make_store):
+    store = make_store(max_open_collections=2, collection_idle_ttl=None)
+
+    async def scenario():
+        for name in ("col1", "col2", "col3"):
+            await store.add_document(name, f"про {name}", collection=name)
+        return await store.search("про", k=5, collection="col1")
+
+    reopened = asyncio.run(scenario())
+
+    assert list(store._collections) == ["default_docs", "col1"]
+    assert [item["id"] for item in reopened] == ["col1"]
+
+
+def test_idle_ttl_closes_only_non_default_collections(make_store):
+    store = make_store(collection_idle_ttl=0.0)
+
+    async def scenario():
+        await store.add_document("кот", "про кот", collection="other")
+        await asyncio.sleep(0.01)
+
+    asyncio.run(scenario())
+    store.close_idle_collections()
+
+    assert list(store._collections) == ["default_docs"]
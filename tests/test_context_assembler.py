@@ -0,0 +1,78 @@
+import math
+
+import pytest
+
+from openrouter_requests.RAGModule.context_assembler import RAG_HEADER, RagContextAssembler
+
+
+def doc(name, score, embedding=None, text=None):
+    item = {"id": name, "Text": text or f"текст {name}", "Category": "faq", "score": score}
+    if embedding is not None:
+        norm = math.sqrt(sum(x * x for x in embedding))
+        item["embedding"] = [x / norm for x in embedding]
+    return item
+
+
+def ids(result):
+    return [item["id"] for item in result["docs"]]
+
+
+def test_distance_cutoff_drops_far_candidates():
+    assembler = RagContextAssembler(max_distance=0.5, token_budget=None)
+
+    result = assembler.assemble([doc("a", 0.2), doc("b", 0.6), doc("c", None), doc("d", 0.5)])
+
+    assert ids(result) == ["a", "d"]
+
+
+def test_nothing_relevant_gives_an_empty_block():
+    result = RagContextAssembler(max_distance=0.1).assemble([doc("a", 0.5)])
+
+    assert result == {"docs": [], "content": None, "tokens": 0}
+
+
+def test_mmr_skips_near_duplicates_and_prefers_diverse_chunks():
+    assembler = RagContextAssembler(max_chunks=2, mmr_lambda=0.5, token_budget=None)
+    docs = [
+        doc("a", 0.10, [1.0, 0.0]),
+        doc("a-copy", 0.11, [1.0, 0.01]),
+        doc("near", 0.12, [0.9, 0.3]),
+        doc("other", 0.30, [0.0, 1.0]),
+    ]
+
+    assert ids(assembler.assemble(docs)) == ["a", "other"]
+
+
+def test_duplicate_text_without_embeddings_is_removed():
+    assembler = RagContextAssembler(token_budget=None)
+
+    result = assembler.assemble([doc("a", 0.1, text="одно"), doc("b", 0.2, text="одно"), doc("c", 0.3)])
+
+    assert ids(result) == ["a", "c"]
+
+
+def test_budget_keeps_rank_order_and_truncates_the_last_chunk():
+    assembler = RagContextAssembler(token_budget=60, min_chunk_tokens=5, mmr_lambda=1.0)
+    docs = [doc("a", 0.1, text="а" * 60), doc("b", 0.2, text="слово " * 40), doc("c", 0.3)]
+
+    result = assembler.assemble(docs)
+
+    assert ids(result) == ["a", "b"]
+    assert result["docs"][1]["truncated"] is True
+    assert result["docs"][1]["Text"].endswith("…")
+    assert result["tokens"] <= 60
+    assert result["content"].startswith(RAG_HEADER)
+    assert result["content"].index("[1]") < result["content"].index("[2]")
+
+
+def test_chunk_below_min_tokens_is_not_truncated_in():
+    assembler = RagContextAssembler(token_budget=60, min_chunk_tokens=30, mmr_lambda=1.0)
+
+    result = assembler.assemble([doc("a", 0.1, text="а" * 60), doc("b", 0.2, text="б" * 300)])
+
+    assert ids(result) == ["a"]
+
+
+def test_invalid_lambda_is_rejected():
+    with pytest.raises(ValueError):
+        RagContextAssembler(mmr_lambda=1.5)
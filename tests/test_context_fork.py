@@ -0,0 +1,133 @@
+import asyncio
+
+import pytest
+
+from openrouter_requests.ContextStorage.ContextManagerDict import DictContextManager
+from openrouter_requests.ContextStorage.ContextManagerLinear import LinearContextManager
+
+
+def user(text, dialog_id):
+    return {"role": "user", "content": text, "dialog_id": dialog_id}
+
+
+def contents(messages):
+    return [msg["content"] for msg in messages]
+
+
+def test_fork_shares_history_and_diverges():
+    context = DictContextManager(max_messages=10)
+
+    async def scenario():
+        await context.add_messages([user(str(i), "a") for i in range(3)])
+        await context.fork("a", "b")
+        await context.add_message(user("a3", "a"))
+        await context.add_message(user("b3", "b"))
+        return await context.get_context("a"), await context.get_context("b")
+
+    a, b = asyncio.run(scenario())
+
+    assert contents(a) == ["0", "1", "2", "a3"]
+    assert contents(b) == ["0", "1", "2", "b3"]
+    assert context._bases["a"] is context._bases["b"]
+
+
+def test_trim_at_cap_keeps_shared_segments():
+    context = DictContextManager(max_messages=4)
+
+    async def scenario():
+        await context.upsert_tagged_system("rag", "знания", dialog_id="a")
+        await context.add_messages([user(str(i), "a") for i in range(3)])
+        await context.fork("a", "b")
+        for i in range(3, 6):
+            await context.add_message(user(str(i), "b"))
+        return await context.get_context("a"), await context.get_context("b")
+
+    a, b = asyncio.run(scenario())
+
+    assert contents(a) == ["знания", "0", "1", "2"]
+    assert contents(b) == ["знания", "3", "4", "5"]
+    assert context._bases["a"] is context._bases["b"]
+    assert context._starts["b"] == 4
+
+
+def test_tagged_system_is_updated_after_trim():
+    context = DictContextManager(max_messages=3)
+
+    async def scenario():
+        await context.upsert_tagged_system("rag", "старое", dialog_id="a")
+        await context.add_messages([user(str(i), "a") for i in range(2)])
+        await context.fork("a", "b")
+        await context.add_messages([user(str(i), "b") for i in range(2, 4)])
+        await context.upsert_tagged_system("rag", "новое", dialog_id="b")
+        return await context.get_context("a"), await context.get_context("b")
+
+    a, b = asyncio.run(scenario())
+
+    assert contents(a) == ["старое", "0", "1"]
+    assert contents(b) == ["новое", "2", "3"]
+
+
+def test_restore_returns_to_snapshot_after_trim():
+    context = DictContextManager(max_messages=3)
+
+    async def scenario():
+        await context.add_messages([user(str(i), "a") for i in range(3)])
+        snapshot = await context.snapshot("a")
+        await context.add_messages([user(str(i), "a") for i in range(3, 6)])
+        trimmed = await context.get_context("a")
+        await context.restore(snapshot)
+        return trimmed, await context.get_context("a")
+
+    trimmed, restored = asyncio.run(scenario())
+
+    assert contents(trimmed) == ["3", "4", "5"]
+    assert contents(restored) == ["0", "1", "2"]
+
+
+def test_fork_requires_a_dialog_aware_context(make_client):
+    client = make_client(context=LinearContextManager)
+
+    with pytest.raises(TypeError):
+        asyncio.run(client.fork_dialog("a"))
+
+
+def test_tagged_system_changes_keep_the_branch_shared():
+    context = DictContextManager(max_messages=20)
+
+    async def scenario():
+        await context.upsert_tagged_system("rag_context", "старое", dialog_id="a")
+        await context.add_messages([user(str(i), "a") for i in range(10)])
+        await context.fork("a", "b")
+        await context.upsert_tagged_system("rag_context", "новое", dialog_id="b")
+        updated = await context.get_context("b")
+        await context.remove_tagged_system("rag_context", dialog_id="b")
+        removed = await context.get_context("b")
+        return await context.get_context("a"), updated, removed
+
+    a, updated, removed = asyncio.run(scenario())
+
+    assert contents(a) == ["старое", *map(str, range(10))]
+    assert contents(updated) == ["новое", *map(str, range(10))]
+    assert contents(removed) == list(map(str, range(10)))
+    assert context._bases["b"] is context._bases["a"]
+    assert context._dialogs["b"] == []
+
+
+def test_tagged_override_survives_snapshot_and_trim():
+    context = DictContextManager(max_messages=4)
+
+    async def scenario():
+        await context.upsert_tagged_system("rag_context", "старое", dialog_id="a")
+        await context.add_messages([user(str(i), "a") for i in range(3)])
+        await context.fork("a", "b")
+        await context.upsert_tagged_system("rag_context", "новое", dialog_id="b")
+        snapshot = await context.snapshot("b")
+        await context.add_messages([user(str(i), "b") for i in range(3, 6)])
+        trimmed = await context.get_context("b")
+        await context.restore(snapshot)
+        return trimmed, await context.get_context("b")
+
+    trimmed, restored = asyncio.run(scenario())
+
+    assert contents(trimmed) == ["новое", "3", "4", "5"]
+    assert contents(restored) == ["новое", "0", "1", "2"]
@@ -0,0 +1,58 @@
+import asyncio
+import threading
+
+import pytest
+
+from openrouter_requests.EmbeddingModule.embedding_batcher import EmbeddingBatcher
+
+
+def test_embed_batches_concurrent_requests():
+    calls = []
+
+    def encode(texts):
+        calls.append(list(texts))
+        return [[float(len(text))] for text in texts]
+
+    async def scenario():
+        batcher = EmbeddingBatcher(encode, max_batch_size=8, max_delay=0.01)
+        try:
+            return await asyncio.gather(*[batcher.embed("x" * i) for i in range(5)])
+        finally:
+            batcher.close()
+
+    assert asyncio.run(scenario()) == [[float(i)] for i in range(5)]
+    assert len(calls) == 1
+
+
+def test_cancelled_worker_fails_queued_and_in_flight_futures():
+    started = threading.Event()
+    release = threading.Event()
+
+    def encode(texts):
+        started.set()
+        release.wait(5)
+        return [[0.0] for _ in texts]
+
+    async def scenario():
+        batcher = EmbeddingBatcher(encode, max_batch_size=1, max_delay=0)
+        in_flight = asyncio.ensure_future(batcher.embed("first"))
+        await asyncio.to_thread(started.wait, 5)
+        queued = [asyncio.ensure_future(batcher.embed(f"q{i}")) for i in range(3)]
+        await asyncio.sleep(0)
+
+        worker = batcher._worker
+        worker.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await worker
+        release.set()
+
+        results = await asyncio.wait_for(
+            asyncio.gather(in_flight, *queued, return_exceptions=True),
+            timeout=1,
+        )
+        batcher.close()
+        return results
+
+    results = asyncio.run(scenario())
+    assert len(results) == 4
+    assert all(isinstance(result, RuntimeError) for result in results)
@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+from conftest import completion
+from openrouter_requests.TransportModule.BaseTransport import Transport
+from openrouter_requests.TransportModule.hedged_transport import HedgedTransport
+
+
+class DelayedTransport(Transport):
+
+    def __init__(self, delays, chunks=("a", "b")):
+        self.delays = list(delays)
+        self.chunks = chunks
+        self.cancelled = 0
+        self.closed = 0
+
+    async def get(self, url, headers, payload, timeout=None):
+        return {}
+
+    async def post(self, url, headers, payload, timeout=None):
+        delay = self.delays.pop(0)
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return completion(f"через {delay}")
+
+    async def stream(self, url, headers, payload, timeout=None):
+        delay = self.delays.pop(0)
+        try:
+            await asyncio.sleep(delay)
+            for chunk in self.chunks:
+                yield {"choices": [{"index": 0, "delta": {"content": f"{chunk}{delay}"}}]}
+        finally:
+            self.closed += 1
+
+
+def hedged(inner, **kwargs):
+    kwargs.setdefault("initial_delay", 0.01)
+    kwargs.setdefault("max_hedge_ratio", 1.0)
+    kwargs.setdefault("max_extra_cost_ratio", None)
+    return HedgedTransport(inner, **kwargs)
+
+
+def test_post_hedge_wins_and_cancels_primary():
+    inner = DelayedTransport([1.0, 0.0])
+    transport = hedged(inner)
+
+    response = asyncio.run(transport.post("u", {}, {"messages": ["x" * 400]}))
+
+    assert response["choices"][0]["message"]["content"] == "через 0.0"
+    assert inner.cancelled == 1
+    stats = transport.stats()
+    assert stats["hedge_wins"] == 1
+    assert stats["losers_cancelled"] == 1
+    assert stats["hedge_tokens_estimate"] >= 100
+    assert stats["tokens_total"] >= 100
+
+
+def test_stream_hedge_wins_and_closes_primary():
+    inner = DelayedTransport([1.0, 0.0])
+    transport = hedged(inner)
+
+    async def collect():
+        return [chunk async for chunk in transport.stream("u", {}, {"messages": []})]
+
+    chunks = asyncio.run(collect())
+
+    assert [c["choices"][0]["delta"]["content"] for c in chunks] == ["a0.0", "b0.0"]
+    assert inner.closed == 2
+    assert transport.stats()["losers_cancelled"] == 1
+
+
+def test_empty_hedged_streams_raise_transport_error():
+    inner = DelayedTransport([0.05, 0.0], chunks=())
+    transport = hedged(inner)
+
+    async def collect():
+        return [chunk async for chunk in transport.stream("u", {}, {"messages": []})]
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(collect())
+
+
+def test_cost_limit_applies_without_usage():
+    inner = DelayedTransport([0.05, 0.0, 0.05])
+    transport = hedged(inner, max_extra_cost_ratio=0.5)
+
+    async def scenario():
+        await transport.post("u", {}, {"messages": []})
+        await transport.post("u", {}, {"messages": []})
+
+    asyncio.run(scenario())
+
+    stats = transport.stats()
+    assert stats["hedges"] == 1
+    assert stats["cost_limited"] == 1
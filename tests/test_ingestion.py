@@ -0,0 +1,50 @@
+import asyncio
+
+from openrouter_requests.ChromaDB.ingestion import IngestionPipeline, chunk_id
+
+
+class FakeStore:
+
+    def __init__(self):
+        self.rows = {}
+
+    async def existing_ids(self, ids, collection=None):
+        return {item_id for item_id in ids if item_id in self.rows}
+
+    async def embed_documents(self, texts):
+        return [[float(len(text))] for text in texts]
+
+    async def upsert_embeddings(self, ids, texts, embeddings, metadatas, collection=None):
+        for item_id, text, metadata in zip(ids, texts, metadatas):
+            self.rows[item_id] = (text, metadata)
+
+
+async def documents(items):
+    for item in items:
+        yield item
+
+
+def test_identical_chunk_in_two_documents_keeps_both_sources():
+    store = FakeStore()
+    pipeline = IngestionPipeline(store, chunk_size=100, chunk_overlap=10)
+    docs = [
+        {"id": "a", "text": "общий текст", "metadata": {"category": "x"}},
+        {"id": "b", "text": "общий текст", "metadata": {"category": "y"}},
+    ]
+
+    stats = asyncio.run(pipeline.run(documents(docs)))
+
+    assert stats["written"] == 2
+    assert store.rows[chunk_id("a", "общий текст")][1]["category"] == "x"
+    assert store.rows[chunk_id("b", "общий текст")][1]["category"] == "y"
+
+
+def test_reingestion_skips_existing_chunks():
+    store = FakeStore()
+    docs = [{"id": "a", "text": "один"}, {"id": "b", "text": "два"}]
+
+    asyncio.run(IngestionPipeline(store).run(documents(docs)))
+    stats = asyncio.run(IngestionPipeline(store).run(documents(docs)))
+
+    assert stats["written"] == 0
+    assert stats["skipped"] == 2
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from openrouter_requests.NumpyIndex.mmap_index import EMBEDDINGS_FILE, MmapIndex
+
+
+def vectors(rows, dim=8, seed=0):
+    return np.random.default_rng(seed).normal(size=(rows, dim)).astype(np.float32)
+
+
+def test_append_and_reopen(tmp_path):
+    index = MmapIndex(tmp_path)
+    first = vectors(3)
+    index.append(["a", "b", "c"], ["ta", "tb", "tc"], [{"n": 1}, None, None], first)
+    index.append(["d"], ["td"], [None], vectors(1, seed=1))
+
+    reopened = MmapIndex(tmp_path)
+    assert len(reopened) == 4
+    hit = reopened.search(first[1:2], k=1)[0][0]
+    assert hit["id"] == "b"
+    assert hit["text"] == "tb"
+
+    with pytest.raises(ValueError):
+        reopened.append(["a"], ["again"], [None], vectors(1))
+
+
+def test_append_does_not_rewrite_existing_rows(tmp_path):
+    index = MmapIndex(tmp_path)
+    index.append(["a"], ["ta"], [None], vectors(1))
+    path = tmp_path / EMBEDDINGS_FILE
+    inode = path.stat().st_ino
+
+    index.append(["b"], ["tb"], [None], vectors(1, seed=1))
+
+    assert path.stat().st_ino == inode
+    assert path.stat().st_size == 2 * 8 * np.dtype(np.float16).itemsize
+
+
+def test_uncommitted_tail_is_discarded(tmp_path):
+    index = MmapIndex(tmp_path)
+    index.append(["a"], ["ta"], [None], vectors(1))
+    with open(tmp_path / EMBEDDINGS_FILE, "ab") as fh:
+        fh.write(b"\x00" * 7)
+
+    index.append(["b"], ["tb"], [None], vectors(1, seed=1))
+
+    reopened = MmapIndex(tmp_path)
+    assert [item["id"] for item in reopened.search(vectors(1, seed=1), k=2)[0]][0] == "b"
+    assert (tmp_path / EMBEDDINGS_FILE).stat().st_size == 2 * 8 * 2
+
+
+def test_search_after_ivf_and_append(tmp_path):
+    index = MmapIndex(tmp_path, nprobe=2)
+    data = vectors(50)
+    index.append([str(i) for i in range(50)], [str(i) for i in range(50)], [None] * 50, data)
+    index.build_ivf(n_clusters=4, iterations=3, sample_size=50, seed=0)
+    index.append(["new"], ["new"], [None], vectors(1, seed=9))
+
+    reopened = MmapIndex(tmp_path, nprobe=4)
+    assert reopened.has_ivf
+    assert reopened.search(data[7:8], k=1)[0][0]["id"] == "7"
+    assert reopened.search(vectors(1, seed=9), k=1)[0][0]["id"] == "new"
+
+
+def test_dtype_mismatch_raises(tmp_path):
+    MmapIndex(tmp_path, dtype="float16").append(["a"], ["ta"], [None], vectors(1))
+
+    with pytest.raises(ValueError):
+        MmapIndex(tmp_path, dtype="float32")
@@ -0,0 +1,68 @@
+import asyncio
+import threading
+
+from openrouter_requests.EmbeddingModule.BaseEmbeddingBackend import BaseEmbeddingBackend
+from openrouter_requests.NumpyIndex.numpy_vector_store import NumpyVectorStore
+
+
+class HashBackend(BaseEmbeddingBackend):
+
+    def encode(self, texts):
+        return [[float((hash(text) >> shift) & 0xFF) + 1.0 for shift in range(0, 32, 4)] for text in texts]
+
+
+def make_store(tmp_path, **kwargs):
+    return NumpyVectorStore(index_path=str(tmp_path), embedding_backend=HashBackend(), **kwargs)
+
+
+def test_idle_collections_are_closed_without_opening_new_ones(tmp_path):
+    store = make_store(tmp_path, collection_idle_ttl=0.0)
+
+    async def scenario():
+        await store.add_document("a", "текст", collection="tenant")
+        await asyncio.sleep(0.01)
+        store.close_idle_collections()
+
+    asyncio.run(scenario())
+    assert "tenant" not in store._indexes
+
+
+def test_index_with_in_flight_append_is_not_evicted(tmp_path):
+    store = make_store(tmp_path, collection_idle_ttl=0.0, max_open_collections=1)
+    started = threading.Event()
+    release = threading.Event()
+
+    async def scenario():
+        await store.add_document("seed", "seed", collection="busy")
+        index = store._indexes["busy"][0]
+        original_append = index.append
+
+        def slow_append(*args):
+            started.set()
+            release.wait(5)
+            original_append(*args)
+
+        index.append = slow_append
+        writer = asyncio.ensure_future(store.add_document("late", "late", collection="busy"))
+        await asyncio.to_thread(started.wait, 5)
+
+        await store.search_by_embedding([1.0] * 8, k=1, collection="other")
+        store.close_idle_collections()
+        assert store._indexes["busy"][0] is index
+
+        release.set()
+        await writer
+        results = await store.search_by_embedding([1.0] * 8, k=5, collection="busy")
+        return {item["id"] for item in results}
+
+    assert asyncio.run(scenario()) == {"seed", "late"}
+
+
+def test_versions_are_tracked_per_collection(tmp_path):
+    store = make_store(tmp_path)
+
+    asyncio.run(store.add_document("a", "текст", collection="one"))
+
+    assert store.collection_version("one") == 1
+    assert store.collection_version("two") == 0
+    assert store.collection_version() == 0
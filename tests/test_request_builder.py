@@ -0,0 +1,39 @@
+import asyncio
+
+import pytest
+from pydantic import ValidationError
+
+from openrouter_requests.RequestBuilder.OpenrouterRequestBuilder import OpenrouterRequestBuilder
+from openrouter_requests.schemas import OpenrouterRequest
+
+
+def build(builder, overrides=None):
+    data = OpenrouterRequest(model="m", messages=[{"role": "user", "content": "привет"}])
+    return asyncio.run(builder.build_request(data, overrides=overrides))
+
+
+def test_options_are_merged_over_preset_and_defaults():
+    builder = OpenrouterRequestBuilder(defaults={"temperature": 0.2}, preset="low-latency")
+
+    payload = build(builder, {"provider": {"only": ["a"]}, "max_tokens": 10})
+
+    assert payload["temperature"] == 0.2
+    assert payload["max_tokens"] == 10
+    assert payload["provider"] == {"sort": "latency", "allow_fallbacks": True, "only": ["a"]}
+
+
+@pytest.mark.parametrize("overrides", [
+    {"temprature": 0.5},
+    {"provider": {"sortt": "price"}},
+    {"usage": {"include": True, "details": True}},
+])
+def test_unknown_options_are_rejected(overrides):
+    with pytest.raises(ValidationError):
+        build(OpenrouterRequestBuilder(), overrides)
+
+
+def test_stream_is_rejected_in_defaults_and_options():
+    with pytest.raises(ValueError):
+        OpenrouterRequestBuilder(defaults={"stream": True})
+    with pytest.raises(ValueError):
+        build(OpenrouterRequestBuilder(), {"stream": False})
@@ -0,0 +1,67 @@
+import asyncio
+
+from openrouter_requests.CacheModule.semantic_cache import SemanticResponseCache
+from conftest import FakeRagStore, ScriptedTransport, completion
+
+
+def store(cache, answer, collection, kb_version, history=""):
+    cache.store("sys", "rag", [1.0, 0.0], answer, kb_version=kb_version,
+                collection=collection, history_fingerprint=history)
+
+
+def lookup(cache, collection, kb_version, history=""):
+    return cache.lookup("sys", "rag", [1.0, 0.0], kb_version=kb_version,
+                        collection=collection, history_fingerprint=history)
+
+
+def test_write_to_one_collection_keeps_other_collections_cached():
+    cache = SemanticResponseCache()
+    store(cache, "a", "tenant-a", 1)
+    store(cache, "b", "tenant-b", 1)
+
+    assert lookup(cache, "tenant-a", 2) is None
+    assert lookup(cache, "tenant-b", 1) == "b"
+    assert cache.stats()["entries"] == 1
+
+
+def test_history_fingerprint_separates_conversations():
+    cache = SemanticResponseCache()
+    store(cache, "answer", None, 0, history="dialog-1")
+
+    assert lookup(cache, None, 0, history="dialog-2") is None
+    assert lookup(cache, None, 0, history="dialog-1") == "answer"
+
+
+def test_follow_up_is_not_answered_from_another_dialog(make_client):
+    transport = ScriptedTransport([completion("первый"), completion("второй"), completion("третий")])
+    client = make_client(
+        transport=transport,
+        rag_store=FakeRagStore(),
+        semantic_cache=SemanticResponseCache(),
+    )
+
+    async def scenario():
+        await client.send("да", "user", dialog_id="one")
+        await client.send("вопрос", "user", dialog_id="two")
+        return await client.send("да", "user", dialog_id="two")
+
+    result = asyncio.run(scenario())
+    assert result["content"] == "третий"
+    assert len(transport.payloads) == 3
+
+
+def test_identical_first_turn_is_cached_across_dialogs(make_client):
+    transport = ScriptedTransport([completion("ответ")])
+    client = make_client(
+        transport=transport,
+        rag_store=FakeRagStore(),
+        semantic_cache=SemanticResponseCache(),
+    )
+
+    async def scenario():
+        await client.send("привет", "user", dialog_id="one")
+        return await client.send("привет", "user", dialog_id="two")
+
+    result = asyncio.run(scenario())
+    assert result["content"] == "ответ"
+    assert len(transport.payloads) == 1
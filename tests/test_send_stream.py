@@ -0,0 +1,50 @@
+import asyncio
+
+from conftest import ScriptedTransport, completion
+from openrouter_requests.TransportModule.BaseTransport import Transport
+
+
+def test_closing_stream_midway_counts_cancellation(make_client):
+    client = make_client(transport=ScriptedTransport([completion("раз два три четыре")], delay=0.01))
+
+    async def scenario():
+        events = client.send_stream("привет", "user", dialog_id="d")
+        async for event in events:
+            if event["type"] == "delta":
+                break
+        await events.aclose()
+
+    asyncio.run(scenario())
+    assert client.metrics["cancelled"] == 1
+
+
+def test_closing_after_final_event_is_not_a_cancellation(make_client):
+    client = make_client(transport=ScriptedTransport([completion("ответ")]))
+
+    async def scenario():
+        events = client.send_stream("привет", "user", dialog_id="d")
+        async for event in events:
+            if event["type"] == "final":
+                break
+        await events.aclose()
+
+    asyncio.run(scenario())
+    assert client.metrics["cancelled"] == 0
+
+
+class PostOnlyTransport(ScriptedTransport):
+
+    stream = Transport.stream
+
+
+def test_transport_without_streaming_falls_back_to_post(make_client):
+    transport = PostOnlyTransport([completion("целый ответ")])
+    client = make_client(transport=transport)
+
+    async def scenario():
+        return [event async for event in client.send_stream("привет", "user", dialog_id="d")]
+
+    events = asyncio.run(scenario())
+    assert [event["content"] for event in events if event["type"] == "delta"] == ["целый ответ"]
+    assert events[-1]["result"]["content"] == "целый ответ"
+    assert transport.payloads[0]["stream"] is False
@@ -0,0 +1,26 @@
+import asyncio
+
+import pytest
+
+from conftest import ScriptedTransport, completion
+from openrouter_requests.ContextStorage.ContextManagerLinear import LinearContextManager
+
+
+def test_sessions_require_a_dialog_aware_context(make_client):
+    client = make_client(context=LinearContextManager)
+
+    with pytest.raises(TypeError):
+        client.session("d")
+
+
+def test_sessions_keep_histories_apart(make_client):
+    client = make_client(transport=ScriptedTransport([completion("a"), completion("b")]))
+    first, second = client.session("one"), client.session("two")
+
+    async def scenario():
+        await asyncio.gather(first.send("первый"), second.send("второй"))
+        return await first.get_context(), await second.get_context()
+
+    one, two = asyncio.run(scenario())
+    assert [msg["content"] for msg in one if msg["role"] == "user"] == ["первый"]
+    assert [msg["content"] for msg in two if msg["role"] == "user"] == ["второй"]
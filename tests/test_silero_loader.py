@@ -0,0 +1,56 @@
+import sys
+import types
+
+import pytest
+
+from openrouter_requests.TextToSpeechModule import SnakersModule
+
+
+class FakeModel:
+
+    def __init__(self, path):
+        self.path = path
+
+    def to(self, device):
+        return self
+
+
+@pytest.fixture
+def fake_torch(monkeypatch):
+    torch = types.ModuleType("torch")
+    package = types.ModuleType("torch.package")
+
+    def hub_load(*args, **kwargs):
+        raise AssertionError("локальная загрузка не должна обращаться к torch.hub")
+
+    class PackageImporter:
+
+        def __init__(self, path):
+            self.path = path
+
+        def load_pickle(self, package_name, resource):
+            return FakeModel(self.path)
+
+    torch.hub = types.SimpleNamespace(load=hub_load)
+    torch.device = lambda name: name
+    torch.package = package
+    package.PackageImporter = PackageImporter
+    monkeypatch.setitem(sys.modules, "torch", torch)
+    monkeypatch.setitem(sys.modules, "torch.package", package)
+    monkeypatch.setattr(SnakersModule, "_MODELS", {})
+
+
+def test_directory_model_path_loads_local_package(tmp_path, fake_torch):
+    (tmp_path / "v5_ru.pt").write_bytes(b"")
+    (tmp_path / "v4_ru.pt").write_bytes(b"")
+
+    v5 = SnakersModule.load_silero_model(model_id="v5_ru", model_path=str(tmp_path))
+    v4 = SnakersModule.load_silero_model(model_id="v4_ru", model_path=str(tmp_path))
+
+    assert v5.path.endswith("v5_ru.pt")
+    assert v4.path.endswith("v4_ru.pt")
+
+
+def test_missing_local_package_raises(tmp_path, fake_torch):
+    with pytest.raises(FileNotFoundError):
+        SnakersModule.load_silero_model(model_id="v5_ru", model_path=str(tmp_path))
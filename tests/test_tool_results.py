@@ -0,0 +1,106 @@
+import asyncio
+import json
+
+import pytest
+
+from conftest import ScriptedTransport, completion
+from openrouter_requests.ToolsModule.result_policy import READ_TOOL_RESULT, ToolResultPolicy
+from openrouter_requests.ToolsModule.result_store import ToolResultStore
+from openrouter_requests.ToolsModule.tool_runner import ToolRunner
+
+FULL = "".join(str(i % 10) for i in range(50))
+
+
+class DumpTools(ToolRunner):
+
+    def dump(self):
+        """Возвращает большой результат"""
+        return FULL
+
+
+def dump_call():
+    return {"id": "c1", "type": "function", "function": {"name": "dump", "arguments": "{}"}}
+
+
+def store_client(make_client, tmp_path, **kwargs):
+    return make_client(
+        tool_result_policy=ToolResultPolicy(mode="store", max_chars=10, preview_chars=5),
+        tool_result_store=ToolResultStore(store_dir=str(tmp_path)),
+        **kwargs,
+    )
+
+
+def read(client, **arguments):
+    message = asyncio.run(client._run_tool(READ_TOOL_RESULT, "r1", **arguments))
+    return json.loads(message["content"])
+
+
+def test_default_policy_truncates_without_a_store(make_client):
+    transport = ScriptedTransport([completion(None, tool_calls=[dump_call()]), completion("готово")])
+    client = make_client(transport=transport, tool_class=DumpTools)
+
+    asyncio.run(client.send("вызови", "user", dialog_id="d"))
+
+    tool_message = transport.payloads[1]["messages"][-1]
+    assert tool_message["content"].startswith(FULL[:8000])
+    assert client._tool_result_store is None
+    assert READ_TOOL_RESULT not in {tool["function"]["name"] for tool in transport.payloads[0]["tools"]}
+
+
+def test_retrieval_tool_is_offered_with_an_empty_tool_class(make_client, tmp_path):
+    client = store_client(make_client, tmp_path)
+
+    schema = asyncio.run(client._get_tools_schema())
+
+    assert [tool["function"]["name"] for tool in schema] == [READ_TOOL_RESULT]
+
+
+def test_stored_result_is_paged_back(make_client, tmp_path):
+    transport = ScriptedTransport([completion(None, tool_calls=[dump_call()]), completion("готово")])
+    client = store_client(make_client, tmp_path, transport=transport, tool_class=DumpTools)
+
+    asyncio.run(client.send("вызови", "user", dialog_id="d"))
+    body = json.loads(transport.payloads[1]["messages"][-1]["content"])
+    handle = body["result_handle"]
+
+    assert body["preview"] == FULL[:5]
+    first = read(client, handle=handle, offset=0, limit=100)
+    assert first["content"] == FULL[:10]
+    assert first["next_offset"] == 10
+    last = read(client, handle=handle, offset="45")
+    assert last["content"] == FULL[45:]
+    assert last["next_offset"] is None
+
+
+@pytest.mark.parametrize("arguments", [
+    {},
+    {"handle": 5},
+    {"handle": "0" * 32, "page": 2},
+    {"handle": "0" * 32, "offset": "начало"},
+    {"handle": "0" * 32, "offset": -1},
+    {"handle": "0" * 32, "limit": True},
+    {"handle": "../secret"},
+    {"handle": "0" * 32},
+])
+def test_invalid_read_arguments_return_an_error(make_client, tmp_path, arguments):
+    client = store_client(make_client, tmp_path)
+
+    assert "error" in read(client, **arguments)
+
+
+def test_reset_dialog_deletes_its_stored_results(make_client, tmp_path):
+    calls = [completion(None, tool_calls=[dump_call()]), completion("готово")]
+    transport = ScriptedTransport(calls * 2)
+    client = store_client(make_client, tmp_path, transport=transport, tool_class=DumpTools)
+
+    async def scenario():
+        await client.send("вызови", "user", dialog_id="a")
+        await client.send("вызови", "user", dialog_id="b")
+        await client.session("a").reset()
+
+    asyncio.run(scenario())
+
+    handles = [json.loads(transport.payloads[i]["messages"][-1]["content"])["result_handle"] for i in (1, 3)]
+    assert "error" in read(client, handle=handles[0])
+    assert read(client, handle=handles[1])["content"] == FULL[:10]
+    assert client._tool_result_store.stats()["entries"] == 1
@@ -0,0 +1,40 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from conftest import ScriptedTransport
+from openrouter_requests.OpenRouter.deadline import DeadlineExceeded
+from openrouter_requests.TransportModule.httpx_processor import _deadline_errors, _request_timeout
+
+
+def test_request_timeout_gives_read_and_write_the_whole_budget():
+    request_timeout = _request_timeout(30.0)
+
+    assert request_timeout.read == 30.0
+    assert request_timeout.write == 30.0
+    assert request_timeout.connect == 2.0
+
+
+def test_early_httpx_timeout_stays_a_transport_error():
+    with pytest.raises(httpx.ReadTimeout):
+        with _deadline_errors(30.0):
+            raise httpx.ReadTimeout("медленный ответ")
+
+
+def test_httpx_timeout_after_the_budget_is_a_deadline():
+    with pytest.raises(asyncio.TimeoutError):
+        with _deadline_errors(0.01):
+            time.sleep(0.02)
+            raise httpx.ReadTimeout("медленный ответ")
+
+
+def test_transport_timeout_before_deadline_is_not_counted(make_client):
+    client = make_client(transport=ScriptedTransport([TimeoutError("сокет")]))
+
+    with pytest.raises(TimeoutError) as error:
+        asyncio.run(client.send("вопрос", "user", dialog_id="d", timeout=5.0))
+
+    assert not isinstance(error.value, DeadlineExceeded)
+    assert not client.metrics["deadline_exceeded"]
@@ -0,0 +1,70 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from openrouter_requests.TextToSpeechModule.SnakersModule import SileroTTS
+from openrouter_requests.TextToSpeechModule.sentence_splitter import SentenceSplitter, split_sentences
+
+
+def test_closing_quotes_and_brackets_stay_with_the_sentence():
+    text = "Он сказал: «Это важно.» Потом добавил \"Точно!\" И ушёл (совсем.) Конец"
+
+    assert split_sentences(text, min_chars=1) == [
+        "Он сказал: «Это важно.»",
+        "Потом добавил \"Точно!\"",
+        "И ушёл (совсем.)",
+        "Конец",
+    ]
+
+
+def test_streamed_feed_matches_single_pass():
+    text = "Первое предложение тут. «Второе, в кавычках!» Третье без точки"
+    splitter = SentenceSplitter(min_chars=5)
+
+    sentences = []
+    for start in range(0, len(text), 4):
+        sentences.extend(splitter.feed(text[start:start + 4]))
+    sentences.extend(splitter.flush())
+
+    assert sentences == split_sentences(text, min_chars=5)
+
+
+def test_short_sentences_are_merged_and_long_ones_split():
+    assert split_sentences("Да. Нет. Может быть, завтра.", min_chars=8) == ["Да. Нет.", "Может быть, завтра."]
+    assert split_sentences("раз, два, три, четыре", min_chars=1, max_chars=10) == ["раз, два,", "три,", "четыре"]
+
+
+class StubTTS(SileroTTS):
+
+    def __init__(self, **kwargs):
+        super().__init__(model=None, **kwargs)
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.peak = 0
+
+    def _synthesize(self, text):
+        with self.lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        time.sleep(0.03 if text.startswith("Первое") else 0.005)
+        with self.lock:
+            self.in_flight -= 1
+        return text.encode("utf-8")
+
+
+def test_stream_yields_audio_in_sentence_order_with_bounded_prefetch():
+    tts = StubTTS(workers=4, prefetch=2, min_sentence_chars=1)
+    text = "Первое. Второе. Третье. Четвёртое. Пятое."
+
+    async def collect():
+        return [chunk.decode("utf-8") async for chunk in tts.stream(text)]
+
+    try:
+        chunks = asyncio.run(collect())
+    finally:
+        tts.close()
+
+    assert chunks == ["Первое.", "Второе.", "Третье.", "Четвёртое.", "Пятое."]
+    assert tts.peak <= 2
@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+from conftest import FakeRagStore, ScriptedTransport, completion
+from openrouter_requests.OpenRouter.deadline import DeadlineExceeded
+from openrouter_requests.ToolsModule.tool_runner import ToolRunner
+
+
+class DocsRagStore(FakeRagStore):
+
+    async def search_by_embedding(self, embedding, k=15, include_embeddings=False, collection=None):
+        return [{"id": "doc", "score": 0.1, "text": "справка", "metadata": {}}]
+
+
+def roles(messages):
+    return [(msg["role"], msg.get("_tag")) for msg in messages]
+
+
+def test_failed_turn_leaves_context_untouched(make_client):
+    transport = ScriptedTransport([ConnectionError("сеть"), completion("ответ")])
+    client = make_client(transport=transport, rag_store=DocsRagStore())
+
+    async def scenario():
+        with pytest.raises(ConnectionError):
+            await client.send("первый", "user", dialog_id="d")
+        assert await client.session("d").get_context() == []
+
+        await client.send("второй", "user", dialog_id="d")
+        return await client.session("d").get_context()
+
+    context = asyncio.run(scenario())
+    assert roles(context) == [("user", None), ("system", "rag_context"), ("assistant", None)]
+    assert context[0]["content"] == "второй"
+    assert transport.payloads[1]["messages"][0]["content"] == "второй"
+
+
+def test_deadline_in_transport_does_not_commit_user_message(make_client):
+    client = make_client(transport=ScriptedTransport(delay=0.2))
+
+    async def scenario():
+        with pytest.raises(DeadlineExceeded):
+            await client.send("вопрос", "user", dialog_id="d", timeout=0.05)
+        return await client.session("d").get_context()
+
+    assert asyncio.run(scenario()) == []
+    assert client.metrics["deadline_exceeded"]["transport"] == 1
+
+
+def test_cancelled_turn_is_counted_and_not_committed(make_client):
+    client = make_client(transport=ScriptedTransport(delay=0.2))
+
+    async def scenario():
+        task = asyncio.ensure_future(client.send("вопрос", "user", dialog_id="d"))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return await client.session("d").get_context()
+
+    assert asyncio.run(scenario()) == []
+    assert client.metrics["cancelled"] == 1
+
+
+class EchoTools(ToolRunner):
+
+    def echo(self, text: str):
+        """Повторяет текст
+        Параметры:
+        - text: текст"""
+        return text
+
+
+def test_failed_tool_follow_up_commits_nothing(make_client):
+    call = {"id": "c1", "type": "function", "function": {"name": "echo", "arguments": '{"text": "эхо"}'}}
+    transport = ScriptedTransport([completion(None, tool_calls=[call]), ConnectionError("сеть")])
+    client = make_client(transport=transport, tool_class=EchoTools)
+
+    async def scenario():
+        with pytest.raises(ConnectionError):
+            await client.send("вызови", "user", dialog_id="d")
+        return await client.session("d").get_context()
+
+    assert asyncio.run(scenario()) == []
+    follow_up = transport.payloads[1]["messages"]
+    assert [msg["role"] for msg in follow_up] == ["user", "assistant", "tool"]
+
+
+def test_successful_tool_turn_commits_in_order(make_client):
+    call = {"id": "c1", "type": "function", "function": {"name": "echo", "arguments": '{"text": "эхо"}'}}
+    transport = ScriptedTransport([completion(None, tool_calls=[call]), completion("готово")])
+    client = make_client(transport=transport, tool_class=EchoTools)
+
+    async def scenario():
+        await client.send("вызови", "user", dialog_id="d")
+        return await client.session("d").get_context()
+
+    context = asyncio.run(scenario())
+    assert [msg["role"] for msg in context] == ["user", "assistant", "tool", "assistant"]
@@ -0,0 +1,115 @@
+import asyncio
+import time
+
+import pytest
+
+from openrouter_requests.VoicePipeline import VoicePipeline
+
+SENTENCES = [f"Предложение номер {index} для синтеза речи." for index in range(12)]
+
+
+class FakeStt:
+
+    async def stream(self, chunks, sample_rate=16000):
+        async for _ in chunks:
+            pass
+        yield {"type": "final", "text": "расскажи что-нибудь интересное"}
+
+
+class FakeClient:
+
+    def __init__(self, fail_after=None):
+        self.fail_after = fail_after
+        self.closed = asyncio.Event()
+
+    async def prefetch_rag(self, query, collection=None, dialog_id=None):
+        return None
+
+    async def send_stream(self, data, role="user", **kwargs):
+        try:
+            for index, sentence in enumerate(SENTENCES):
+                if self.fail_after is not None and index == self.fail_after:
+                    raise ConnectionError("обрыв потока")
+                yield {"type": "delta", "content": sentence + " "}
+            yield {"type": "final", "result": {"content": " ".join(SENTENCES)}}
+        finally:
+            self.closed.set()
+
+
+class FakeTts:
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.started = 0
+
+    async def synthesize(self, sentence):
+        self.started += 1
+        await asyncio.sleep(0.01)
+        if self.fail:
+            raise RuntimeError("синтез упал")
+        return sentence.encode("utf-8")
+
+
+async def audio():
+    yield b"\x00\x00" * 160
+
+
+def make_pipeline(client, tts):
+    return VoicePipeline(client, FakeStt(), tts, tts_prefetch=1, min_sentence_chars=5)
+
+
+def test_full_turn_yields_audio_in_order():
+    client = FakeClient()
+    pipeline = make_pipeline(client, FakeTts())
+
+    async def scenario():
+        return [event async for event in pipeline.run(audio())]
+
+    events = asyncio.run(asyncio.wait_for(scenario(), 5))
+    spoken = [event["text"] for event in events if event["type"] == "audio"]
+    assert spoken == SENTENCES
+    assert events[-1]["type"] == "metrics"
+
+
+def test_tts_failure_with_full_queue_does_not_deadlock():
+    client = FakeClient()
+    pipeline = make_pipeline(client, FakeTts(fail=True))
+
+    async def scenario():
+        async for _ in pipeline.run(audio()):
+            pass
+
+    started = time.monotonic()
+    with pytest.raises(RuntimeError):
+        asyncio.run(asyncio.wait_for(scenario(), 5))
+    assert time.monotonic() - started < 1
+    assert client.closed.is_set()
+
+
+def test_early_close_cancels_producer():
+    client = FakeClient()
+    tts = FakeTts()
+    pipeline = make_pipeline(client, tts)
+
+    async def scenario():
+        events = pipeline.run(audio())
+        async for event in events:
+            if event["type"] == "audio":
+                await asyncio.sleep(0.05)
+                break
+        await asyncio.wait_for(events.aclose(), 1)
+        await asyncio.wait_for(client.closed.wait(), 1)
+
+    asyncio.run(asyncio.wait_for(scenario(), 5))
+    assert tts.started < len(SENTENCES)
+
+
+def test_llm_failure_reaches_consumer():
+    pipeline = make_pipeline(FakeClient(fail_after=3), FakeTts())
+
+    async def scenario():
+        async for _ in pipeline.run(audio()):
+            pass
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(asyncio.wait_for(scenario(), 5))
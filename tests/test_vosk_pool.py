@@ -0,0 +1,105 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+pytest.importorskip("vosk")
+
+from openrouter_requests.SpeechToTextModule import VoskTranscriber
+from openrouter_requests.SpeechToTextModule.VoskTranscriber import VoskService
+
+
+class FakeRecognizer:
+    created = []
+
+    def __init__(self, model, sample_rate):
+        self.threads = []
+        self.resets = 0
+        FakeRecognizer.created.append(self)
+
+    def AcceptWaveform(self, chunk):
+        self.threads.append(threading.current_thread().name)
+        return True
+
+    def FinalResult(self):
+        return json.dumps({"text": "привет"})
+
+    def PartialResult(self):
+        return json.dumps({"partial": ""})
+
+    def Reset(self):
+        self.resets += 1
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(VoskTranscriber, "Model", lambda path: object())
+    monkeypatch.setattr(VoskTranscriber, "KaldiRecognizer", FakeRecognizer)
+    for name, value in {
+        "_instance": None,
+        "_initialized": False,
+        "_free_recognizers": [],
+        "_sessions": None,
+        "_executor": None,
+        "_recognizer": None,
+        "_legacy_lock": None,
+    }.items():
+        monkeypatch.setattr(VoskService, name, value)
+    FakeRecognizer.created = []
+    yield VoskService(model_path="model", max_sessions=2, workers=2)
+    VoskService._executor.shutdown(wait=True)
+
+
+def test_concurrent_sessions_share_at_most_pool_size_recognizers(service):
+    active = 0
+    peak = 0
+
+    async def use():
+        nonlocal active, peak
+        async with await VoskService.session() as session:
+            active += 1
+            peak = max(peak, active)
+            assert await session.recognize(b"\x00\x00") == "привет"
+            await asyncio.sleep(0.01)
+            active -= 1
+
+    async def scenario():
+        await asyncio.gather(*[use() for _ in range(6)])
+
+    asyncio.run(scenario())
+
+    assert peak == 2
+    assert len([r for r in FakeRecognizer.created if r is not service._recognizer]) == 2
+    assert len(VoskService._free_recognizers) == 2
+
+
+def test_recognition_runs_in_the_executor(service):
+    async def scenario():
+        async with await VoskService.session() as session:
+            await session.recognize(b"\x00\x00")
+
+    asyncio.run(scenario())
+
+    pooled = VoskService._free_recognizers[0]
+    assert pooled.threads and all(name.startswith("vosk") for name in pooled.threads)
+
+
+def test_recognizer_returns_to_the_pool_after_an_error(service):
+    async def failing():
+        async with await VoskService.session():
+            raise RuntimeError("ошибка клиента")
+
+    async def scenario():
+        for _ in range(3):
+            with pytest.raises(RuntimeError):
+                await failing()
+        async with await VoskService.session() as session:
+            return session._recognizer
+
+    reused = asyncio.run(scenario())
+
+    pooled = [recognizer for recognizer in FakeRecognizer.created if recognizer is not service._recognizer]
+    assert len(pooled) == 1
+    assert reused is pooled[0]
+    assert reused.resets == 4
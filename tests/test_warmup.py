@@ -0,0 +1,54 @@
+import asyncio
+import warnings
+
+import pytest
+
+from conftest import FakeRagStore, ScriptedTransport
+
+
+class FailingWarmupTransport(ScriptedTransport):
+
+    def __init__(self):
+        super().__init__()
+        self.warmed = []
+
+    async def warmup(self, url, headers):
+        self.warmed.append(url)
+        raise ConnectionError("нет сети")
+
+
+class SlowWarmupStore(FakeRagStore):
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+        self.finished = False
+
+    async def warmup(self, collections=None):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        self.finished = True
+
+
+def test_sequential_warmup_stops_without_unawaited_coroutines(make_client):
+    transport = FailingWarmupTransport()
+    store = SlowWarmupStore()
+    client = make_client(transport=transport, rag_store=store)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", RuntimeWarning)
+        with pytest.raises(ConnectionError):
+            asyncio.run(client.warmup(parallel=False))
+
+    assert transport.warmed == ["https://openrouter.ai/api/v1/models"]
+    assert store.calls == 0
+
+
+def test_parallel_warmup_waits_for_siblings_before_raising(make_client):
+    store = SlowWarmupStore()
+    client = make_client(transport=FailingWarmupTransport(), rag_store=store)
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(client.warmup(parallel=True))
+
+    assert store.finished
@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+from openrouter_requests.ContextStorage.write_queue import DialogWriteQueue
+
+
+class RecordingContext:
+
+    def __init__(self):
+        self.calls = []
+
+    async def add_messages(self, messages):
+        await asyncio.sleep(0)
+        self.calls.append(("messages", [message["content"] for message in messages]))
+
+    async def mark(self, label, delay=0.0):
+        await asyncio.sleep(delay)
+        self.calls.append(("mark", label))
+
+    async def fail(self):
+        raise RuntimeError("запись")
+
+
+def message(content, dialog_id):
+    return {"role": "user", "content": content, "dialog_id": dialog_id}
+
+
+def test_operations_keep_order_within_a_dialog():
+    context = RecordingContext()
+
+    async def scenario():
+        queue = DialogWriteQueue(context)
+        queue.submit("a", context.mark, "a1", delay=0.02)
+        queue.submit_message(message("a2", "a"), dialog_id="a")
+        queue.submit("b", context.mark, "b1")
+        queue.submit("a", context.mark, "a3")
+        await queue.flush_all()
+
+    asyncio.run(scenario())
+
+    order_a = [call for call in context.calls if call != ("mark", "b1")]
+    assert order_a == [("mark", "a1"), ("messages", ["a2"]), ("mark", "a3")]
+    assert context.calls[0] == ("mark", "b1")
+
+
+def test_consecutive_messages_are_batched():
+    context = RecordingContext()
+
+    async def scenario():
+        queue = DialogWriteQueue(context, max_batch=3)
+        for index in range(5):
+            queue.submit_message(message(str(index), "a"), dialog_id="a")
+        await queue.flush("a")
+        return queue
+
+    queue = asyncio.run(scenario())
+
+    assert context.calls == [("messages", ["0", "1", "2"]), ("messages", ["3", "4"])]
+    assert queue.batches == 2
+
+
+def test_failed_write_is_raised_on_the_next_flush_only():
+    context = RecordingContext()
+
+    async def scenario():
+        queue = DialogWriteQueue(context)
+        queue.submit("a", context.fail)
+        queue.submit_message(message("после", "a"), dialog_id="a")
+        with pytest.raises(RuntimeError):
+            await queue.flush("a")
+        await queue.flush("a")
+        return queue
+
+    queue = asyncio.run(scenario())
+
+    assert context.calls == [("messages", ["после"])]
+    assert queue._writers == {}
+
+
+def test_idle_writers_are_dropped_without_flush():
+    context = RecordingContext()
+
+    async def scenario():
+        queue = DialogWriteQueue(context)
+        for index in range(50):
+            queue.submit_message(message("x", f"d{index}"), dialog_id=f"d{index}")
+        await asyncio.sleep(0.01)
+        return queue
+
+    queue = asyncio.run(scenario())
+
+    assert len(context.calls) == 50
+    assert queue._writers == {}